@@ -0,0 +1,141 @@
+"""Benchmark container collection through the Docker API and from cgroup v2.
+
+No Docker daemon is needed: a stub client stands in for the API, answering
+each one-shot stats request after ``--latency`` seconds (the daemon waits
+for a second CPU sample), and a synthetic cgroup and proc tree is written
+to a temporary directory for the cgroup collector.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.agent.collectors.cgroup import CgroupCollector  # noqa: E402
+from src.agent.collectors.docker import DockerCollector  # noqa: E402
+
+STATS = json.dumps(
+    {
+        "cpu_stats": {"cpu_usage": {"total_usage": 2000}, "system_cpu_usage": 9000},
+        "precpu_stats": {"cpu_usage": {"total_usage": 1000}, "system_cpu_usage": 8000},
+        "memory_stats": {"usage": 262144, "limit": 1048576},
+        "networks": {"eth0": {"rx_bytes": 1500, "tx_bytes": 2500}},
+    }
+)
+NET_DEV = (
+    "Inter-|   Receive\n face |bytes\n"
+    "  eth0: 1500 10 0 0 0 0 0 0 2500 20 0 0 0 0 0 0\n"
+)
+
+
+class StubEvents:
+    """Event stream that stays silent until closed."""
+
+    def __init__(self):
+        self.closed = threading.Event()
+
+    def __iter__(self):
+        self.closed.wait()
+        return iter([])
+
+    def close(self):
+        self.closed.set()
+
+
+def make_containers(root: Path, count: int, latency: float):
+    """Write cgroup and proc files for ``count`` containers; return mocks."""
+    (root / "proc").mkdir()
+    (root / "proc" / "meminfo").write_text("MemTotal: 16777216 kB\n")
+    containers = []
+    for i in range(count):
+        container_id = f"{i:064x}"
+        pid = 1000 + i
+        cgroup = root / "cgroup" / "system.slice" / f"docker-{container_id}.scope"
+        cgroup.mkdir(parents=True)
+        (cgroup / "cpu.stat").write_text(f"usage_usec {i * 1000}\nthrottled_usec 0\n")
+        (cgroup / "memory.current").write_text("262144\n")
+        (cgroup / "memory.max").write_text("max\n")
+        (cgroup / "io.stat").write_text("8:0 rbytes=100 wbytes=200 rios=1 wios=2\n")
+        for resource in ("cpu", "memory", "io"):
+            (cgroup / f"{resource}.pressure").write_text(
+                "some avg10=0.00 avg60=0.00 avg300=0.00 total=0\n"
+                "full avg10=0.00 avg60=0.00 avg300=0.00 total=0\n"
+            )
+        proc = root / "proc" / str(pid)
+        (proc / "net").mkdir(parents=True)
+        (proc / "cgroup").write_text(f"0::/system.slice/docker-{container_id}.scope\n")
+        (proc / "net" / "dev").write_text(NET_DEV)
+
+        container = MagicMock()
+        container.id = container_id
+        container.name = f"app-{i}"
+        container.attrs = {"State": {"Pid": pid}, "Config": {"Image": "app:latest"}}
+        container.image.tags = ["app:latest"]
+        container.stats.side_effect = lambda stream=False: (
+            time.sleep(latency) or json.loads(STATS)
+        )
+        containers.append(container)
+    return containers
+
+
+def time_collection(collector, repeat: int):
+    """Return mean wall and CPU seconds per collect call, and metric count."""
+    metrics = collector.collect()  # warm up
+    wall, cpu = time.perf_counter(), time.process_time()
+    for _ in range(repeat):
+        metrics = collector.collect()
+    return (
+        (time.perf_counter() - wall) / repeat,
+        (time.process_time() - cpu) / repeat,
+        len(metrics),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--containers", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3, help="Collections per path")
+    parser.add_argument(
+        "--latency", type=float, default=1.0, help="Seconds per API stats call"
+    )
+    parser.add_argument("--workers", type=int, default=16, help="API stats workers")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        containers = make_containers(root, args.containers, args.latency)
+        docker_config = {
+            "stats_workers": args.workers,
+            "stats_timeout": 600,
+            "cgroup_root": str(root / "cgroup"),
+            "proc_root": str(root / "proc"),
+        }
+        config = {"collectors": {"docker": docker_config}}
+
+        results = {}
+        with patch("docker.from_env") as from_env:
+            client = from_env.return_value
+            client.containers.list.return_value = containers
+            client.events.return_value = StubEvents()
+            for name, cls in (("api", DockerCollector), ("cgroup", CgroupCollector)):
+                collector = cls(config)
+                results[name] = time_collection(collector, args.repeat)
+                collector.close()
+
+    print(
+        f"{args.containers} containers, {args.latency}s per API stats call, "
+        f"{args.workers} API workers"
+    )
+    print(f"{'path':<8} {'wall s':>8} {'cpu ms':>8} {'metrics':>8}")
+    for name, (wall, cpu, count) in results.items():
+        print(f"{name:<8} {wall:>8.3f} {cpu * 1e3:>8.1f} {count:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark ResourceOptimizer.predict_utilization forecasting modes."""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+from src.ml.resource_optimizer import FORECAST_MODES, ResourceOptimizer  # noqa: E402
+
+
+def generate_history(days: int, seed: int = 42) -> pd.DataFrame:
+    """Generate hourly utilization with daily and weekly seasonality."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(
+        end=pd.Timestamp.now().floor("h"), periods=days * 24, freq="h"
+    )
+    daily = 25 * np.sin(2 * np.pi * index.hour / 24)
+    weekly = np.where(index.dayofweek >= 5, -15, 0)
+    values = 50 + daily + weekly + rng.normal(0, 5, len(index))
+    return pd.DataFrame({"value": np.clip(values, 0, 100)}, index=index)
+
+
+def build_optimizer(history: pd.DataFrame) -> ResourceOptimizer:
+    """Fit the model in memory, without writing it to models/."""
+    optimizer = ResourceOptimizer({})
+    features = optimizer.prepare_features(history.copy())
+    valid = ~features.isna().any(axis=1)
+    scaled = optimizer.scaler.fit_transform(features[valid])
+    optimizer.model = RandomForestRegressor(
+        n_estimators=100, max_depth=10, random_state=42
+    )
+    optimizer.model.fit(scaled, history["value"][valid])
+    return optimizer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=30, help="Days of hourly history")
+    parser.add_argument(
+        "--horizon", type=int, default=24, help="Forecast horizon in hours"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per mode")
+    args = parser.parse_args()
+
+    history = generate_history(args.days)
+    optimizer = build_optimizer(history)
+
+    results = {}
+    for mode in FORECAST_MODES:
+        optimizer.predict_utilization(history, args.horizon, mode=mode)  # warm up
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            output = optimizer.predict_utilization(history, args.horizon, mode=mode)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        values = np.array([p["predicted_value"] for p in output["predictions"]])
+        results[mode] = (elapsed, values)
+
+    baseline, baseline_values = results["recursive"]
+    print(
+        f"{args.days} days of hourly history, {args.horizon}h horizon, {args.repeat} runs"
+    )
+    print(f"{'mode':<12} {'ms/forecast':>12} {'speedup':>8} {'max |diff|':>11}")
+    for mode, (elapsed, values) in results.items():
+        diff = np.max(np.abs(values - baseline_values))
+        print(
+            f"{mode:<12} {elapsed * 1e3:>12.1f} {baseline / elapsed:>7.1f}x {diff:>11.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Benchmark KafkaManager consumption against a stub consumer.
+
+The handler stands in for a write to a store: each call costs ``--latency``
+seconds however many messages it is given, as a round trip does.
+``consume_messages`` pays it per message, ``consume_batches`` per partition
+batch, and with workers the partitions' batches overlap.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from kafka.structs import TopicPartition  # noqa: E402
+
+from src.streaming.kafka_manager import KafkaManager  # noqa: E402
+
+
+class StubConsumer:
+    """Serves pre-built records round-robin over partitions."""
+
+    def __init__(self, topic: str, partitions: int, messages: int, stop):
+        self.stop = stop
+        self.partitions = [TopicPartition(topic, p) for p in range(partitions)]
+        self.records = {tp: [] for tp in self.partitions}
+        for offset in range(messages):
+            tp = self.partitions[offset % partitions]
+            value = json.dumps({"name": "system.cpu.utilization", "value": offset})
+            self.records[tp].append(
+                SimpleNamespace(
+                    topic=topic,
+                    partition=tp.partition,
+                    offset=len(self.records[tp]),
+                    value=value.encode("utf-8"),
+                    headers=[],
+                )
+            )
+        self.positions = {tp: 0 for tp in self.partitions}
+
+    def __iter__(self):
+        for tp in self.partitions:
+            yield from self.records[tp]
+
+    def poll(self, timeout_ms=0, max_records=500):
+        batches = {}
+        per_partition = max(max_records // len(self.partitions), 1)
+        for tp in self.partitions:
+            position = self.positions[tp]
+            batch = self.records[tp][position : position + per_partition]
+            if batch:
+                batches[tp] = batch
+                self.positions[tp] += len(batch)
+        if not batches:
+            self.stop.set()
+        return batches
+
+    def commit(self, offsets=None):
+        pass
+
+    def seek(self, partition, offset):
+        self.positions[partition] = offset
+
+    def assignment(self):
+        return set(self.partitions)
+
+    def highwater(self, partition):
+        return len(self.records[partition])
+
+    def committed(self, partition):
+        return None
+
+    def position(self, partition):
+        return self.positions[partition]
+
+    def close(self):
+        pass
+
+
+def run(args, workers: int) -> float:
+    """Return messages per second; ``workers`` 0 means ``consume_messages``."""
+    with patch.object(KafkaManager, "_create_producer", return_value=None):
+        manager = KafkaManager("stub:9092", "benchmark")
+    stop = threading.Event()
+    manager.consumers["metrics"] = StubConsumer(
+        "metrics", args.partitions, args.messages, stop
+    )
+    count = 0
+
+    def handler(values):
+        nonlocal count
+        time.sleep(args.latency)
+        count += len(values) if isinstance(values, list) else 1
+
+    started = time.perf_counter()
+    if workers == 0:
+        manager.consume_messages("metrics", handler)
+    else:
+        manager.consume_batches(
+            "metrics", handler, max_records=args.max_records, workers=workers, stop=stop
+        )
+    elapsed = time.perf_counter() - started
+    assert count == args.messages, count
+    return args.messages / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--partitions", type=int, default=8)
+    parser.add_argument("--max-records", type=int, default=2000)
+    parser.add_argument(
+        "--latency", type=float, default=0.001, help="Seconds per handler call"
+    )
+    args = parser.parse_args()
+
+    results = [
+        ("per message", run(args, 0)),
+        ("batches", run(args, 1)),
+        (f"batches x{args.partitions}", run(args, args.partitions)),
+    ]
+
+    print(f"{args.partitions} partitions, {args.latency * 1e3:.1f} ms per handler call")
+    print(f"{'mode':<14} {'msg/s':>10} {'speedup':>8}")
+    for mode, rate in results:
+        print(f"{mode:<14} {rate:>10.0f} {rate / results[0][1]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Benchmark KafkaManager producer modes against a stub broker.
+
+The stub stands in for the Kafka client and broker: sends are serialized
+and accumulated like kafka-python's record accumulator, and a sender thread
+ships a request once ``batch_size`` messages are queued, ``linger_ms`` has
+passed or a flush is requested, paying ``--rtt`` seconds per request.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.streaming.kafka_manager import (  # noqa: E402
+    THROUGHPUT_PRODUCER_CONFIG,
+    KafkaManager,
+)
+
+
+class StubFuture:
+    """Delivery future with kafka-python's callback interface."""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._callbacks = []
+        self._errbacks = []
+        self._lock = threading.Lock()
+
+    def add_callback(self, callback):
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return self
+        callback(None)
+        return self
+
+    def add_errback(self, errback):
+        with self._lock:
+            if not self._done.is_set():
+                self._errbacks.append(errback)
+        return self
+
+    def get(self, timeout=None):
+        self._done.wait(timeout)
+
+    def succeed(self):
+        with self._lock:
+            self._done.set()
+            callbacks = self._callbacks
+        for callback in callbacks:
+            callback(None)
+
+
+class StubProducer:
+    """Accumulates sends and delivers them in requests of one round trip."""
+
+    def __init__(self, rtt: float, linger_ms: float = 0, batch_size: int = 1):
+        self.rtt = rtt
+        self.linger = linger_ms / 1000.0
+        self.batch_size = batch_size
+        self.requests = 0
+        self._pending = []
+        self._in_request = 0
+        self._cond = threading.Condition()
+        self._flush_requested = False
+        self._closed = False
+        threading.Thread(target=self._sender, daemon=True).start()
+
+    def send(self, topic, value=None, headers=None):
+        payload = json.dumps(value).encode("utf-8")
+        future = StubFuture()
+        with self._cond:
+            self._pending.append((payload, future))
+            self._cond.notify_all()
+        return future
+
+    def flush(self, timeout=None):
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            self._cond.wait_for(
+                lambda: not self._pending and not self._in_request, timeout
+            )
+            self._flush_requested = False
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _sender(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if self._closed:
+                    return
+                deadline = time.monotonic() + self.linger
+                self._cond.wait_for(
+                    lambda: len(self._pending) >= self.batch_size
+                    or self._flush_requested,
+                    max(deadline - time.monotonic(), 0),
+                )
+                batch = self._pending[: self.batch_size]
+                del self._pending[: self.batch_size]
+                self._in_request = len(batch)
+            time.sleep(self.rtt)
+            self.requests += 1
+            for _, future in batch:
+                future.succeed()
+            with self._cond:
+                self._in_request = 0
+                self._cond.notify_all()
+
+
+def run(mode: str, producer: StubProducer, messages, batch: int) -> float:
+    """Return messages per second sending ``messages`` in batches."""
+    with patch.object(KafkaManager, "_create_producer", return_value=producer):
+        manager = KafkaManager("stub:9092", "benchmark", mode=mode)
+    started = time.perf_counter()
+    if mode == "reliable":
+        for message in messages:
+            manager.send_message("cloud-pioneer-metrics", message)
+    else:
+        for start in range(0, len(messages), batch):
+            manager.send_batch("cloud-pioneer-metrics", messages[start : start + batch])
+    elapsed = time.perf_counter() - started
+    stats = manager.get_delivery_stats()
+    assert stats["delivered"] == len(messages), stats
+    producer.close()
+    return len(messages) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--rtt", type=float, default=0.001, help="Seconds per request")
+    parser.add_argument("--batch", type=int, default=5000, help="Messages per flush")
+    parser.add_argument(
+        "--batch-size", type=int, default=2000, help="Messages per stub request"
+    )
+    args = parser.parse_args()
+
+    messages = [
+        {
+            "name": "system.cpu.utilization",
+            "value": float(i),
+            "tags": {"host": f"web-{i % 50}"},
+            "timestamp": 1700000000.0 + i,
+            "source": "system",
+        }
+        for i in range(args.messages)
+    ]
+    # One round trip per message makes reliable mode slow; sample it
+    reliable_messages = messages[: max(args.messages // 20, 1)]
+
+    reliable = StubProducer(args.rtt)
+    throughput = StubProducer(
+        args.rtt, THROUGHPUT_PRODUCER_CONFIG["linger_ms"], args.batch_size
+    )
+    results = (
+        ("reliable", run("reliable", reliable, reliable_messages, args.batch)),
+        ("throughput", run("throughput", throughput, messages, args.batch)),
+    )
+
+    print(f"stub broker, {args.rtt * 1e3:.1f} ms per request")
+    print(f"{'mode':<12} {'msg/s':>10} {'speedup':>8}")
+    for mode, rate in results:
+        print(f"{mode:<12} {rate:>10.0f} {rate / results[0][1]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
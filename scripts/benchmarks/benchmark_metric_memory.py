@@ -0,0 +1,122 @@
+"""Benchmark memory and allocations of agent metric representations.
+
+Builds the same points, shaped like Docker collector output (five metrics
+per container and cycle, with one tag dict per container and cycle), as plain per-instance-dict objects with a
+fresh tag dict each (the previous ``Metric``), as slotted ``Metric`` objects
+with interned tags, and as one ``MetricBatch``. Retained memory and the
+number of live allocations are measured with tracemalloc; build time is
+measured separately, without tracing.
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.agent.models import Metric, MetricBatch  # noqa: E402
+
+METRIC_NAMES = (
+    "docker.cpu.usage_percent",
+    "docker.memory.usage_bytes",
+    "docker.memory.usage_percent",
+    "docker.network.rx_bytes",
+    "docker.network.tx_bytes",
+)
+
+
+class DictMetric:
+    """The agent's previous metric model, with a per-instance __dict__."""
+
+    def __init__(self, name, value, tags=None, timestamp=None, source=None):
+        self.name = name
+        self.value = value
+        self.tags = tags or {}
+        self.timestamp = timestamp
+        self.source = source
+
+
+def container_tags(container: int):
+    return {"container_name": f"app-{container}", "image": "app:latest"}
+
+
+def build_dict_metrics(points: int, containers: int):
+    return [
+        DictMetric(
+            METRIC_NAMES[i % 5],
+            float(i),
+            container_tags(i // 5 % containers),
+            1700000000.0 + i,
+            "docker",
+        )
+        for i in range(points)
+    ]
+
+
+def build_slotted_metrics(points: int, containers: int):
+    return [
+        Metric(
+            METRIC_NAMES[i % 5],
+            float(i),
+            container_tags(i // 5 % containers),
+            1700000000.0 + i,
+            "docker",
+        )
+        for i in range(points)
+    ]
+
+
+def build_batch(points: int, containers: int):
+    batch = MetricBatch()
+    tags = None
+    for i in range(points):
+        if i % 5 == 0:
+            # One tag dict per container, as the collectors build them
+            tags = container_tags(i // 5 % containers)
+        batch.append(METRIC_NAMES[i % 5], float(i), tags, 1700000000.0 + i, "docker")
+    return batch
+
+
+def measure(build, points: int, containers: int):
+    """Return retained bytes, live allocations and build seconds."""
+    started = time.perf_counter()
+    build(points, containers)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    result = build(points, containers)
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = snapshot.compare_to(baseline, "filename")
+    size = sum(stat.size_diff for stat in stats)
+    blocks = sum(stat.count_diff for stat in stats)
+    del result
+    return size, blocks, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--containers", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.points} points from {args.containers} containers")
+    print(f"{'model':<16} {'MB':>8} {'B/point':>8} {'allocs':>10} {'build ms':>9}")
+    for name, build in (
+        ("dict Metric", build_dict_metrics),
+        ("slotted Metric", build_slotted_metrics),
+        ("MetricBatch", build_batch),
+    ):
+        size, blocks, elapsed = measure(build, args.points, args.containers)
+        print(
+            f"{name:<16} {size / 1e6:>8.2f} {size / args.points:>8.1f} "
+            f"{blocks:>10} {elapsed * 1e3:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark weekly pattern analysis: DataFrame groupbys against the 7x24 engine.
+
+Each resource has ``--days`` of hourly means. The groupby path is the
+previous TrendAnalyzer implementation, one DataFrame and five groupbys
+per resource; the engine bins the whole fleet in one ``np.add.at`` pass.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.analysis.patterns import DAY_NAMES, fleet_pattern_reports  # noqa: E402
+
+
+def groupby_report(timestamps: np.ndarray, values: np.ndarray) -> dict:
+    """The analysis as TrendAnalyzer computed it before the engine."""
+    df = pd.DataFrame(
+        {"_value": values}, index=pd.to_datetime(timestamps, unit="s", utc=True)
+    )
+    df["hour"] = df.index.hour
+    df["day_of_week"] = df.index.dayofweek
+    cells = df.groupby(["day_of_week", "hour"])["_value"].mean()
+    daily = df.groupby("day_of_week")["_value"].mean()
+    hourly = df.groupby("hour")["_value"].mean()
+    recommendations = []
+    low_days = daily[daily < 20].index
+    if len(low_days) > 0:
+        days = ", ".join(DAY_NAMES[d] for d in low_days)
+        recommendations.append(f"Consider scaling down resources on {days}")
+    low_hours = df.groupby("hour")["_value"].mean()
+    low_hours = low_hours[low_hours < 20].index
+    if len(low_hours) > 0:
+        hours = ", ".join(f"{h:02d}:00" for h in low_hours)
+        recommendations.append(f"Consider scaling down resources during hours: {hours}")
+    return {
+        "patterns": {
+            "hourly_avg": hourly.to_dict(),
+            "daily_avg": df.groupby("day_of_week")["_value"].mean().to_dict(),
+            "variability": df["_value"].std(),
+        },
+        "idle_periods": [
+            {"day_of_week": d, "hour": h, "avg_utilization": v}
+            for (d, h), v in cells.items()
+            if v < 20
+        ],
+        "peak_periods": [
+            {"day_of_week": d, "hour": h, "avg_utilization": v}
+            for (d, h), v in df.groupby(["day_of_week", "hour"])["_value"]
+            .mean()
+            .items()
+            if v > 80
+        ],
+        "recommendations": recommendations,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resources", type=int, default=500)
+    parser.add_argument("--days", type=int, default=30)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    timestamps = 1700438400 + np.arange(args.days * 24) * 3600
+    series = [rng.uniform(0, 100, len(timestamps)) for _ in range(args.resources)]
+    ids = [f"i-{r}" for r in range(args.resources)]
+
+    started = time.perf_counter()
+    expected = {i: groupby_report(timestamps, v) for i, v in zip(ids, series)}
+    groupby_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    reports = fleet_pattern_reports(ids, [timestamps] * len(ids), series)
+    engine_time = time.perf_counter() - started
+
+    for resource_id in ids:
+        assert reports[resource_id]["recommendations"] == (
+            expected[resource_id]["recommendations"]
+        )
+        assert len(reports[resource_id]["peak_periods"]) == len(
+            expected[resource_id]["peak_periods"]
+        )
+
+    print(f"{args.resources} resources, {args.days} days of hourly means each")
+    print(f"{'path':<10} {'seconds':>8} {'speedup':>8}")
+    print(f"{'groupby':<10} {groupby_time:>8.3f} {1.0:>7.1f}x")
+    print(f"{'engine':<10} {engine_time:>8.3f} {groupby_time / engine_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Benchmark ResourceMetricsCollector with the procfs engine and with psutil."""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.agent.collectors.procfs import procfs_available  # noqa: E402
+from src.agent.collectors.resource_metrics import (  # noqa: E402
+    ResourceMetricsCollector,
+)
+
+
+def time_collection(collector: ResourceMetricsCollector, repeat: int) -> float:
+    """Return mean CPU seconds per collect_snapshot call."""
+    collector.collect_snapshot()  # warm up
+    start = time.process_time()
+    for _ in range(repeat):
+        collector.collect_snapshot()
+    return (time.process_time() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=500, help="Collections per path")
+    args = parser.parse_args()
+
+    if not procfs_available():
+        print("procfs is not available on this host")
+        return
+
+    psutil_time = time_collection(
+        ResourceMetricsCollector(use_procfs=False), args.repeat
+    )
+    procfs_time = time_collection(ResourceMetricsCollector(), args.repeat)
+
+    print(f"{args.repeat} collections, agent CPU time per collection")
+    print(f"{'path':<8} {'ms':>8} {'speedup':>8}")
+    print(f"{'psutil':<8} {psutil_time * 1e3:>8.3f} {1.0:>7.1f}x")
+    print(f"{'procfs':<8} {procfs_time * 1e3:>8.3f} {psutil_time / procfs_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark the streaming detector against the 100k points/s ingest target.
+
+Points are fed in batches of ``--batch`` the way ``consume_batches`` hands
+them over, for each fleet size in ``--series``: a single series, as in a
+backfill, up to many series each with a point or less per batch. Points
+of a series are ten seconds apart. The array path calls ``update``
+directly; the records path starts from metric dicts as they arrive on
+the metrics topic. Delay is the time from the start of a batch's
+processing until its events are returned.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.streaming.detector import StreamingDetector  # noqa: E402
+
+TARGET = 100_000
+
+
+def make_points(series: int, points: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    ids = np.arange(points) % series
+    resource_ids = [f"i-{i // 2}" for i in ids]
+    names = ["cpu_utilization" if i % 2 else "memory_utilization" for i in ids]
+    values = np.clip(rng.normal(50, 10, points), 0, 100)
+    # Every hundredth series runs hot, to exercise scale events
+    values[ids % 100 == 0] += 40
+    values = np.clip(values, 0, 100)
+    timestamps = 1700000000.0 + (np.arange(points) // series) * 10.0
+    return resource_ids, names, values, timestamps
+
+
+def run(detector: StreamingDetector, batches, records: bool):
+    delays = []
+    events = 0
+    started = time.perf_counter()
+    for batch in batches:
+        batch_started = time.perf_counter()
+        if records:
+            events += len(detector.process_records(batch))
+        else:
+            events += len(detector.update(*batch))
+        delays.append(time.perf_counter() - batch_started)
+    return time.perf_counter() - started, events, max(delays)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--series", default="1,10,100,10000")
+    parser.add_argument("--points", type=int, default=500_000)
+    parser.add_argument("--batch", type=int, default=5_000)
+    args = parser.parse_args()
+
+    print(
+        f"{args.points} points in batches of {args.batch}; target {TARGET:,} points/s"
+    )
+    print(
+        f"{'series':>7} {'path':<8} {'points/s':>11} {'events':>7} {'max delay ms':>13}"
+    )
+    below = []
+    for series in map(int, args.series.split(",")):
+        resource_ids, names, values, timestamps = make_points(series, args.points)
+        arrays = [
+            (
+                resource_ids[i : i + args.batch],
+                names[i : i + args.batch],
+                values[i : i + args.batch],
+                timestamps[i : i + args.batch],
+            )
+            for i in range(0, args.points, args.batch)
+        ]
+        records = [
+            [
+                {
+                    "name": n,
+                    "value": float(v),
+                    "tags": {"resource_id": r},
+                    "timestamp": t,
+                }
+                for r, n, v, t in zip(*batch)
+            ]
+            for batch in arrays
+        ]
+        for label, batches, as_records in (
+            ("arrays", arrays, False),
+            ("records", records, True),
+        ):
+            elapsed, events, delay = run(StreamingDetector(), batches, as_records)
+            rate = args.points / elapsed
+            print(
+                f"{series:>7} {label:<8} {rate:>11,.0f} {events:>7} "
+                f"{delay * 1000:>13.1f}"
+            )
+            if rate < TARGET:
+                below.append(f"{series} series, {label}")
+    if below:
+        print(f"Below {TARGET:,} points/s: {'; '.join(below)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -30,10 +30,18 @@ def generate_metrics(start_time: datetime, num_points: int = 24) -> list:
 
 
 def submit_metrics(metrics_data: list) -> None:
-    """Submit metrics to the API."""
-    for metrics in metrics_data:
-        response = requests.post(f"{BASE_URL}/metrics", json=metrics)
-        print(f"Submitted metrics for {metrics['timestamp']}: {response.json()}")
+    """Submit metrics to the API in a single NDJSON bulk request."""
+    body = "\n".join(json.dumps(metrics) for metrics in metrics_data)
+    response = requests.post(
+        f"{BASE_URL}/metrics/bulk",
+        data=body.encode("utf-8"),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    result = response.json()
+    print(
+        f"Submitted {len(metrics_data)} metrics: "
+        f"{result.get('accepted')} accepted, {len(result.get('rejected', []))} rejected"
+    )
 
 
 def schedule_actions() -> None:
@@ -7,6 +7,7 @@ from .agent import MonitoringAgent
 from .backends.aws import AWSBackend
 from .backends.azure import AzureBackend
 from .backends.gcp import GCPBackend
+from .collectors.cgroup import CgroupCollector
 from .collectors.docker import DockerCollector
 from .collectors.mysql import MySQLCollector
 from .collectors.system import SystemMetricsCollector
@@ -44,8 +45,12 @@ def main():
         if agent.config["collectors"]["mysql"]["enabled"]:
             agent.register_collector("mysql", MySQLCollector(agent.config))
 
-        if agent.config["collectors"]["docker"]["enabled"]:
-            agent.register_collector("docker", DockerCollector(agent.config))
+        docker_config = agent.config["collectors"]["docker"]
+        if docker_config["enabled"]:
+            if docker_config.get("stats_source", "api") == "cgroup":
+                agent.register_collector("docker", CgroupCollector(agent.config))
+            else:
+                agent.register_collector("docker", DockerCollector(agent.config))
 
         # Register backends
         if agent.config["backends"]["aws"]["enabled"]:
@@ -6,10 +6,15 @@ import os
 import threading
 import time
 from queue import Queue
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
-from .backends.base import BaseBackend
-from .models import Metric
+from .backends.base import BaseBackend, MetricBackend
+from .models import Metric, MetricBatch
+from .scheduler import CollectorScheduler
+from .shipping import MetricShipper
+from .spool import MetricSpool
+
+SPOOL_OPTIONS = ("max_bytes", "segment_bytes", "fsync_records", "fsync_interval")
 
 
 class BaseCollector:
@@ -20,8 +25,8 @@ class BaseCollector:
         self.config = agent_config
         self.logger = logging.getLogger(self.__class__.__name__)
 
-    def collect(self) -> List[Metric]:
-        """Collect metrics."""
+    def collect(self) -> MetricBatch:
+        """Collect metrics, as a ``MetricBatch`` or a list of ``Metric``."""
         raise NotImplementedError
 
 
@@ -32,7 +37,11 @@ class MonitoringAgent:
         """Initialize agent."""
         self.config = self._load_config(config_path)
         self.collectors: Dict[str, BaseCollector] = {}
+        self.backends: Dict[str, MetricBackend] = {}
+        # Holds one MetricBatch per collection run
         self.metrics_queue = Queue()
+        self._queued_metrics = 0
+        self._queued_lock = threading.Lock()
         self.running = False
         self.logger = logging.getLogger("MonitoringAgent")
 
@@ -40,6 +49,22 @@ class MonitoringAgent:
         agent_config = self.config.get("agent", {})
         self.collection_interval = agent_config.get("collection_interval", 60)
         self.shipping_interval = agent_config.get("shipping_interval", 10)
+        self.shipper = MetricShipper(**agent_config.get("shipping", {}))
+        self.scheduler = CollectorScheduler(
+            self._enqueue, max_workers=agent_config.get("collector_workers", 4)
+        )
+
+        # Optional on-disk overflow for when backends cannot keep up
+        spool_config = agent_config.get("spool", {})
+        self.spool: Optional[MetricSpool] = None
+        if spool_config.get("enabled", False):
+            self.spool = MetricSpool(
+                spool_config.get("path", "/var/lib/cloud-pioneer/spool"),
+                **{k: spool_config[k] for k in SPOOL_OPTIONS if k in spool_config},
+            )
+        self.queue_high_water_mark = spool_config.get("high_water_mark", 10000)
+        self.replay_batch_size = spool_config.get("replay_batch_size", 1000)
+        self.max_pending_batches = spool_config.get("max_pending_batches", 10)
 
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """Load configuration from file."""
@@ -47,17 +72,27 @@ class MonitoringAgent:
             return json.load(f)
 
     def register_collector(self, name: str, collector: BaseCollector):
-        """Register a collector."""
+        """Register a collector on its configured interval and timeout."""
+        collector_config = self.config.get("collectors", {}).get(name, {})
+        interval = collector_config.get("interval", self.collection_interval)
         self.collectors[name] = collector
-        self.logger.info(f"Registered collector: {name}")
+        self.scheduler.add(
+            name, collector, interval, timeout=collector_config.get("timeout")
+        )
+        self.logger.info(f"Registered collector: {name} (every {interval}s)")
+
+    def register_backend(self, name: str, backend: MetricBackend):
+        """Register a metric backend."""
+        self.backends[name] = backend
+        self.shipper.add_backend(name, backend)
+        self.logger.info(f"Registered backend: {name}")
 
     def start(self):
         """Start the agent."""
         self.running = True
-        collection_thread = threading.Thread(target=self._collection_loop)
         shipping_thread = threading.Thread(target=self._shipping_loop)
 
-        collection_thread.start()
+        self.scheduler.start()
         shipping_thread.start()
 
         self.logger.info("Agent started")
@@ -65,36 +100,120 @@ class MonitoringAgent:
     def stop(self):
         """Stop the agent."""
         self.running = False
+        self.scheduler.stop()
+        self.shipper.close()
+        if self.spool is not None:
+            # Keep what is still queued in memory for the next run
+            self.spool.append(self._drain_queue())
+            self.spool.close()
         self.logger.info("Agent stopped")
 
-    def _collection_loop(self):
-        """Collection loop."""
-        while self.running:
-            try:
-                for name, collector in self.collectors.items():
-                    metrics = collector.collect()
-                    for metric in metrics:
-                        self.metrics_queue.put(metric)
-                time.sleep(self.collection_interval)
-            except Exception as e:
-                self.logger.error(f"Error in collection loop: {e}")
+    def get_shipping_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-backend shipping latency and failure counters."""
+        return self.shipper.get_stats()
+
+    def get_collector_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-collector run durations and missed deadlines."""
+        return self.scheduler.get_stats()
+
+    def get_spool_stats(self) -> Dict[str, Any]:
+        """Get spool size and replay lag."""
+        if self.spool is None:
+            return {}
+        return self.spool.get_stats()
+
+    def _enqueue(self, metrics: Iterable[Metric]):
+        """Queue metrics, overflowing to the spool past the high-water mark.
+
+        Once anything is spooled, new metrics follow it into the spool until
+        it has been replayed, so metrics are shipped in order.
+        """
+        if self.spool is not None and (
+            len(self.spool) or self._queued_metrics >= self.queue_high_water_mark
+        ):
+            self.spool.append(metrics)
+            return
+        batch = MetricBatch.from_metrics(metrics)
+        with self._queued_lock:
+            self._queued_metrics += len(batch)
+        self.metrics_queue.put(batch)
+
+    def _drain_queue(self) -> MetricBatch:
+        """Take everything queued as one batch."""
+        batches = []
+        while not self.metrics_queue.empty():
+            batch = self.metrics_queue.get()
+            with self._queued_lock:
+                self._queued_metrics -= len(batch)
+            batches.append(batch)
+        return MetricBatch.concat(batches)
+
+    def _spool_metrics(self) -> MetricBatch:
+        """Build the agent's own spool metrics."""
+        stats = self.spool.get_stats()
+        tags = self.config.get("tags", {})
+        batch = MetricBatch()
+        for name in ("records", "bytes", "replay_lag_seconds"):
+            batch.append(
+                f"agent.spool.{name}", float(stats[name]), tags, source="agent"
+            )
+        return batch
 
     def _shipping_loop(self):
         """Shipping loop."""
         while self.running:
             try:
-                metrics = []
-                while not self.metrics_queue.empty():
-                    metrics.append(self.metrics_queue.get())
+                if self.spool is not None:
+                    self._enqueue(self._spool_metrics())
+                    if self.shipper.pending_batches() >= self.max_pending_batches:
+                        # Backends are behind; let the queue overflow to disk
+                        time.sleep(self.shipping_interval)
+                        continue
+
+                metrics = self._drain_queue()
                 if metrics:
                     self._ship_metrics(metrics)
+                if self.spool is not None and self._replay_spool():
+                    # Out of time with the spool still draining; go again
+                    continue
                 time.sleep(self.shipping_interval)
             except Exception as e:
                 self.logger.error(f"Error in shipping loop: {e}")
 
-    def _ship_metrics(self, metrics: List[Metric]):
-        """Ship metrics to backend."""
+    def _replay_spool(self) -> bool:
+        """Ship spooled metrics until the spool is empty or a batch fails.
+
+        Each batch is acknowledged to the spool only once every backend has
+        accepted it, so a failed replay is retried on a later tick. Stops
+        after ``shipping_interval`` seconds, returning True if it did so
+        while replays were still succeeding.
+        """
+        deadline = time.monotonic() + self.shipping_interval
+        while self.running and len(self.spool):
+            if self.shipper.pending_batches() >= self.max_pending_batches:
+                return False
+            if time.monotonic() >= deadline:
+                return True
+            read = self.spool.peek(self.replay_batch_size)
+            if not read.metrics:
+                # Only a torn tail was left
+                self.spool.ack(read)
+                return False
+            # Spooled metrics are newer than anything queued in memory
+            futures = self.shipper.ship(read.metrics)
+            if not all(future.result() for future in futures):
+                self.logger.warning(
+                    f"Replay of {len(read.metrics)} spooled metrics failed; "
+                    f"keeping them spooled"
+                )
+                return False
+            self.spool.ack(read)
+        return False
+
+    def _ship_metrics(self, metrics: MetricBatch):
+        """Ship metrics to every registered backend."""
         self.logger.info(f"Shipping {len(metrics)} metrics")
+        self.shipper.ship(metrics)
 
 
 class ResourceAgent:
@@ -1,14 +1,21 @@
-from typing import Any, Dict, List
+import logging
+from typing import Any, Dict, Iterable, List
 
 import boto3
 
 from ..agent import Metric
+from ..models import metric_rows
 from .base import MetricBackend
 
 
 class AWSBackend(MetricBackend):
+    # PutMetricData limit
+    max_batch_size = 20
+
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
+        self.namespace = config.get("namespace", "CloudPioneer")
+        self.logger = logging.getLogger(__name__)
         self.cloudwatch = boto3.client(
             "cloudwatch",
             region_name=config.get("region", "us-east-1"),
@@ -16,25 +23,29 @@ class AWSBackend(MetricBackend):
             aws_secret_access_key=config.get("aws_secret_access_key"),
         )
 
-    def send_metrics(self, metrics: List[Metric]):
+    def send_metrics(self, metrics: Iterable[Metric]):
         metric_data = []
+        # Dimensions are built once per distinct tag set
+        dimensions: Dict[int, List[Dict[str, Any]]] = {}
 
-        for metric in metrics:
-            dimensions = [
-                {"Name": key, "Value": value} for key, value in metric.tags.items()
-            ]
+        for name, value, tags, timestamp, _ in metric_rows(metrics):
+            tag_dimensions = dimensions.get(id(tags))
+            if tag_dimensions is None:
+                tag_dimensions = dimensions[id(tags)] = [
+                    {"Name": key, "Value": tag} for key, tag in tags.items()
+                ]
 
             metric_data.append(
                 {
-                    "MetricName": metric.name,
-                    "Value": metric.value,
-                    "Timestamp": metric.timestamp,
-                    "Dimensions": dimensions,
+                    "MetricName": name,
+                    "Value": value,
+                    "Timestamp": timestamp,
+                    "Dimensions": tag_dimensions,
                     "Unit": "None",
                 }
             )
 
-            if len(metric_data) >= 20:  # CloudWatch limit
+            if len(metric_data) >= self.max_batch_size:
                 self._send_batch(metric_data)
                 metric_data = []
 
@@ -44,14 +55,15 @@ class AWSBackend(MetricBackend):
     def _send_batch(self, metric_data: List[Dict]):
         try:
             self.cloudwatch.put_metric_data(
-                Namespace="CloudPioneer", MetricData=metric_data
+                Namespace=self.namespace, MetricData=metric_data
             )
         except Exception as e:
             self.logger.error(f"Error sending metrics to CloudWatch: {e}")
+            raise
 
     def health_check(self) -> bool:
         try:
-            self.cloudwatch.list_metrics(Namespace="CloudPioneer", Limit=1)
+            self.cloudwatch.list_metrics(Namespace=self.namespace, Limit=1)
             return True
         except Exception:
             return False
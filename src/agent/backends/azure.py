@@ -1,10 +1,12 @@
+import logging
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable
 
 from azure.identity import DefaultAzureCredential
 from azure.monitor.ingestion import MetricsClient
 
 from ..agent import Metric
+from ..models import metric_rows
 from .base import MetricBackend
 
 
@@ -18,16 +20,16 @@ class AzureBackend(MetricBackend):
         )
         self.logger = logging.getLogger(__name__)
 
-    def send_metrics(self, metrics: List[Metric]):
+    def send_metrics(self, metrics: Iterable[Metric]):
         try:
             metric_data = []
-            for metric in metrics:
+            for name, value, tags, timestamp, _ in metric_rows(metrics):
                 metric_data.append(
                     {
-                        "name": metric.name,
-                        "value": metric.value,
-                        "time": datetime.fromtimestamp(metric.timestamp).isoformat(),
-                        "dimensions": metric.tags,
+                        "name": name,
+                        "value": value,
+                        "time": datetime.fromtimestamp(timestamp).isoformat(),
+                        "dimensions": tags,
                     }
                 )
 
@@ -37,6 +39,7 @@ class AzureBackend(MetricBackend):
                 )
         except Exception as e:
             self.logger.error(f"Error sending metrics to Azure Monitor: {e}")
+            raise
 
     def health_check(self) -> bool:
         try:
@@ -1,13 +1,19 @@
 """Base backend classes."""
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from ..models import Metric
 
 
 class MetricBackend(ABC):
-    """Base metric backend class."""
+    """Base metric backend class.
+
+    ``send_metrics`` raises on failure so the shipper can retry. The shipper
+    splits batches to ``max_batch_size`` metrics; None means one write.
+    """
+
+    max_batch_size: Optional[int] = None
 
     def __init__(self, config: Dict[str, Any]):
         """Initialize backend."""
@@ -15,7 +21,7 @@ class MetricBackend(ABC):
 
     @abstractmethod
     def send_metrics(self, metrics: List[Metric]):
-        """Send metrics to backend."""
+        """Send metrics to backend, raising on failure."""
         pass
 
     @abstractmethod
@@ -1,14 +1,18 @@
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable
 
 from google.api import label_pb2, metric_pb2
 from google.cloud import monitoring_v3
 
 from ..agent import Metric
+from ..models import metric_rows
 from .base import MetricBackend
 
 
 class GCPBackend(MetricBackend):
+    # create_time_series accepts up to 200 series per request
+    max_batch_size = 200
+
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.project_name = config["project_name"]
@@ -16,31 +20,44 @@ class GCPBackend(MetricBackend):
         self.project_path = f"projects/{self.project_name}"
         self.logger = logging.getLogger(__name__)
 
-    def send_metrics(self, metrics: List[Metric]):
+    def send_metrics(self, metrics: Iterable[Metric]):
         try:
-            for metric in metrics:
+            series_list = []
+            # Labels are built once per distinct tag set
+            labels: Dict[int, Dict[str, str]] = {}
+            for name, value, tags, timestamp, _ in metric_rows(metrics):
                 series = monitoring_v3.TimeSeries()
-                series.metric.type = f"custom.googleapis.com/{metric.name}"
+                series.metric.type = f"custom.googleapis.com/{name}"
 
                 # Add labels (tags)
-                for key, value in metric.tags.items():
-                    series.metric.labels[key] = str(value)
+                tag_labels = labels.get(id(tags))
+                if tag_labels is None:
+                    tag_labels = labels[id(tags)] = {
+                        key: str(tag) for key, tag in tags.items()
+                    }
+                series.metric.labels.update(tag_labels)
 
                 # Add resource
                 series.resource.type = "global"
 
                 # Create the data point
                 point = monitoring_v3.Point()
-                point.value.double_value = float(metric.value)
-                point.interval.end_time.seconds = int(metric.timestamp)
+                point.value.double_value = float(value)
+                point.interval.end_time.seconds = int(timestamp)
                 series.points = [point]
+                series_list.append(series)
 
-                # Write the time series data
+            # Write the time series data
+            for start in range(0, len(series_list), self.max_batch_size):
                 self.client.create_time_series(
-                    request={"name": self.project_path, "time_series": [series]}
+                    request={
+                        "name": self.project_path,
+                        "time_series": series_list[start : start + self.max_batch_size],
+                    }
                 )
         except Exception as e:
             self.logger.error(f"Error sending metrics to Google Cloud Monitoring: {e}")
+            raise
 
     def health_check(self) -> bool:
         try:
@@ -0,0 +1,50 @@
+"""InfluxDB line protocol formatting."""
+
+import math
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+# Line protocol escaping for measurements, and for tag keys and values
+MEASUREMENT_ESCAPES = str.maketrans({",": r"\,", " ": r"\ "})
+TAG_ESCAPES = str.maketrans({",": r"\,", "=": r"\=", " ": r"\ "})
+
+
+def tag_string(tags: Dict[str, Any]) -> str:
+    """Escaped ``,key=value`` pairs, sorted by key as InfluxDB prefers."""
+    return "".join(
+        f",{str(key).translate(TAG_ESCAPES)}={str(value).translate(TAG_ESCAPES)}"
+        for key, value in sorted(tags.items())
+        if value is not None and value != ""
+    )
+
+
+def format_lines(
+    rows: Iterable[Tuple[str, float, Dict[str, Any], float, Optional[str]]],
+    extra_tags: Optional[Dict[str, Any]] = None,
+) -> Iterator[str]:
+    """Yield one line per ``(name, value, tags, timestamp, source)`` row.
+
+    Timestamps are epoch seconds, written with nanosecond precision. Each
+    tag dict is escaped once however many rows share it. ``int`` values
+    are written as integer fields, as ``influxdb_client.Point`` writes
+    them, so they match the field type of existing series. NaN and
+    infinite values cannot be written and their rows are skipped.
+    """
+    tag_strings: Dict[int, str] = {}
+    for name, value, tags, timestamp, _ in rows:
+        if type(value) is int:
+            field = f"{value}i"
+        else:
+            value = float(value)
+            if not math.isfinite(value):
+                continue
+            field = repr(value)
+        tags_id = id(tags)
+        line_tags = tag_strings.get(tags_id)
+        if line_tags is None:
+            line_tags = tag_strings[tags_id] = tag_string(
+                {**tags, **extra_tags} if extra_tags else tags
+            )
+        yield (
+            f"{name.translate(MEASUREMENT_ESCAPES)}{line_tags} "
+            f"value={field} {int(timestamp * 1e9)}"
+        )
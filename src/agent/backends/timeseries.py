@@ -1,14 +1,19 @@
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable
 
 import influxdb_client
 from influxdb_client.client.write_api import SYNCHRONOUS
 
 from ..agent import Metric
+from ..models import metric_rows
 from .base import MetricBackend
+from .line_protocol import format_lines
 
 
 class TimeSeriesBackend(MetricBackend):
+    # Line protocol writes are cheapest as one large request
+    max_batch_size = None
+
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.client = influxdb_client.InfluxDBClient(
@@ -18,25 +23,15 @@ class TimeSeriesBackend(MetricBackend):
         self.write_api = self.client.write_api(write_options=SYNCHRONOUS)
         self.logger = logging.getLogger(__name__)
 
-    def send_metrics(self, metrics: List[Metric]):
+    def send_metrics(self, metrics: Iterable[Metric]):
         try:
-            points = []
-            for metric in metrics:
-                point = (
-                    influxdb_client.Point(metric.name)
-                    .time(int(metric.timestamp * 1e9))
-                    .field("value", metric.value)
-                )
-
-                # Add tags
-                for key, value in metric.tags.items():
-                    point = point.tag(key, value)
-
-                points.append(point)
-
-            self.write_api.write(bucket=self.bucket, record=points)
+            # Line protocol is written directly rather than through Point
+            # objects
+            lines = format_lines(metric_rows(metrics))
+            self.write_api.write(bucket=self.bucket, record="\n".join(lines))
         except Exception as e:
             self.logger.error(f"Error sending metrics to InfluxDB: {e}")
+            raise
 
     def health_check(self) -> bool:
         try:
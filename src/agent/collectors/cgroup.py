@@ -0,0 +1,287 @@
+"""Container metrics read directly from cgroup v2.
+
+Instead of asking the Docker daemon for stats, this collector reads each
+container's ``cpu.stat``, ``memory.current``, ``io.stat`` and pressure
+files under ``/sys/fs/cgroup``, and its network counters from
+``/proc/<pid>/net/dev``. The daemon is only used to map containers to
+cgroups: one ``containers.list()`` is cached and refreshed when a
+container event arrives. Metric names match ``DockerCollector``.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import docker
+
+from ..agent import BaseCollector
+from ..models import MetricBatch
+from .docker import ImageTagCache
+
+# Container events that change which cgroups exist or what they are called
+REFRESH_EVENTS = {"start", "die", "destroy", "rename", "restart"}
+PRESSURE_RESOURCES = ("cpu", "memory", "io")
+
+
+def cgroup_v2_available(root: str = "/sys/fs/cgroup") -> bool:
+    """Return True if ``root`` is a cgroup v2 (unified) hierarchy."""
+    return os.path.exists(os.path.join(root, "cgroup.controllers"))
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _parse_flat_keyed(data: str) -> Dict[str, int]:
+    """Parse ``key value`` lines such as ``cpu.stat``."""
+    values = {}
+    for line in data.splitlines():
+        key, _, value = line.partition(" ")
+        if value:
+            values[key] = int(value)
+    return values
+
+
+def _parse_io_stat(data: str) -> Dict[str, int]:
+    """Sum ``rbytes``, ``wbytes``, ``rios`` and ``wios`` over all devices."""
+    totals = {"rbytes": 0, "wbytes": 0, "rios": 0, "wios": 0}
+    for line in data.splitlines():
+        for field in line.split()[1:]:
+            key, _, value = field.partition("=")
+            if key in totals:
+                totals[key] += int(value)
+    return totals
+
+
+def _parse_pressure(data: str) -> Dict[str, float]:
+    """Parse PSI lines into ``some_avg10``, ``full_avg10`` and so on."""
+    values = {}
+    for line in data.splitlines():
+        kind, *fields = line.split()
+        for field in fields:
+            key, _, value = field.partition("=")
+            if key.startswith("avg"):
+                values[f"{kind}_{key}"] = float(value)
+    return values
+
+
+def _parse_net_dev(data: str) -> Dict[str, Dict[str, int]]:
+    """Per-interface rx/tx bytes, without loopback as ``docker stats`` does."""
+    interfaces = {}
+    # The first two lines are headers
+    for line in data.splitlines()[2:]:
+        name, sep, counters = line.partition(":")
+        name = name.strip()
+        if not sep or name == "lo":
+            continue
+        fields = counters.split()
+        interfaces[name] = {"rx_bytes": int(fields[0]), "tx_bytes": int(fields[8])}
+    return interfaces
+
+
+class _CgroupContainer:
+    """A container's cgroup directory, pid and previous CPU reading."""
+
+    __slots__ = ("name", "image", "path", "pid", "cpu_usage", "cpu_time")
+
+    def __init__(self, name: str, image: str, path: str, pid: int):
+        self.name = name
+        self.image = image
+        self.path = path
+        self.pid = pid
+        self.cpu_usage: Optional[int] = None
+        self.cpu_time = 0.0
+
+
+class CgroupCollector(BaseCollector):
+    """Docker container metrics from cgroup v2 files instead of the API."""
+
+    def __init__(self, agent_config: Dict[str, Any]):
+        super().__init__(agent_config)
+        self.docker_client = docker.from_env()
+        docker_config = agent_config.get("collectors", {}).get("docker", {})
+        self.container_include = docker_config.get("include_containers", [])
+        self.container_exclude = docker_config.get("exclude_containers", [])
+        self.cgroup_root = docker_config.get("cgroup_root", "/sys/fs/cgroup")
+        self.proc_root = docker_config.get("proc_root", "/proc")
+        # Safety net in case an event is missed
+        self.refresh_interval = docker_config.get("refresh_interval", 300)
+
+        self.cpu_count = os.cpu_count() or 1
+        self.host_memory = self._read_host_memory()
+        self._containers: Dict[str, _CgroupContainer] = {}
+        self._image_tags = ImageTagCache()
+        self._last_refresh = 0.0
+        self._stale = threading.Event()
+        self._stale.set()
+        self._closed = False
+        self._events = None
+        self._watcher = threading.Thread(
+            target=self._watch_events, name="cgroup-docker-events", daemon=True
+        )
+        self._watcher.start()
+
+    def collect(self) -> MetricBatch:
+        metrics = MetricBatch()
+        timestamp = time.time()
+
+        try:
+            if (
+                self._stale.is_set()
+                or time.monotonic() - self._last_refresh >= self.refresh_interval
+            ):
+                self._refresh_containers()
+
+            for container in list(self._containers.values()):
+                self._add_container_metrics(metrics, container, timestamp)
+
+        except Exception as e:
+            self.logger.error(f"Error collecting cgroup container metrics: {e}")
+
+        return metrics
+
+    def close(self) -> None:
+        self._closed = True
+        if self._events is not None:
+            self._events.close()
+
+    def _watch_events(self) -> None:
+        """Mark the container map stale whenever a container event arrives."""
+        while not self._closed:
+            try:
+                self._events = self.docker_client.events(
+                    decode=True, filters={"type": "container"}
+                )
+                for event in self._events:
+                    if event.get("Action", event.get("status")) in REFRESH_EVENTS:
+                        self._stale.set()
+            except Exception as e:
+                if not self._closed:
+                    self.logger.warning(f"Docker event stream failed: {e}")
+            # Anything may have happened while the stream was down
+            self._stale.set()
+            time.sleep(1.0)
+
+    def _refresh_containers(self) -> None:
+        """Rebuild the container to cgroup map from one ``containers.list()``."""
+        self._stale.clear()
+        containers = {}
+        for container in self.docker_client.containers.list():
+            name = container.name
+            if self.container_exclude and name in self.container_exclude:
+                continue
+            if self.container_include and name not in self.container_include:
+                continue
+
+            pid = container.attrs.get("State", {}).get("Pid", 0)
+            path = self._cgroup_path(container.id, pid)
+            if path is None:
+                self.logger.warning(f"No cgroup v2 directory for container {name}")
+                continue
+
+            previous = self._containers.get(container.id)
+            if previous is not None and previous.path == path:
+                previous.name, previous.pid = name, pid
+                containers[container.id] = previous
+                continue
+            containers[container.id] = _CgroupContainer(
+                name, self._image_tags.get(container), path, pid
+            )
+
+        self._containers = containers
+        self._image_tags.prune(containers)
+        self._last_refresh = time.monotonic()
+
+    def _cgroup_path(self, container_id: str, pid: int) -> Optional[str]:
+        """Find the container's cgroup from its init process, or by name."""
+        candidates = []
+        membership = _read(os.path.join(self.proc_root, str(pid), "cgroup")) or ""
+        for line in membership.splitlines():
+            if line.startswith("0::"):
+                candidates.append(line[3:].strip().lstrip("/"))
+        # systemd and cgroupfs cgroup drivers
+        candidates.append(f"system.slice/docker-{container_id}.scope")
+        candidates.append(f"docker/{container_id}")
+
+        for candidate in candidates:
+            path = os.path.join(self.cgroup_root, candidate)
+            if os.path.exists(os.path.join(path, "cpu.stat")):
+                return path
+        return None
+
+    def _read_host_memory(self) -> int:
+        for line in (_read(os.path.join(self.proc_root, "meminfo")) or "").splitlines():
+            if line.startswith("MemTotal:"):
+                return int(line.split()[1]) * 1024
+        return 0
+
+    def _add_container_metrics(
+        self, metrics: MetricBatch, container: _CgroupContainer, timestamp: float
+    ) -> None:
+        tags = {"container_name": container.name, "image": container.image}
+        values: Dict[str, float] = {}
+
+        # CPU metrics, as a share of all host CPUs like the Docker API path
+        cpu_stat = _read(os.path.join(container.path, "cpu.stat"))
+        if cpu_stat is None:
+            # The container went away between refreshes
+            self._stale.set()
+            return
+        cpu = _parse_flat_keyed(cpu_stat)
+        now = time.monotonic()
+        usage = cpu.get("usage_usec", 0)
+        if container.cpu_usage is not None and now > container.cpu_time:
+            elapsed_usec = (now - container.cpu_time) * 1e6 * self.cpu_count
+            values["docker.cpu.usage_percent"] = (
+                max(usage - container.cpu_usage, 0) / elapsed_usec * 100.0
+            )
+        container.cpu_usage, container.cpu_time = usage, now
+        values["docker.cpu.throttled_usec"] = cpu.get("throttled_usec", 0)
+
+        # Memory metrics
+        memory_usage = int(_read(os.path.join(container.path, "memory.current")) or 0)
+        memory_max = (_read(os.path.join(container.path, "memory.max")) or "").strip()
+        memory_limit = int(memory_max) if memory_max.isdigit() else self.host_memory
+        values["docker.memory.usage_bytes"] = memory_usage
+        values["docker.memory.usage_percent"] = (
+            memory_usage / memory_limit * 100.0 if memory_limit > 0 else 0.0
+        )
+
+        # IO metrics
+        io_stat = _read(os.path.join(container.path, "io.stat"))
+        if io_stat is not None:
+            io = _parse_io_stat(io_stat)
+            values["docker.io.read_bytes"] = io["rbytes"]
+            values["docker.io.write_bytes"] = io["wbytes"]
+            values["docker.io.read_ops"] = io["rios"]
+            values["docker.io.write_ops"] = io["wios"]
+
+        # Pressure stall information
+        for resource in PRESSURE_RESOURCES:
+            pressure = _read(os.path.join(container.path, f"{resource}.pressure"))
+            if pressure is None:
+                continue
+            for key, value in _parse_pressure(pressure).items():
+                values[f"docker.pressure.{resource}.{key}"] = value
+
+        for name, value in values.items():
+            metrics.append(name, value, tags, timestamp, "docker")
+
+        # Network metrics from the container's network namespace
+        net_dev = _read(os.path.join(self.proc_root, str(container.pid), "net/dev"))
+        if net_dev is not None:
+            for interface, net_stats in _parse_net_dev(net_dev).items():
+                interface_tags = {**tags, "interface": interface}
+                for name in ("rx_bytes", "tx_bytes"):
+                    metrics.append(
+                        f"docker.network.{name}",
+                        net_stats[name],
+                        interface_tags,
+                        timestamp,
+                        "docker",
+                    )
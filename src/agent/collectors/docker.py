@@ -1,160 +1,236 @@
+import threading
 import time
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, Optional
 
 import docker
 
-from ..agent import BaseCollector, Metric
+from ..agent import BaseCollector
+from ..models import MetricBatch
+
+STATS_MODES = ("pool", "stream")
+
+
+class ImageTagCache:
+    """Image tag per container ID, such as ``nginx:latest``.
+
+    ``container.image`` is an API call, so each container's tag is looked
+    up once and kept until the container is pruned.
+    """
+
+    def __init__(self):
+        self._tags: Dict[str, str] = {}
+
+    def get(self, container) -> str:
+        """Return the first tag of the container's image, or "unknown"."""
+        tag = self._tags.get(container.id)
+        if tag is None:
+            try:
+                tags = container.image.tags
+                tag = tags[0] if tags else "unknown"
+            except Exception:
+                tag = "unknown"
+            self._tags[container.id] = tag
+        return tag
+
+    def prune(self, container_ids) -> None:
+        """Forget tags of containers not in ``container_ids``."""
+        for container_id in list(self._tags):
+            if container_id not in container_ids:
+                del self._tags[container_id]
+
+
+class _StatsStream:
+    """Persistent ``stream=True`` stats subscription keeping the latest frame."""
+
+    def __init__(self, container):
+        self.latest: Optional[Dict[str, Any]] = None
+        self.closed = False
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(container,),
+            name=f"docker-stats-{container.name}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self, container) -> None:
+        try:
+            for frame in container.stats(stream=True, decode=True):
+                if self.closed:
+                    break
+                self.latest = frame
+        except Exception:
+            pass
+        self.closed = True
+
+    def close(self) -> None:
+        # The reader thread exits on its next frame
+        self.closed = True
 
 
 class DockerCollector(BaseCollector):
     def __init__(self, agent_config: Dict[str, Any]):
         super().__init__(agent_config)
         self.docker_client = docker.from_env()
-        self.container_include = agent_config.get("docker", {}).get(
-            "include_containers", []
+        docker_config = agent_config.get("collectors", {}).get(
+            "docker", agent_config.get("docker", {})
         )
-        self.container_exclude = agent_config.get("docker", {}).get(
-            "exclude_containers", []
+        self.container_include = docker_config.get("include_containers", [])
+        self.container_exclude = docker_config.get("exclude_containers", [])
+
+        # "pool" fetches one-shot stats concurrently; "stream" keeps a
+        # subscription per container and reads its latest frame
+        self.stats_mode = docker_config.get("stats_mode", "pool")
+        if self.stats_mode not in STATS_MODES:
+            raise ValueError(f"Unknown Docker stats mode: {self.stats_mode}")
+        self.stats_timeout = docker_config.get("stats_timeout", 10)
+        self._executor = ThreadPoolExecutor(
+            max_workers=docker_config.get("stats_workers", 16),
+            thread_name_prefix="docker-stats",
         )
+        self._streams: Dict[str, _StatsStream] = {}
+        self._image_tags = ImageTagCache()
 
-    def collect(self) -> List[Metric]:
-        metrics = []
+    def collect(self) -> MetricBatch:
+        metrics = MetricBatch()
         timestamp = time.time()
 
         try:
-            # Collect container metrics
-            containers = self.docker_client.containers.list()
+            containers = [
+                container
+                for container in self.docker_client.containers.list()
+                if self._should_collect(container)
+            ]
+            self._prune({container.id for container in containers})
+
+            if self.stats_mode == "stream":
+                stats = self._latest_stream_stats(containers)
+            else:
+                stats = self._fetch_stats(containers)
 
             for container in containers:
-                # Skip if container should be excluded
-                if self.container_exclude and container.name in self.container_exclude:
-                    continue
-
-                # Skip if we have an include list and container is not in it
-                if (
-                    self.container_include
-                    and container.name not in self.container_include
-                ):
-                    continue
-
-                # Get container stats
-                stats = container.stats(stream=False)
-
-                # CPU metrics
-                cpu_delta = (
-                    stats["cpu_stats"]["cpu_usage"]["total_usage"]
-                    - stats["precpu_stats"]["cpu_usage"]["total_usage"]
-                )
-                system_delta = (
-                    stats["cpu_stats"]["system_cpu_usage"]
-                    - stats["precpu_stats"]["system_cpu_usage"]
-                )
-
-                if system_delta > 0:
-                    cpu_percent = (cpu_delta / system_delta) * 100.0
-                else:
-                    cpu_percent = 0.0
-
-                metrics.append(
-                    Metric(
-                        name="docker.cpu.usage_percent",
-                        value=cpu_percent,
-                        tags={
-                            "container_name": container.name,
-                            "image": (
-                                container.image.tags[0]
-                                if container.image.tags
-                                else "unknown"
-                            ),
-                        },
-                        timestamp=timestamp,
-                        source="docker",
+                if container.id in stats:
+                    self._add_container_metrics(
+                        metrics, container, stats[container.id], timestamp
                     )
-                )
 
-                # Memory metrics
-                memory_stats = stats["memory_stats"]
-                memory_usage = memory_stats.get("usage", 0)
-                memory_limit = memory_stats.get("limit", 0)
+        except Exception as e:
+            self.logger.error(f"Error collecting Docker metrics: {e}")
 
-                if memory_limit > 0:
-                    memory_percent = (memory_usage / memory_limit) * 100.0
-                else:
-                    memory_percent = 0.0
+        return metrics
 
-                metrics.append(
-                    Metric(
-                        name="docker.memory.usage_bytes",
-                        value=memory_usage,
-                        tags={
-                            "container_name": container.name,
-                            "image": (
-                                container.image.tags[0]
-                                if container.image.tags
-                                else "unknown"
-                            ),
-                        },
-                        timestamp=timestamp,
-                        source="docker",
-                    )
+    def close(self) -> None:
+        for stream in self._streams.values():
+            stream.close()
+        self._streams.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _should_collect(self, container) -> bool:
+        # Skip if container should be excluded
+        if self.container_exclude and container.name in self.container_exclude:
+            return False
+        # Skip if we have an include list and container is not in it
+        if self.container_include and container.name not in self.container_include:
+            return False
+        return True
+
+    def _fetch_stats(self, containers) -> Dict[str, Dict[str, Any]]:
+        """Fetch one-shot stats for all containers through the pool."""
+        futures = {
+            self._executor.submit(container.stats, stream=False): container
+            for container in containers
+        }
+        done, not_done = wait(futures, timeout=self.stats_timeout)
+        for future in not_done:
+            future.cancel()
+            self.logger.warning(
+                f"Timed out fetching stats for container {futures[future].name}"
+            )
+
+        stats = {}
+        for future in done:
+            container = futures[future]
+            try:
+                stats[container.id] = future.result()
+            except Exception as e:
+                self.logger.warning(
+                    f"Error fetching stats for container {container.name}: {e}"
                 )
+        return stats
+
+    def _latest_stream_stats(self, containers) -> Dict[str, Dict[str, Any]]:
+        """Read the latest frame of each container's stats subscription."""
+        stats = {}
+        for container in containers:
+            stream = self._streams.get(container.id)
+            if stream is None or stream.closed:
+                stream = self._streams[container.id] = _StatsStream(container)
+            if stream.latest is not None:
+                stats[container.id] = stream.latest
+        return stats
+
+    def _prune(self, container_ids) -> None:
+        """Forget streams and cached tags of containers that are gone."""
+        for container_id in list(self._streams):
+            if container_id not in container_ids:
+                self._streams.pop(container_id).close()
+        self._image_tags.prune(container_ids)
+
+    def _add_container_metrics(
+        self,
+        metrics: MetricBatch,
+        container,
+        stats: Dict[str, Any],
+        timestamp: float,
+    ) -> None:
+        tags = {
+            "container_name": container.name,
+            "image": self._image_tags.get(container),
+        }
+
+        # CPU metrics
+        cpu_delta = (
+            stats["cpu_stats"]["cpu_usage"]["total_usage"]
+            - stats["precpu_stats"]["cpu_usage"]["total_usage"]
+        )
+        system_delta = stats["cpu_stats"].get("system_cpu_usage", 0) - stats[
+            "precpu_stats"
+        ].get("system_cpu_usage", 0)
+
+        if system_delta > 0:
+            cpu_percent = (cpu_delta / system_delta) * 100.0
+        else:
+            cpu_percent = 0.0
+
+        # Memory metrics
+        memory_stats = stats["memory_stats"]
+        memory_usage = memory_stats.get("usage", 0)
+        memory_limit = memory_stats.get("limit", 0)
+
+        if memory_limit > 0:
+            memory_percent = (memory_usage / memory_limit) * 100.0
+        else:
+            memory_percent = 0.0
+
+        metrics.append(
+            "docker.cpu.usage_percent", cpu_percent, tags, timestamp, "docker"
+        )
+        metrics.append(
+            "docker.memory.usage_bytes", memory_usage, tags, timestamp, "docker"
+        )
+        metrics.append(
+            "docker.memory.usage_percent", memory_percent, tags, timestamp, "docker"
+        )
 
+        # Network metrics
+        for interface, net_stats in stats.get("networks", {}).items():
+            interface_tags = {**tags, "interface": interface}
+            for name in ("rx_bytes", "tx_bytes"):
                 metrics.append(
-                    Metric(
-                        name="docker.memory.usage_percent",
-                        value=memory_percent,
-                        tags={
-                            "container_name": container.name,
-                            "image": (
-                                container.image.tags[0]
-                                if container.image.tags
-                                else "unknown"
-                            ),
-                        },
-                        timestamp=timestamp,
-                        source="docker",
-                    )
+                    f"docker.network.{name}",
+                    net_stats[name],
+                    interface_tags,
+                    timestamp,
+                    "docker",
                 )
-
-                # Network metrics
-                networks = stats["networks"]
-                for interface, net_stats in networks.items():
-                    metrics.extend(
-                        [
-                            Metric(
-                                name="docker.network.rx_bytes",
-                                value=net_stats["rx_bytes"],
-                                tags={
-                                    "container_name": container.name,
-                                    "interface": interface,
-                                    "image": (
-                                        container.image.tags[0]
-                                        if container.image.tags
-                                        else "unknown"
-                                    ),
-                                },
-                                timestamp=timestamp,
-                                source="docker",
-                            ),
-                            Metric(
-                                name="docker.network.tx_bytes",
-                                value=net_stats["tx_bytes"],
-                                tags={
-                                    "container_name": container.name,
-                                    "interface": interface,
-                                    "image": (
-                                        container.image.tags[0]
-                                        if container.image.tags
-                                        else "unknown"
-                                    ),
-                                },
-                                timestamp=timestamp,
-                                source="docker",
-                            ),
-                        ]
-                    )
-
-        except Exception as e:
-            self.logger.error(f"Error collecting Docker metrics: {e}")
-
-        return metrics
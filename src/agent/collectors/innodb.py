@@ -0,0 +1,67 @@
+"""Parser for ``SHOW ENGINE INNODB STATUS`` output.
+
+The status is one large text report. Each value is matched with a
+precompiled pattern; where the report has a section per buffer pool
+instance, the first match is the aggregate for the whole pool.
+"""
+
+import re
+from typing import Dict
+
+# Metric name to a pattern capturing its value
+INNODB_PATTERNS = {
+    "mysql.innodb.history_list_length": re.compile(r"History list length (\d+)"),
+    "mysql.innodb.buffer_pool.pages_total": re.compile(r"Database pages\s+(\d+)"),
+    "mysql.innodb.buffer_pool.pages_free": re.compile(r"Free buffers\s+(\d+)"),
+    "mysql.innodb.buffer_pool.pages_dirty": re.compile(r"Modified db pages\s+(\d+)"),
+    "mysql.innodb.pending_reads": re.compile(r"Pending reads\s+(\d+)"),
+}
+ROWS_PATTERN = re.compile(
+    r"Number of rows inserted (\d+), updated (\d+), deleted (\d+), read (\d+)"
+)
+ROW_OPERATIONS = ("inserted", "updated", "deleted", "read")
+HIT_RATE_PATTERN = re.compile(r"Buffer pool hit rate (\d+) / (\d+)")
+LSN_PATTERN = re.compile(r"Log sequence number\s+(\d+)")
+CHECKPOINT_PATTERN = re.compile(r"Last checkpoint at\s+(\d+)")
+# One line per transaction waiting for a lock
+LOCK_WAIT_PATTERN = re.compile(r"^LOCK WAIT ", re.MULTILINE)
+
+# Cumulative counters in the parsed output, for which rates make sense
+INNODB_COUNTERS = tuple(f"mysql.innodb.rows.{op}" for op in ROW_OPERATIONS)
+
+
+def parse_innodb_status(status: str) -> Dict[str, float]:
+    """Extract InnoDB metrics from the status report.
+
+    Values that do not appear in the report are left out.
+    """
+    metrics = {}
+    for name, pattern in INNODB_PATTERNS.items():
+        match = pattern.search(status)
+        if match:
+            metrics[name] = float(match.group(1))
+
+    match = ROWS_PATTERN.search(status)
+    if match:
+        for op, value in zip(ROW_OPERATIONS, match.groups()):
+            metrics[f"mysql.innodb.rows.{op}"] = float(value)
+
+    # Reported as hits per 1000 page requests since the last printout
+    match = HIT_RATE_PATTERN.search(status)
+    if match and int(match.group(2)):
+        metrics["mysql.innodb.buffer_pool.hit_ratio"] = int(match.group(1)) / int(
+            match.group(2)
+        )
+
+    metrics["mysql.innodb.lock_wait_transactions"] = float(
+        len(LOCK_WAIT_PATTERN.findall(status))
+    )
+
+    lsn = LSN_PATTERN.search(status)
+    checkpoint = CHECKPOINT_PATTERN.search(status)
+    if lsn and checkpoint:
+        metrics["mysql.innodb.checkpoint_age"] = float(
+            int(lsn.group(1)) - int(checkpoint.group(1))
+        )
+
+    return metrics
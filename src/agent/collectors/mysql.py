@@ -1,107 +1,182 @@
 import time
-from typing import Any, Dict, List
-
-import mysql.connector
-
-from ..agent import BaseCollector, Metric
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from mysql.connector import pooling
+
+from ..agent import BaseCollector
+from ..models import MetricBatch
+from .innodb import INNODB_COUNTERS, parse_innodb_status
+
+# SHOW GLOBAL STATUS variables to collect
+STATUS_METRICS = {
+    "Queries": "mysql.queries",
+    "Threads_connected": "mysql.threads.connected",
+    "Threads_running": "mysql.threads.running",
+    "Slow_queries": "mysql.queries.slow",
+    "Questions": "mysql.questions",
+    "Com_select": "mysql.commands.select",
+    "Com_insert": "mysql.commands.insert",
+    "Com_update": "mysql.commands.update",
+    "Com_delete": "mysql.commands.delete",
+}
+# Status variables that are gauges rather than cumulative counters
+STATUS_GAUGES = {"Threads_connected", "Threads_running"}
+COUNTERS = {
+    name for var, name in STATUS_METRICS.items() if var not in STATUS_GAUGES
+} | set(INNODB_COUNTERS)
+
+CONNECTION_OPTIONS = ("host", "port", "user", "password", "database")
+
+
+class MySQLInstance:
+    """One monitored server: its connection pool and previous counters."""
+
+    def __init__(self, db_config: Dict[str, Any], pool_size: int = 2):
+        """Initialize instance; the pool is opened on first use."""
+        self.db_config = db_config
+        self.pool_size = pool_size
+        self.tags = {
+            "host": db_config.get("host", "localhost"),
+            "database": db_config.get("database", "unknown"),
+        }
+        if "name" in db_config:
+            self.tags["instance"] = db_config["name"]
+
+        # Previous counters and their read time, per source of values
+        self.previous: Dict[str, Dict[str, float]] = {}
+        self.previous_time: Dict[str, float] = {}
+        self.innodb_time: Optional[float] = None
+        self._pool: Optional[pooling.MySQLConnectionPool] = None
+
+    def connect(self):
+        """Borrow a pooled connection, creating the pool on first use."""
+        if self._pool is None:
+            self._pool = pooling.MySQLConnectionPool(
+                pool_name=f"cloud_pioneer_mysql_{id(self)}",
+                pool_size=self.pool_size,
+                pool_reset_session=False,
+                **{
+                    k: self.db_config[k]
+                    for k in CONNECTION_OPTIONS
+                    if k in self.db_config
+                },
+            )
+        connection = self._pool.get_connection()
+        if not connection.is_connected():
+            connection.reconnect(attempts=2, delay=0)
+        return connection
+
+    def rates(
+        self, source: str, values: Dict[str, float], now: float
+    ) -> Dict[str, float]:
+        """Per-second rates of counters since the previous call for ``source``.
+
+        Counters that went backwards, as after a server restart, get no
+        rate until the next call.
+        """
+        rates = {}
+        previous_values = self.previous.get(source, {})
+        previous_time = self.previous_time.get(source)
+        if previous_time is not None and now > previous_time:
+            elapsed = now - previous_time
+            for name, value in values.items():
+                previous = previous_values.get(name)
+                if previous is not None and value >= previous:
+                    rates[f"{name}.per_sec"] = (value - previous) / elapsed
+        self.previous[source] = {k: v for k, v in values.items() if k in COUNTERS}
+        self.previous_time[source] = now
+        return rates
 
 
 class MySQLCollector(BaseCollector):
     def __init__(self, agent_config: Dict[str, Any]):
         super().__init__(agent_config)
-        self.db_config = agent_config.get("mysql", {})
-        self._setup_connection()
-
-    def _setup_connection(self):
-        self.connection = mysql.connector.connect(
-            host=self.db_config.get("host", "localhost"),
-            user=self.db_config.get("user"),
-            password=self.db_config.get("password"),
-            database=self.db_config.get("database"),
+        self.db_config = agent_config.get("collectors", {}).get(
+            "mysql", agent_config.get("mysql", {})
+        )
+        # Either one server configured inline or a list of "instances"
+        instances = self.db_config.get("instances") or [self.db_config]
+        pool_size = self.db_config.get("pool_size", 2)
+        self.instances = [MySQLInstance(config, pool_size) for config in instances]
+        self.emit_rates = self.db_config.get("rates", True)
+        # SHOW ENGINE INNODB STATUS is expensive; refresh it less often
+        self.innodb_interval = self.db_config.get("innodb_status_interval", 60)
+        self._executor = ThreadPoolExecutor(
+            max_workers=min(self.db_config.get("workers", 8), len(self.instances)),
+            thread_name_prefix="mysql",
         )
 
-    def collect(self) -> List[Metric]:
-        metrics = []
+    def collect(self) -> MetricBatch:
+        metrics = MetricBatch()
         timestamp = time.time()
 
-        try:
-            if not self.connection.is_connected():
-                self._setup_connection()
+        futures = [
+            self._executor.submit(self._collect_instance, instance, timestamp)
+            for instance in self.instances
+        ]
+        for instance, future in zip(self.instances, futures):
+            try:
+                metrics.extend(future.result())
+            except Exception as e:
+                self.logger.error(
+                    f"Error collecting MySQL metrics from {instance.tags['host']}: {e}"
+                )
 
-            cursor = self.connection.cursor()
+        return metrics
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _collect_instance(
+        self, instance: MySQLInstance, timestamp: float
+    ) -> MetricBatch:
+        status: Dict[str, float] = {}
+        innodb: Dict[str, float] = {}
+        connection = instance.connect()
+        try:
+            cursor = connection.cursor()
 
             # Collect global status metrics
             cursor.execute("SHOW GLOBAL STATUS")
-            status_metrics = cursor.fetchall()
-
-            important_metrics = {
-                "Queries": "mysql.queries",
-                "Threads_connected": "mysql.threads.connected",
-                "Threads_running": "mysql.threads.running",
-                "Slow_queries": "mysql.queries.slow",
-                "Questions": "mysql.questions",
-                "Com_select": "mysql.commands.select",
-                "Com_insert": "mysql.commands.insert",
-                "Com_update": "mysql.commands.update",
-                "Com_delete": "mysql.commands.delete",
-            }
-
-            for row in status_metrics:
-                var_name, value = row
-                if var_name in important_metrics:
+            for var_name, value in cursor.fetchall():
+                if var_name in STATUS_METRICS:
                     try:
-                        metric_value = float(value)
-                        metrics.append(
-                            Metric(
-                                name=important_metrics[var_name],
-                                value=metric_value,
-                                tags={
-                                    "host": self.db_config.get("host", "localhost"),
-                                    "database": self.db_config.get(
-                                        "database", "unknown"
-                                    ),
-                                },
-                                timestamp=timestamp,
-                                source="mysql",
-                            )
-                        )
+                        status[STATUS_METRICS[var_name]] = float(value)
                     except (ValueError, TypeError):
                         self.logger.warning(
                             f"Could not convert {var_name} value to float: {value}"
                         )
+            status_time = time.monotonic()
 
             # Collect InnoDB metrics
-            cursor.execute("SHOW ENGINE INNODB STATUS")
-            innodb_status = cursor.fetchone()[2]
-
-            # Parse InnoDB metrics (simplified)
-            metrics.extend(self._parse_innodb_metrics(innodb_status, timestamp))
+            if (
+                instance.innodb_time is None
+                or status_time - instance.innodb_time >= self.innodb_interval
+            ):
+                cursor.execute("SHOW ENGINE INNODB STATUS")
+                innodb = self._parse_innodb_metrics(cursor.fetchone()[2])
+                instance.innodb_time = time.monotonic()
 
             cursor.close()
-
-        except Exception as e:
-            self.logger.error(f"Error collecting MySQL metrics: {e}")
-
+        finally:
+            # Return the connection to the pool
+            connection.close()
+
+        values = {**status, **innodb}
+        if self.emit_rates:
+            values.update(instance.rates("status", status, status_time))
+            if innodb:
+                values.update(instance.rates("innodb", innodb, instance.innodb_time))
+
+        metrics = MetricBatch()
+        for name, value in values.items():
+            metrics.append(name, value, instance.tags, timestamp, "mysql")
         return metrics
 
-    def _parse_innodb_metrics(self, status: str, timestamp: float) -> List[Metric]:
-        metrics = []
+    def _parse_innodb_metrics(self, status: str) -> Dict[str, float]:
         try:
-            # Extract basic InnoDB metrics
-            if "transactions" in status.lower():
-                metrics.append(
-                    Metric(
-                        name="mysql.innodb.transactions",
-                        value=1.0,  # Placeholder value
-                        tags={
-                            "host": self.db_config.get("host", "localhost"),
-                            "database": self.db_config.get("database", "unknown"),
-                        },
-                        timestamp=timestamp,
-                        source="mysql",
-                    )
-                )
+            return parse_innodb_status(status)
         except Exception as e:
             self.logger.error(f"Error parsing InnoDB metrics: {e}")
-
-        return metrics
+            return {}
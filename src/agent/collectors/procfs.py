@@ -0,0 +1,340 @@
+"""Single-pass procfs snapshot engine for Linux hosts.
+
+Each tick reads ``/proc/stat``, ``/proc/meminfo``, ``/proc/diskstats``,
+``/proc/net/dev`` and ``/proc/loadavg`` once, through file descriptors kept
+open for the life of the engine, into two alternating snapshot buffers.
+Every metric, including deltas and per-second rates against the previous
+tick, is derived from those snapshots. Field semantics follow psutil so the
+results can stand in for ``psutil.virtual_memory()``, ``disk_io_counters()``
+and friends.
+"""
+
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+PROC_FILES = ("stat", "meminfo", "diskstats", "net/dev", "loadavg")
+# Spaces and tabs in /proc/self/mounts paths are octal-escaped
+MOUNT_ESCAPE = re.compile(rb"\\([0-7]{3})")
+SECTOR_SIZE = 512
+
+# /proc/stat cpu line: user nice system idle iowait irq softirq steal guest
+# guest_nice
+CPU_FIELDS = 10
+CPU_IDLE, CPU_IOWAIT, CPU_GUEST, CPU_GUEST_NICE = 3, 4, 8, 9
+
+# Summed /proc/diskstats fields, in the order kept in Snapshot.disk
+DISK_FIELDS = (
+    "read_count",
+    "write_count",
+    "read_bytes",
+    "write_bytes",
+    "read_time",
+    "write_time",
+)
+# Column in a diskstats line for each of DISK_FIELDS, and a byte multiplier
+DISK_COLUMNS = (3, 7, 5, 9, 6, 10)
+DISK_SCALE = np.array([1, 1, SECTOR_SIZE, SECTOR_SIZE, 1, 1], dtype=np.int64)
+
+# Summed /proc/net/dev fields, in the order kept in Snapshot.net
+NET_FIELDS = (
+    "bytes_recv",
+    "packets_recv",
+    "errin",
+    "dropin",
+    "bytes_sent",
+    "packets_sent",
+    "errout",
+    "dropout",
+)
+NET_COLUMNS = (0, 1, 2, 3, 8, 9, 10, 11)
+
+MEMINFO_KEYS = (
+    b"MemTotal",
+    b"MemFree",
+    b"MemAvailable",
+    b"SwapTotal",
+    b"SwapFree",
+)
+
+
+def procfs_available(root: str = "/proc") -> bool:
+    """Return True if every file the engine needs is readable."""
+    return all(os.access(os.path.join(root, name), os.R_OK) for name in PROC_FILES)
+
+
+class Snapshot:
+    """Counters read from procfs at one instant."""
+
+    __slots__ = (
+        "time",
+        "cpu",
+        "ctx_switches",
+        "interrupts",
+        "soft_interrupts",
+        "load",
+        "memory",
+        "disk",
+        "net",
+    )
+
+    def __init__(self):
+        """Allocate buffers."""
+        self.time = 0.0
+        self.cpu = np.zeros(CPU_FIELDS, dtype=np.int64)
+        self.ctx_switches = 0
+        self.interrupts = 0
+        self.soft_interrupts = 0
+        self.load = np.zeros(3, dtype=np.float64)
+        self.memory: Dict[bytes, int] = {}
+        self.disk = np.zeros(len(DISK_FIELDS), dtype=np.int64)
+        self.net = np.zeros(len(NET_FIELDS), dtype=np.int64)
+
+
+class ProcfsSnapshotEngine:
+    """Reads procfs once per tick and derives metrics with rates."""
+
+    def __init__(self, root: str = "/proc", sys_block: str = "/sys/block"):
+        """Open the procfs files under ``root``."""
+        self.root = root
+        self.sys_block = sys_block
+        self._fds = {
+            name: os.open(os.path.join(root, name), os.O_RDONLY) for name in PROC_FILES
+        }
+        self._buffer = bytearray(64 * 1024)
+        self._snapshots = [Snapshot(), Snapshot()]
+        self._current: Optional[Snapshot] = None
+        self._is_disk: Dict[bytes, bool] = {}
+        self._physical_fs = self._read_physical_filesystems()
+
+    def close(self) -> None:
+        """Close the procfs file descriptors."""
+        for fd in self._fds.values():
+            os.close(fd)
+        self._fds = {}
+
+    def snapshot(self) -> Snapshot:
+        """Read all procfs files into the spare snapshot buffer."""
+        first, second = self._snapshots
+        snap = second if self._current is first else first
+        snap.time = time.monotonic()
+        self._parse_stat(self._read("stat"), snap)
+        self._parse_meminfo(self._read("meminfo"), snap)
+        self._parse_diskstats(self._read("diskstats"), snap)
+        self._parse_net_dev(self._read("net/dev"), snap)
+        snap.load[:] = [float(v) for v in self._read("loadavg").split()[:3]]
+        return snap
+
+    def collect(self) -> Dict[str, Dict[str, Any]]:
+        """Take a snapshot and derive cpu, memory, disk and network groups.
+
+        Rates are per second since the previous call; on the first call
+        they are None.
+        """
+        previous = self._current
+        snap = self.snapshot()
+        self._current = snap
+        elapsed = snap.time - previous.time if previous is not None else 0.0
+
+        return {
+            "cpu": self._cpu_metrics(snap, previous, elapsed),
+            "memory": self._memory_metrics(snap),
+            "disk": self._disk_metrics(snap, previous, elapsed),
+            "network": self._network_metrics(snap, previous, elapsed),
+        }
+
+    def _read(self, name: str) -> bytes:
+        fd = self._fds[name]
+        while True:
+            size = os.preadv(fd, [self._buffer], 0)
+            if size < len(self._buffer):
+                return bytes(memoryview(self._buffer)[:size])
+            self._buffer = bytearray(len(self._buffer) * 2)
+
+    @staticmethod
+    def _parse_stat(data: bytes, snap: Snapshot) -> None:
+        for line in data.split(b"\n"):
+            if line.startswith(b"cpu "):
+                fields = line.split()[1:]
+                snap.cpu[:] = 0
+                snap.cpu[: len(fields)] = [int(v) for v in fields[:CPU_FIELDS]]
+            elif line.startswith(b"ctxt "):
+                snap.ctx_switches = int(line[5:])
+            elif line.startswith(b"intr "):
+                snap.interrupts = int(line.split(None, 2)[1])
+            elif line.startswith(b"softirq "):
+                snap.soft_interrupts = int(line.split(None, 2)[1])
+
+    @staticmethod
+    def _parse_meminfo(data: bytes, snap: Snapshot) -> None:
+        memory = snap.memory
+        memory.clear()
+        for line in data.split(b"\n"):
+            key, _, rest = line.partition(b":")
+            if key in MEMINFO_KEYS:
+                memory[key] = int(rest.split()[0]) * 1024
+
+    def _parse_diskstats(self, data: bytes, snap: Snapshot) -> None:
+        totals = snap.disk
+        totals[:] = 0
+        for line in data.split(b"\n"):
+            fields = line.split()
+            if len(fields) < 14 or not self._whole_disk(fields[2]):
+                continue
+            for i, column in enumerate(DISK_COLUMNS):
+                totals[i] += int(fields[column])
+        totals *= DISK_SCALE
+
+    def _whole_disk(self, name: bytes) -> bool:
+        """Partitions are skipped so IO is not counted twice, as psutil does."""
+        is_disk = self._is_disk.get(name)
+        if is_disk is None:
+            path = os.path.join(self.sys_block, name.decode().replace("/", "!"))
+            is_disk = self._is_disk[name] = os.path.exists(path)
+        return is_disk
+
+    @staticmethod
+    def _parse_net_dev(data: bytes, snap: Snapshot) -> None:
+        totals = snap.net
+        totals[:] = 0
+        # The first two lines are headers
+        for line in data.split(b"\n")[2:]:
+            _, sep, counters = line.partition(b":")
+            if not sep:
+                continue
+            fields = counters.split()
+            for i, column in enumerate(NET_COLUMNS):
+                totals[i] += int(fields[column])
+
+    def _read_physical_filesystems(self) -> set:
+        try:
+            with open(os.path.join(self.root, "filesystems"), "rb") as f:
+                return {
+                    line.strip().decode() for line in f if not line.startswith(b"nodev")
+                } | {"zfs"}
+        except OSError:
+            return set()
+
+    def _mounts(self) -> List[str]:
+        """Mount points of physical filesystems, like disk_partitions()."""
+        mountpoints = []
+        with open(os.path.join(self.root, "self/mounts"), "rb") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                if self._physical_fs and fields[2].decode() not in self._physical_fs:
+                    continue
+                mountpoints.append(
+                    os.fsdecode(
+                        MOUNT_ESCAPE.sub(
+                            lambda m: bytes([int(m.group(1), 8)]), fields[1]
+                        )
+                    )
+                )
+        return mountpoints
+
+    @staticmethod
+    def _rate(current, previous, elapsed: float) -> Optional[float]:
+        if previous is None or elapsed <= 0:
+            return None
+        return max(float(current - previous), 0.0) / elapsed
+
+    def _cpu_metrics(
+        self, snap: Snapshot, previous: Optional[Snapshot], elapsed: float
+    ) -> Dict[str, Any]:
+        usage = None
+        if previous is not None:
+            delta = np.maximum(snap.cpu - previous.cpu, 0)
+            total = delta.sum() - delta[CPU_GUEST] - delta[CPU_GUEST_NICE]
+            idle = delta[CPU_IDLE] + delta[CPU_IOWAIT]
+            if total > 0:
+                usage = round(100.0 * float(total - idle) / float(total), 1)
+
+        def rate(name: str) -> Optional[float]:
+            return self._rate(
+                getattr(snap, name),
+                getattr(previous, name) if previous else None,
+                elapsed,
+            )
+
+        return {
+            "usage_percent": usage,
+            "load_avg_1min": float(snap.load[0]),
+            "load_avg_5min": float(snap.load[1]),
+            "load_avg_15min": float(snap.load[2]),
+            "ctx_switches": snap.ctx_switches,
+            "interrupts": snap.interrupts,
+            "soft_interrupts": snap.soft_interrupts,
+            "ctx_switches_per_sec": rate("ctx_switches"),
+            "interrupts_per_sec": rate("interrupts"),
+            "soft_interrupts_per_sec": rate("soft_interrupts"),
+        }
+
+    @staticmethod
+    def _memory_metrics(snap: Snapshot) -> Dict[str, Any]:
+        memory = snap.memory
+        total = memory.get(b"MemTotal", 0)
+        free = memory.get(b"MemFree", 0)
+        available = memory.get(b"MemAvailable", free)
+        used = total - available
+        swap_total = memory.get(b"SwapTotal", 0)
+        swap_free = memory.get(b"SwapFree", 0)
+        swap_used = swap_total - swap_free
+
+        return {
+            "total": total,
+            "available": available,
+            "used": used,
+            "free": free,
+            "percent": (
+                round(100.0 * (total - available) / total, 1) if total else 0.0
+            ),
+            "swap_total": swap_total,
+            "swap_used": swap_used,
+            "swap_free": swap_free,
+            "swap_percent": (
+                round(100.0 * swap_used / swap_total, 1) if swap_total else 0.0
+            ),
+        }
+
+    def _disk_metrics(
+        self, snap: Snapshot, previous: Optional[Snapshot], elapsed: float
+    ) -> Dict[str, Any]:
+        partitions = {}
+        for mountpoint in self._mounts():
+            try:
+                stat = os.statvfs(mountpoint)
+            except OSError:
+                continue
+            total = stat.f_blocks * stat.f_frsize
+            free = stat.f_bavail * stat.f_frsize
+            used = (stat.f_blocks - stat.f_bfree) * stat.f_frsize
+            usable = used + free
+            partitions[mountpoint] = {
+                "total": total,
+                "used": used,
+                "free": free,
+                "percent": round(100.0 * used / usable, 1) if usable else 0.0,
+            }
+
+        io_counters = {name: int(value) for name, value in zip(DISK_FIELDS, snap.disk)}
+        for i, name in enumerate(DISK_FIELDS[:4]):
+            io_counters[f"{name}_per_sec"] = self._rate(
+                snap.disk[i], previous.disk[i] if previous else None, elapsed
+            )
+        return {"partitions": partitions, "io_counters": io_counters}
+
+    def _network_metrics(
+        self, snap: Snapshot, previous: Optional[Snapshot], elapsed: float
+    ) -> Dict[str, Any]:
+        metrics = {name: int(value) for name, value in zip(NET_FIELDS, snap.net)}
+        for i, name in enumerate(NET_FIELDS):
+            if name.startswith(("bytes", "packets")):
+                metrics[f"{name}_per_sec"] = self._rate(
+                    snap.net[i], previous.net[i] if previous else None, elapsed
+                )
+        return metrics
@@ -6,26 +6,63 @@ import asyncio
 import logging
 import time
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import psutil
 
+from ..cpu_sampler import get_cpu_sampler
+from .procfs import ProcfsSnapshotEngine, procfs_available
+
 
 class ResourceMetricsCollector:
-    """Collects system resource metrics."""
+    """Collects system resource metrics.
+
+    On Linux the metrics come from one procfs snapshot per tick; elsewhere,
+    or with ``use_procfs=False``, from individual psutil calls.
+    """
 
-    def __init__(self, collection_interval: int = 60):
+    def __init__(self, collection_interval: int = 60, use_procfs: bool = True):
         """Initialize collector with interval."""
         self.collection_interval = collection_interval
         self.logger = logging.getLogger(__name__)
+        self._procfs: Optional[ProcfsSnapshotEngine] = None
+        if use_procfs and procfs_available():
+            try:
+                self._procfs = ProcfsSnapshotEngine()
+            except OSError as e:
+                self.logger.warning(f"procfs unavailable, using psutil: {str(e)}")
+
+    def collect_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Collect cpu, memory, disk and network metric groups."""
+        if self._procfs is not None:
+            try:
+                groups = self._procfs.collect()
+                if groups["cpu"]["usage_percent"] is None:
+                    # No previous snapshot to diff against yet
+                    groups["cpu"]["usage_percent"] = get_cpu_sampler().percent()
+                return groups
+            except (OSError, ValueError, IndexError) as e:
+                self.logger.warning(
+                    f"procfs snapshot failed, falling back to psutil: {str(e)}"
+                )
+                self._procfs.close()
+                self._procfs = None
+
+        return {
+            "cpu": self._collect_cpu_metrics(),
+            "memory": self._collect_memory_metrics(),
+            "disk": self._collect_disk_metrics(),
+            "network": self._collect_network_metrics(),
+        }
 
     def collect_metrics(self, resource_id: str = None) -> Dict[str, Any]:
         """Collect comprehensive system metrics."""
         try:
-            cpu_metrics = self._collect_cpu_metrics()
-            memory_metrics = self._collect_memory_metrics()
-            disk_metrics = self._collect_disk_metrics()
-            network_metrics = self._collect_network_metrics()
+            snapshot = self.collect_snapshot()
+            cpu_metrics = snapshot["cpu"]
+            memory_metrics = snapshot["memory"]
+            disk_metrics = snapshot["disk"]
+            network_metrics = snapshot["network"]
 
             return {
                 "cpu_utilization": cpu_metrics["usage_percent"],
@@ -42,14 +79,16 @@ class ResourceMetricsCollector:
 
     def _collect_cpu_metrics(self) -> Dict[str, float]:
         """Collect detailed CPU metrics."""
+        load_avg = psutil.getloadavg()
+        cpu_stats = psutil.cpu_stats()
         return {
-            "usage_percent": psutil.cpu_percent(interval=1),
-            "load_avg_1min": psutil.getloadavg()[0],
-            "load_avg_5min": psutil.getloadavg()[1],
-            "load_avg_15min": psutil.getloadavg()[2],
-            "ctx_switches": psutil.cpu_stats().ctx_switches,
-            "interrupts": psutil.cpu_stats().interrupts,
-            "soft_interrupts": psutil.cpu_stats().soft_interrupts,
+            "usage_percent": get_cpu_sampler().percent(),
+            "load_avg_1min": load_avg[0],
+            "load_avg_5min": load_avg[1],
+            "load_avg_15min": load_avg[2],
+            "ctx_switches": cpu_stats.ctx_switches,
+            "interrupts": cpu_stats.interrupts,
+            "soft_interrupts": cpu_stats.soft_interrupts,
         }
 
     def _collect_memory_metrics(self) -> Dict[str, float]:
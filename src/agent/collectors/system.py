@@ -1,38 +1,39 @@
 import platform
-from typing import Any, Dict, List
+import time
 
 import psutil
 
-from ..agent import BaseCollector, Metric
+from ..agent import BaseCollector
+from ..cpu_sampler import DEFAULT_RESOLUTION, get_cpu_sampler
+from ..models import MetricBatch
 
 
 class SystemMetricsCollector(BaseCollector):
-    def collect(self) -> List[Metric]:
-        metrics = []
+    def collect(self) -> MetricBatch:
+        metrics = MetricBatch()
         timestamp = time.time()
+        host_tags = {"host": platform.node()}
 
         # CPU Metrics
-        cpu_percent = psutil.cpu_percent(interval=1)
+        resolution = self.config.get("agent", {}).get("cpu_sample_resolution")
+        sampler = get_cpu_sampler(resolution or DEFAULT_RESOLUTION)
+        cpu_percent = sampler.percent()
         metrics.append(
-            Metric(
-                name="system.cpu.utilization",
-                value=cpu_percent,
-                tags={"host": platform.node()},
-                timestamp=timestamp,
-                source="system",
-            )
+            name="system.cpu.utilization",
+            value=cpu_percent,
+            tags=host_tags,
+            timestamp=timestamp,
+            source="system",
         )
 
         # Memory Metrics
         memory = psutil.virtual_memory()
         metrics.append(
-            Metric(
-                name="system.memory.used",
-                value=memory.used,
-                tags={"host": platform.node()},
-                timestamp=timestamp,
-                source="system",
-            )
+            name="system.memory.used",
+            value=memory.used,
+            tags=host_tags,
+            timestamp=timestamp,
+            source="system",
         )
 
         # Disk Metrics
@@ -40,17 +41,15 @@ class SystemMetricsCollector(BaseCollector):
             try:
                 usage = psutil.disk_usage(partition.mountpoint)
                 metrics.append(
-                    Metric(
-                        name="system.disk.used",
-                        value=usage.used,
-                        tags={
-                            "host": platform.node(),
-                            "device": partition.device,
-                            "mountpoint": partition.mountpoint,
-                        },
-                        timestamp=timestamp,
-                        source="system",
-                    )
+                    name="system.disk.used",
+                    value=usage.used,
+                    tags={
+                        **host_tags,
+                        "device": partition.device,
+                        "mountpoint": partition.mountpoint,
+                    },
+                    timestamp=timestamp,
+                    source="system",
                 )
             except Exception:
                 continue
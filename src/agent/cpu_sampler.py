@@ -0,0 +1,171 @@
+"""Shared background CPU sampler.
+
+``psutil.cpu_percent(interval=1)`` sleeps for a second on every call. The
+sampler instead reads ``psutil.cpu_times`` every ``resolution`` seconds on a
+daemon thread and keeps per-core busy/total deltas in a ring buffer, so
+readers get utilization over any recent window without blocking.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import psutil
+
+DEFAULT_RESOLUTION = 0.25
+DEFAULT_HISTORY = 300.0
+DEFAULT_WINDOW = 1.0
+
+
+def _busy_and_total(cpu_times: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-core busy and total CPU seconds, counted the way psutil does."""
+    busy = np.empty(len(cpu_times))
+    total = np.empty(len(cpu_times))
+    for i, times in enumerate(cpu_times):
+        # Guest time is already included in user time on Linux
+        core_total = (
+            sum(times)
+            - getattr(times, "guest", 0.0)
+            - getattr(times, "guest_nice", 0.0)
+        )
+        idle = times.idle + getattr(times, "iowait", 0.0)
+        total[i] = core_total
+        busy[i] = core_total - idle
+    return busy, total
+
+
+class CPUSampler:
+    """Samples CPU time in the background into a ring buffer."""
+
+    def __init__(
+        self,
+        resolution: float = DEFAULT_RESOLUTION,
+        history: float = DEFAULT_HISTORY,
+    ):
+        """Initialize sampler keeping ``history`` seconds of samples."""
+        self.resolution = resolution
+        self.size = max(int(history / resolution), 1)
+
+        self._last_busy, self._last_total = _busy_and_total(
+            psutil.cpu_times(percpu=True)
+        )
+        cores = len(self._last_busy)
+        self._timestamps = np.zeros(self.size)
+        self._busy = np.zeros((self.size, cores))
+        self._total = np.zeros((self.size, cores))
+        self._head = 0
+        self._count = 0
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "CPUSampler":
+        """Start the sampling thread if it is not running."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="cpu-sampler", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the sampling thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def sample(self) -> None:
+        """Record the CPU time used since the previous sample."""
+        busy, total = _busy_and_total(psutil.cpu_times(percpu=True))
+        now = time.time()
+        with self._lock:
+            # Counters can step backwards, e.g. when a core goes offline
+            self._busy[self._head] = np.maximum(busy - self._last_busy, 0.0)
+            self._total[self._head] = np.maximum(total - self._last_total, 0.0)
+            self._timestamps[self._head] = now
+            self._head = (self._head + 1) % self.size
+            self._count = min(self._count + 1, self.size)
+            self._last_busy, self._last_total = busy, total
+
+    def percent(self, window: float = DEFAULT_WINDOW, percpu: bool = False):
+        """Utilization over the last ``window`` seconds, like ``cpu_percent``.
+
+        Returns a float, or a list of per-core floats when ``percpu`` is set.
+        Before the first sample completes this measures from start-up.
+        """
+        with self._lock:
+            rows = self._window_rows(window)
+            if len(rows):
+                busy = self._busy[rows].sum(axis=0)
+                total = self._total[rows].sum(axis=0)
+            else:
+                now_busy, now_total = _busy_and_total(psutil.cpu_times(percpu=True))
+                busy = now_busy - self._last_busy
+                total = now_total - self._last_total
+
+        if percpu:
+            return [
+                round(100.0 * b / t, 1) if t > 0 else 0.0 for b, t in zip(busy, total)
+            ]
+        total_sum = total.sum()
+        return round(100.0 * busy.sum() / total_sum, 1) if total_sum > 0 else 0.0
+
+    def percentiles(
+        self, window: float = 60.0, q: Sequence[float] = (50, 95, 99)
+    ) -> Dict[str, float]:
+        """Percentiles of per-sample total utilization over ``window``."""
+        with self._lock:
+            rows = self._window_rows(window)
+            busy = self._busy[rows].sum(axis=1)
+            total = self._total[rows].sum(axis=1)
+
+        valid = total > 0
+        if not valid.any():
+            return {f"p{p:g}": 0.0 for p in q}
+        values = np.percentile(100.0 * busy[valid] / total[valid], q)
+        return {f"p{p:g}": round(float(v), 1) for p, v in zip(q, values)}
+
+    def history(self, window: float = 60.0) -> List[Tuple[float, float]]:
+        """Return ``(timestamp, percent)`` samples over ``window``, oldest first."""
+        with self._lock:
+            rows = self._window_rows(window)
+            timestamps = self._timestamps[rows]
+            busy = self._busy[rows].sum(axis=1)
+            total = self._total[rows].sum(axis=1)
+        percents = np.where(total > 0, 100.0 * busy / np.maximum(total, 1e-12), 0.0)
+        return list(zip(timestamps.tolist(), np.round(percents, 1).tolist()))
+
+    def _window_rows(self, window: float) -> np.ndarray:
+        """Ring indices of the samples in the last ``window`` seconds."""
+        count = min(self._count, max(int(round(window / self.resolution)), 1))
+        return (self._head - count + np.arange(count)) % self.size
+
+    def _run(self) -> None:
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            # Resynchronise rather than catching up after a stall
+            next_tick = max(next_tick + self.resolution, time.monotonic())
+            self._stop.wait(max(next_tick - time.monotonic(), 0.0))
+            if self._stop.is_set():
+                break
+            self.sample()
+
+
+_sampler: Optional[CPUSampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_cpu_sampler(resolution: float = DEFAULT_RESOLUTION) -> CPUSampler:
+    """Return the process-wide sampler, starting it on first use.
+
+    ``resolution`` only applies to the call that creates the sampler.
+    """
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = CPUSampler(resolution=resolution)
+        return _sampler.start()
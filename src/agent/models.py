@@ -1,13 +1,275 @@
-"""Agent models."""
+"""Agent models.
 
-from typing import Any, Dict
+Tag dicts are interned: equal tag sets share one read-only ``TagSet``, so
+the many metrics a collector emits per host or container do not each carry
+a copy. ``MetricBatch`` stores a collection run as columns, with names and
+sources as indexes into a string table and tags as indexes into a table of
+the batch's distinct tag sets.
+"""
+
+import sys
+import threading
+import time
+import weakref
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+# Per-metric columns of a MetricBatch
+COLUMNS = ("values", "timestamps", "int_flags", "name_ids", "source_ids", "tag_ids")
+# (name, value, tags, timestamp, source)
+MetricRow = Tuple[str, float, "TagSet", float, Optional[str]]
+
+
+class TagSet(dict):
+    """Read-only tag dict, shared between metrics with the same tags."""
+
+    __slots__ = ("__weakref__",)
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("TagSet is read-only; copy it with dict(tags)")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = __ior__ = _readonly
+
+    def __reduce__(self):
+        return TagSet, (dict(self),)
+
+
+_tag_sets: "weakref.WeakValueDictionary[frozenset, TagSet]" = (
+    weakref.WeakValueDictionary()
+)
+_tag_sets_lock = threading.Lock()
+EMPTY_TAGS = TagSet()
+
+
+def intern_tags(tags: Optional[Mapping[str, Any]]) -> TagSet:
+    """Return the shared ``TagSet`` equal to ``tags``.
+
+    Tag sets are dropped from the registry once no metric uses them, so
+    churning tags such as container names do not accumulate.
+    """
+    if not tags:
+        return EMPTY_TAGS
+    if type(tags) is TagSet:
+        return tags
+    try:
+        key = frozenset(tags.items())
+    except TypeError:
+        # Unhashable tag values cannot be shared
+        return TagSet(tags)
+    with _tag_sets_lock:
+        tag_set = _tag_sets.get(key)
+        if tag_set is None:
+            tag_set = _tag_sets[key] = TagSet(tags)
+        return tag_set
 
 
 class Metric:
     """Metric model."""
 
-    def __init__(self, name: str, value: float, tags: Dict[str, Any] = None):
-        """Initialize metric."""
+    __slots__ = ("name", "value", "tags", "timestamp", "source")
+
+    def __init__(
+        self,
+        name: str,
+        value: float,
+        tags: Dict[str, Any] = None,
+        timestamp: Optional[float] = None,
+        source: Optional[str] = None,
+    ):
+        """Initialize metric; ``timestamp`` is epoch seconds, default now."""
         self.name = name
         self.value = value
-        self.tags = tags or {}
+        self.tags = intern_tags(tags)
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.source = source
+
+
+class MetricBatch:
+    """Metrics stored as columns.
+
+    ``values`` and ``timestamps`` are float64 arrays, ``int_flags`` marks
+    values given as ``int`` (returned as ``int`` again, so they stay integer
+    fields when written), and ``name_ids``, ``source_ids`` and ``tag_ids``
+    index into ``strings`` and ``tag_sets``.
+    Iterating yields ``Metric`` objects for code that expects them;
+    ``rows()`` and the column accessors avoid creating them.
+    """
+
+    __slots__ = COLUMNS + (
+        "strings",
+        "tag_sets",
+        "_string_index",
+        "_tag_index",
+        "_last_tags",
+        "_last_tag_id",
+    )
+
+    def __init__(self):
+        """Initialize an empty batch."""
+        self.values = array("d")
+        self.timestamps = array("d")
+        self.int_flags = array("B")
+        self.name_ids = array("I")
+        self.source_ids = array("I")
+        self.tag_ids = array("I")
+        # Index 0 stands for no source
+        self.strings: List[Optional[str]] = [None]
+        self.tag_sets: List[TagSet] = []
+        self._string_index: Dict[Optional[str], int] = {None: 0}
+        # Keyed by id(); tag_sets keeps the TagSets alive
+        self._tag_index: Dict[int, int] = {}
+        self._last_tags: Optional[TagSet] = None
+        self._last_tag_id = 0
+
+    @classmethod
+    def from_metrics(cls, metrics: Iterable[Metric]) -> "MetricBatch":
+        """Build a batch from metrics or another batch."""
+        if isinstance(metrics, MetricBatch):
+            return metrics
+        batch = cls()
+        batch.extend(metrics)
+        return batch
+
+    @classmethod
+    def concat(cls, batches: Iterable[Iterable[Metric]]) -> "MetricBatch":
+        """Join batches, or lists of metrics, into one batch."""
+        batch = cls()
+        for other in batches:
+            batch.extend(other)
+        return batch
+
+    def append(
+        self,
+        name: str,
+        value: float,
+        tags: Optional[Mapping[str, Any]] = None,
+        timestamp: Optional[float] = None,
+        source: Optional[str] = None,
+    ) -> None:
+        """Add one metric; arguments are those of ``Metric``."""
+        self.values.append(value)
+        self.timestamps.append(time.time() if timestamp is None else timestamp)
+        self.int_flags.append(type(value) is int)
+        self.name_ids.append(self._string_id(name))
+        self.source_ids.append(self._string_id(source))
+        self.tag_ids.append(self._tag_set_id(tags))
+
+    def extend(self, metrics: Iterable[Metric]) -> None:
+        """Add metrics, or all rows of another batch."""
+        if isinstance(metrics, MetricBatch):
+            string_map = array("I", map(self._string_id, metrics.strings))
+            tag_map = array("I", map(self._tag_set_id, metrics.tag_sets))
+            self.values.extend(metrics.values)
+            self.timestamps.extend(metrics.timestamps)
+            self.int_flags.extend(metrics.int_flags)
+            self.name_ids.extend(string_map[i] for i in metrics.name_ids)
+            self.source_ids.extend(string_map[i] for i in metrics.source_ids)
+            self.tag_ids.extend(tag_map[i] for i in metrics.tag_ids)
+            return
+        for metric in metrics:
+            self.append(
+                metric.name, metric.value, metric.tags, metric.timestamp, metric.source
+            )
+
+    def rows(self) -> Iterator[MetricRow]:
+        """Yield ``(name, value, tags, timestamp, source)`` for each metric."""
+        strings, tag_sets = self.strings, self.tag_sets
+        for name_id, value, is_int, tag_id, timestamp, source_id in zip(
+            self.name_ids,
+            self.values,
+            self.int_flags,
+            self.tag_ids,
+            self.timestamps,
+            self.source_ids,
+        ):
+            yield (
+                strings[name_id],
+                int(value) if is_int else value,
+                tag_sets[tag_id],
+                timestamp,
+                strings[source_id],
+            )
+
+    def names(self) -> List[str]:
+        """Return the name of each metric."""
+        strings = self.strings
+        return [strings[i] for i in self.name_ids]
+
+    def value_array(self) -> np.ndarray:
+        """Values as a float64 array sharing the batch's memory.
+
+        The batch cannot grow while the array is alive.
+        """
+        return np.frombuffer(self.values, dtype=np.float64)
+
+    def timestamp_array(self) -> np.ndarray:
+        """Timestamps as a float64 array sharing the batch's memory."""
+        return np.frombuffer(self.timestamps, dtype=np.float64)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns and tables."""
+        return sum(sys.getsizeof(getattr(self, column)) for column in COLUMNS) + sum(
+            sys.getsizeof(s) for s in self.strings
+        )
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self) -> Iterator[Metric]:
+        for row in self.rows():
+            yield Metric(*row)
+
+    def __getitem__(self, index):
+        """Return a ``Metric``, or a ``MetricBatch`` sharing tables for a slice."""
+        if isinstance(index, slice):
+            batch = MetricBatch()
+            batch.strings = self.strings
+            batch.tag_sets = self.tag_sets
+            batch._string_index = self._string_index
+            batch._tag_index = self._tag_index
+            for column in COLUMNS:
+                setattr(batch, column, getattr(self, column)[index])
+            return batch
+        strings = self.strings
+        value = self.values[index]
+        return Metric(
+            strings[self.name_ids[index]],
+            int(value) if self.int_flags[index] else value,
+            self.tag_sets[self.tag_ids[index]],
+            self.timestamps[index],
+            strings[self.source_ids[index]],
+        )
+
+    def _string_id(self, value: Optional[str]) -> int:
+        string_id = self._string_index.get(value)
+        if string_id is None:
+            string_id = self._string_index[value] = len(self.strings)
+            self.strings.append(sys.intern(value))
+        return string_id
+
+    def _tag_set_id(self, tags: Optional[Mapping[str, Any]]) -> int:
+        # Collectors usually pass the same tags for a run of metrics. Only
+        # a TagSet can be matched by identity; a dict may have changed
+        # since the last row.
+        tag_set = tags if type(tags) is TagSet else intern_tags(tags)
+        if tag_set is self._last_tags:
+            return self._last_tag_id
+        tag_id = self._tag_index.get(id(tag_set))
+        if tag_id is None:
+            tag_id = self._tag_index[id(tag_set)] = len(self.tag_sets)
+            self.tag_sets.append(tag_set)
+        self._last_tags, self._last_tag_id = tag_set, tag_id
+        return tag_id
+
+
+def metric_rows(metrics: Iterable[Metric]) -> Iterator[MetricRow]:
+    """Yield rows from a ``MetricBatch`` or any iterable of ``Metric``."""
+    if isinstance(metrics, MetricBatch):
+        return metrics.rows()
+    return (
+        (metric.name, metric.value, metric.tags, metric.timestamp, metric.source)
+        for metric in metrics
+    )
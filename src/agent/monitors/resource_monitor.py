@@ -2,7 +2,7 @@
 
 import logging
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from src.agent.collectors.resource_metrics import ResourceMetricsCollector
 from src.automation.scheduler import ResourceScheduler
@@ -17,10 +17,20 @@ class ResourceMonitor:
         metrics_collector: ResourceMetricsCollector = None,
         predictor: MetricsPredictor = None,
         scheduler: ResourceScheduler = None,
+        write_behind: bool = True,
+        write_buffer_options: Optional[Dict[str, Any]] = None,
     ):
-        """Initialize monitor with collectors and predictors."""
+        """Initialize monitor with collectors and predictors.
+
+        Unless ``write_behind`` is False, a default predictor buffers metric
+        writes so collection does not wait on DynamoDB.
+        """
         self.metrics_collector = metrics_collector or ResourceMetricsCollector()
-        self.predictor = predictor or MetricsPredictor()
+        if predictor is None:
+            predictor = MetricsPredictor()
+            if write_behind:
+                predictor.enable_write_behind(**(write_buffer_options or {}))
+        self.predictor = predictor
         self.scheduler = scheduler or ResourceScheduler()
         self.logger = logging.getLogger(__name__)
 
@@ -42,10 +52,24 @@ class ResourceMonitor:
             self.logger.error(f"Failed to collect metrics for {resource_id}: {str(e)}")
             raise
 
+    def get_write_stats(self) -> Dict[str, Any]:
+        """Get metric write queue depth and flush latency."""
+        return self.predictor.get_write_stats()
+
+    def close(self) -> None:
+        """Flush buffered metrics and release the predictor."""
+        try:
+            self.predictor.close()
+        except Exception as e:
+            self.logger.error(f"Failed to close metrics predictor: {str(e)}")
+            raise
+
     def predict_usage(self, resource_id: str) -> Dict[str, Any]:
         """Predict resource usage."""
         try:
             metrics = self.collect_metrics(resource_id)
+            # The sample just stored may still sit in the write-behind buffer
+            self.predictor.flush()
             return self.predictor.predict(metrics)
         except Exception as e:
             self.logger.error(f"Failed to predict usage for {resource_id}: {str(e)}")
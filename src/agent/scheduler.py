@@ -0,0 +1,206 @@
+"""Per-collector scheduling for the monitoring agent."""
+
+import heapq
+import logging
+import math
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from .models import Metric
+
+
+class CollectorJob:
+    """A collector with its interval, timeout and run statistics."""
+
+    def __init__(self, name: str, collector, interval: float, timeout: float):
+        """Initialize job."""
+        self.name = name
+        self.collector = collector
+        self.interval = interval
+        self.timeout = timeout
+        self.running = False
+
+        self.runs = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.missed_deadlines = 0
+        self.duration_last = 0.0
+        self.duration_total = 0.0
+        self.duration_max = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return run statistics."""
+        return {
+            "interval": self.interval,
+            "timeout": self.timeout,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "missed_deadlines": self.missed_deadlines,
+            "last_duration_seconds": self.duration_last,
+            "max_duration_seconds": self.duration_max,
+            "avg_duration_seconds": (
+                self.duration_total / self.runs if self.runs else 0.0
+            ),
+        }
+
+
+def next_aligned_tick(now: float, interval: float) -> float:
+    """Return the next wall-clock multiple of ``interval`` after ``now``."""
+    return (math.floor(now / interval) + 1) * interval
+
+
+class CollectorScheduler:
+    """Runs each collector on its own interval in a worker pool.
+
+    Ticks fall on wall-clock multiples of the interval, so hosts with the
+    same configuration sample at the same moments. A tick is a missed
+    deadline if the previous run of that collector is still going, or if
+    the scheduler itself woke up too late for it. Runs that exceed their
+    timeout are counted and their metrics discarded; Python threads cannot
+    be cancelled, so the run keeps its worker until it returns.
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[List[Metric]], None],
+        max_workers: int = 4,
+        clock: Callable[[], float] = time.time,
+        timer: Callable[[], float] = time.monotonic,
+        executor: Optional[Executor] = None,
+    ):
+        """Initialize scheduler; ``sink`` receives each run's metrics.
+
+        ``clock`` places ticks and ``timer`` measures run durations.
+        Collectors run in ``executor`` if given, else in a pool of
+        ``max_workers`` threads created by ``start``.
+        """
+        self.sink = sink
+        self.max_workers = max_workers
+        self.clock = clock
+        self.timer = timer
+        self.logger = logging.getLogger(__name__)
+
+        self.jobs: Dict[str, CollectorJob] = {}
+        self._heap: List = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._executor = executor
+        self._thread: Optional[threading.Thread] = None
+
+    def add(
+        self,
+        name: str,
+        collector,
+        interval: float,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Schedule ``collector`` every ``interval`` seconds."""
+        job = CollectorJob(name, collector, interval, timeout or interval)
+        with self._lock:
+            self.jobs[name] = job
+            heapq.heappush(
+                self._heap, (next_aligned_tick(self.clock(), interval), name)
+            )
+        self._wakeup.set()
+
+    def start(self) -> None:
+        """Start the scheduler thread."""
+        self._stopped.clear()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="collector"
+            )
+        self._thread = threading.Thread(
+            target=self._run, name="collector-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop scheduling; optionally wait for running collectors."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-collector durations, failures and missed deadlines."""
+        with self._lock:
+            return {name: job.to_dict() for name, job in self.jobs.items()}
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.run_pending())
+            self._wakeup.clear()
+
+    def run_pending(self) -> Optional[float]:
+        """Start every collector whose tick is due.
+
+        Returns the seconds until the next tick, or None with no collectors.
+        """
+        while True:
+            with self._lock:
+                if not self._heap:
+                    return None
+                due, name = self._heap[0]
+                now = self.clock()
+                if due > now:
+                    return due - now
+
+                heapq.heappop(self._heap)
+                job = self.jobs[name]
+                # Skip ticks the scheduler slept through
+                late_ticks = int((now - due) // job.interval)
+                job.missed_deadlines += late_ticks
+                heapq.heappush(
+                    self._heap, (due + (late_ticks + 1) * job.interval, name)
+                )
+                if job.running:
+                    job.missed_deadlines += 1
+                    self.logger.warning(
+                        f"Collector {name} missed its deadline; previous run "
+                        f"still in progress"
+                    )
+                    continue
+                job.running = True
+
+            self._executor.submit(self._collect, job)
+
+    def _collect(self, job: CollectorJob) -> None:
+        started = self.timer()
+        metrics = None
+        failed = False
+        try:
+            metrics = job.collector.collect()
+        except Exception as e:
+            failed = True
+            self.logger.error(f"Collector {job.name} failed: {e}")
+
+        duration = self.timer() - started
+        timed_out = duration > job.timeout
+        with self._lock:
+            job.running = False
+            job.runs += 1
+            job.failures += failed
+            job.timeouts += timed_out
+            job.duration_last = duration
+            job.duration_total += duration
+            job.duration_max = max(job.duration_max, duration)
+
+        if timed_out:
+            self.logger.warning(
+                f"Collector {job.name} took {duration:.2f}s, over its "
+                f"{job.timeout}s timeout; discarding its metrics"
+            )
+        elif metrics:
+            try:
+                self.sink(metrics)
+            except Exception as e:
+                self.logger.error(f"Failed to queue metrics from {job.name}: {e}")
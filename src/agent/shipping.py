@@ -0,0 +1,180 @@
+"""Metric shipping pipeline."""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from .backends.base import MetricBackend
+from .models import Metric
+
+
+class BackendStats:
+    """Latency and failure counters for one backend."""
+
+    def __init__(self):
+        """Initialize counters."""
+        self.batches_sent = 0
+        self.batches_failed = 0
+        self.batches_dropped = 0
+        self.metrics_sent = 0
+        self.metrics_failed = 0
+        self.retries = 0
+        self.latency_total = 0.0
+        self.latency_last = 0.0
+        self.latency_max = 0.0
+
+    def record(self, size: int, latency: float, ok: bool) -> None:
+        """Record one batch outcome."""
+        if ok:
+            self.batches_sent += 1
+            self.metrics_sent += size
+        else:
+            self.batches_failed += 1
+            self.metrics_failed += size
+        self.latency_last = latency
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return counters with average latency."""
+        attempts = self.batches_sent + self.batches_failed
+        return {
+            "batches_sent": self.batches_sent,
+            "batches_failed": self.batches_failed,
+            "batches_dropped": self.batches_dropped,
+            "metrics_sent": self.metrics_sent,
+            "metrics_failed": self.metrics_failed,
+            "retries": self.retries,
+            "last_latency_seconds": self.latency_last,
+            "max_latency_seconds": self.latency_max,
+            "avg_latency_seconds": self.latency_total / attempts if attempts else 0.0,
+        }
+
+
+class MetricShipper:
+    """Fans metric batches out to every backend in parallel.
+
+    Each backend has its own worker thread and queue of pending batches, so
+    a slow or failing backend only delays itself. Batches are split to the
+    backend's ``max_batch_size`` and failed writes are retried with jittered
+    exponential backoff. Once ``max_pending`` batches are waiting for a
+    backend, new batches for it are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        backends: Optional[Dict[str, MetricBackend]] = None,
+        max_retries: int = 3,
+        base_backoff: float = 0.5,
+        max_backoff: float = 10.0,
+        max_pending: int = 100,
+    ):
+        """Initialize shipper."""
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_pending = max_pending
+        self.logger = logging.getLogger(__name__)
+
+        self.backends: Dict[str, MetricBackend] = {}
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._pending: Dict[str, int] = {}
+        self._stats: Dict[str, BackendStats] = {}
+        self._lock = threading.Lock()
+
+        for name, backend in (backends or {}).items():
+            self.add_backend(name, backend)
+
+    def add_backend(self, name: str, backend: MetricBackend) -> None:
+        """Register a backend with its own worker."""
+        with self._lock:
+            self.backends[name] = backend
+            self._executors[name] = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f"ship-{name}"
+            )
+            self._pending[name] = 0
+            self._stats[name] = BackendStats()
+
+    def ship(self, metrics: Sequence[Metric]) -> List[Future]:
+        """Queue metrics for every backend without waiting for the writes.
+
+        Returns one future per batch, resolving to whether the backend
+        accepted it; batches dropped because a backend is backlogged
+        resolve to False at once.
+        """
+        futures: List[Future] = []
+        if not metrics:
+            return futures
+
+        with self._lock:
+            for name, backend in self.backends.items():
+                batch_size = backend.max_batch_size or len(metrics)
+                for start in range(0, len(metrics), batch_size):
+                    if self._pending[name] >= self.max_pending:
+                        self._stats[name].batches_dropped += 1
+                        self.logger.warning(f"Backend {name} is backlogged")
+                        dropped = Future()
+                        dropped.set_result(False)
+                        futures.append(dropped)
+                        continue
+                    self._pending[name] += 1
+                    futures.append(
+                        self._executors[name].submit(
+                            self._send,
+                            name,
+                            backend,
+                            metrics[start : start + batch_size],
+                        )
+                    )
+        return futures
+
+    def _send(self, name: str, backend: MetricBackend, batch: Sequence[Metric]) -> bool:
+        started = time.monotonic()
+        ok = False
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    backend.send_metrics(batch)
+                    ok = True
+                    break
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        self.logger.error(
+                            f"Failed to ship {len(batch)} metrics to {name} after "
+                            f"{attempt + 1} attempts: {e}"
+                        )
+                        break
+                    with self._lock:
+                        self._stats[name].retries += 1
+                    # Full jitter keeps retries from many agents spread out
+                    time.sleep(
+                        random.uniform(
+                            0, min(self.max_backoff, self.base_backoff * 2**attempt)
+                        )
+                    )
+        finally:
+            with self._lock:
+                self._pending[name] -= 1
+                self._stats[name].record(len(batch), time.monotonic() - started, ok)
+        return ok
+
+    def pending_batches(self) -> int:
+        """Return the longest backlog of any backend, in batches."""
+        with self._lock:
+            return max(self._pending.values(), default=0)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-backend counters and pending batch counts."""
+        with self._lock:
+            return {
+                name: {**stats.to_dict(), "pending_batches": self._pending[name]}
+                for name, stats in self._stats.items()
+            }
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the workers, by default after pending batches are sent."""
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait, cancel_futures=not wait)
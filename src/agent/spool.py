@@ -0,0 +1,380 @@
+"""Disk-backed spool for metrics that cannot be shipped yet."""
+
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .models import Metric, metric_rows
+
+SEGMENT_MAGIC = b"CPSPOOL1"
+SEGMENT_SUFFIX = ".seg"
+CURSOR_FILE = "cursor"
+
+# Record: payload length and CRC32, then the payload
+RECORD_HEADER = struct.Struct("<II")
+# Payload: timestamp, value and tag count, then length-prefixed UTF-8 strings
+# for the name, the source and each tag key and value
+PAYLOAD_FIXED = struct.Struct("<ddH")
+# Set in the tag count of records whose value was an int
+INT_VALUE_FLAG = 0x8000
+STRING_LENGTH = struct.Struct("<H")
+
+
+def _pack_string(value: str) -> bytes:
+    data = value.encode("utf-8")
+    return STRING_LENGTH.pack(len(data)) + data
+
+
+def encode_metric(metric: Metric) -> bytes:
+    """Encode a metric as one spool record."""
+    return encode_record(
+        metric.name, metric.value, metric.tags, metric.timestamp, metric.source
+    )
+
+
+def encode_record(
+    name: str,
+    value: float,
+    tags: Dict[str, Any],
+    timestamp: float,
+    source: Optional[str],
+) -> bytes:
+    """Encode one ``MetricBatch`` row as a spool record."""
+    parts = [
+        PAYLOAD_FIXED.pack(
+            float(timestamp),
+            float(value),
+            len(tags) | (INT_VALUE_FLAG if type(value) is int else 0),
+        ),
+        _pack_string(name),
+        _pack_string(source or ""),
+    ]
+    for key, tag in tags.items():
+        parts.append(_pack_string(str(key)))
+        parts.append(_pack_string(str(tag)))
+    payload = b"".join(parts)
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_metric(payload: bytes) -> Metric:
+    """Decode a record payload back into a metric."""
+    timestamp, value, tag_count = PAYLOAD_FIXED.unpack_from(payload)
+    if tag_count & INT_VALUE_FLAG:
+        value = int(value)
+        tag_count &= ~INT_VALUE_FLAG
+    offset = PAYLOAD_FIXED.size
+    strings = []
+    for _ in range(2 + 2 * tag_count):
+        (length,) = STRING_LENGTH.unpack_from(payload, offset)
+        offset += STRING_LENGTH.size
+        strings.append(payload[offset : offset + length].decode("utf-8"))
+        offset += length
+    name, source, tag_items = strings[0], strings[1], strings[2:]
+    tags = dict(zip(tag_items[::2], tag_items[1::2]))
+    return Metric(name, value, tags, timestamp=timestamp, source=source or None)
+
+
+class SpoolRead(NamedTuple):
+    """Metrics returned by ``MetricSpool.peek``, to be passed to ``ack``.
+
+    ``parts`` has one ``(segment, start, end, records, at_end, corrupt)``
+    entry per segment read.
+    """
+
+    metrics: List[Metric]
+    parts: List[Tuple[int, int, int, int, bool, bool]]
+
+
+class MetricSpool:
+    """Bounded append-only spool of metric records in segment files.
+
+    Records are appended to the newest segment, which is rotated once it
+    reaches ``segment_bytes``. Writes are fsynced every ``fsync_records``
+    records or ``fsync_interval`` seconds rather than per record. When the
+    spool would exceed ``max_bytes`` the oldest segments are discarded.
+
+    ``peek`` returns the oldest records in the order they were appended
+    without consuming them; ``ack`` consumes them and persists the read
+    position once they have been delivered. Records read but not acked are
+    returned again by the next ``peek``, including after a restart, so
+    delivery is at least once.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        segment_bytes: int = 16 * 1024 * 1024,
+        fsync_records: int = 1000,
+        fsync_interval: float = 1.0,
+    ):
+        """Open or create a spool in directory ``path``."""
+        self.path = path
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.fsync_records = fsync_records
+        self.fsync_interval = fsync_interval
+        self.logger = logging.getLogger(__name__)
+
+        # Reentrant so pop can peek and ack atomically
+        self._lock = threading.RLock()
+        self._file = None
+        self._active: Optional[int] = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._records_dropped = 0
+        self._records_corrupt = 0
+
+        os.makedirs(path, exist_ok=True)
+        self._segments = self._list_segments()
+        self._read_segment, self._read_offset = self._load_cursor()
+        self._segments = [s for s in self._segments if s >= self._read_segment]
+        if self._segments and self._segments[0] != self._read_segment:
+            self._read_segment = self._segments[0]
+            self._read_offset = len(SEGMENT_MAGIC)
+        self._records, self._bytes = self._scan()
+
+    def append(self, metrics: Iterable[Metric]) -> int:
+        """Append metrics; returns how many were written."""
+        written = 0
+        with self._lock:
+            for row in metric_rows(metrics):
+                record = encode_record(*row)
+                if not self._make_room(len(record)):
+                    self._records_dropped += 1
+                    continue
+                if self._file is None or self._file.tell() >= self.segment_bytes:
+                    self._open_segment()
+                self._file.write(record)
+                self._records += 1
+                self._bytes += len(record)
+                self._unsynced += 1
+                written += 1
+
+            if self._unsynced and (
+                self._unsynced >= self.fsync_records
+                or time.monotonic() - self._last_sync >= self.fsync_interval
+            ):
+                self._sync()
+        return written
+
+    def peek(self, max_records: int) -> SpoolRead:
+        """Read up to ``max_records`` of the oldest metrics, leaving them spooled."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+            metrics: List[Metric] = []
+            parts = []
+            offset = self._read_offset
+            for segment in list(self._segments):
+                if len(metrics) >= max_records:
+                    break
+                records, end, at_end, corrupt = self._read_records(
+                    segment, offset, max_records - len(metrics)
+                )
+                metrics.extend(records)
+                start = offset or len(SEGMENT_MAGIC)
+                parts.append((segment, start, end, len(records), at_end, corrupt))
+                if not at_end:
+                    break
+                offset = None
+            return SpoolRead(metrics, parts)
+
+    def ack(self, read: SpoolRead) -> None:
+        """Consume metrics returned by ``peek`` and persist the read position."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+            for segment, start, end, records, at_end, corrupt in read.parts:
+                if segment not in self._segments or (
+                    segment == self._read_segment and start < self._read_offset
+                ):
+                    # Dropped to make room, or acked already
+                    continue
+                self._records -= records
+                self._bytes -= end - start
+                self._read_offset = end
+
+                if segment == self._active and end < self._file.tell():
+                    # Appended to since it was read
+                    break
+                if not at_end:
+                    break
+                if corrupt:
+                    # A torn write from a crash; the rest of the segment is lost
+                    self._records_corrupt += 1
+                    self.logger.warning(
+                        f"Truncated spool segment {segment} at offset {end}"
+                    )
+                if segment == self._active:
+                    # Everything written so far has been read; start afresh
+                    self._close_file()
+                    self._active = None
+                self._drop_segment(segment)
+
+            self._save_cursor()
+
+    def pop(self, max_records: int) -> List[Metric]:
+        """Remove and return up to ``max_records`` of the oldest metrics.
+
+        Equivalent to ``peek`` then ``ack``: metrics are consumed before
+        they are delivered, so delivery is at most once.
+        """
+        with self._lock:
+            read = self.peek(max_records)
+            self.ack(read)
+            return read.metrics
+
+    def oldest_timestamp(self) -> Optional[float]:
+        """Timestamp of the next metric ``pop`` would return."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+            for segment in self._segments:
+                offset = self._read_offset if segment == self._read_segment else None
+                records, _, _, _ = self._read_records(segment, offset, 1)
+                if records:
+                    return records[0].timestamp
+            return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return spool size, drop counts and replay lag."""
+        oldest = self.oldest_timestamp()
+        with self._lock:
+            return {
+                "records": self._records,
+                "bytes": self._bytes,
+                "segments": len(self._segments),
+                "records_dropped": self._records_dropped,
+                "records_corrupt": self._records_corrupt,
+                "replay_lag_seconds": (
+                    max(time.time() - oldest, 0.0) if oldest is not None else 0.0
+                ),
+            }
+
+    def __len__(self) -> int:
+        return self._records
+
+    def close(self) -> None:
+        """Fsync and close the active segment."""
+        with self._lock:
+            self._close_file()
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.path, f"{segment:012d}{SEGMENT_SUFFIX}")
+
+    def _list_segments(self) -> List[int]:
+        return sorted(
+            int(name[: -len(SEGMENT_SUFFIX)])
+            for name in os.listdir(self.path)
+            if name.endswith(SEGMENT_SUFFIX) and name[: -len(SEGMENT_SUFFIX)].isdigit()
+        )
+
+    def _load_cursor(self) -> Tuple[int, int]:
+        try:
+            with open(os.path.join(self.path, CURSOR_FILE), "rb") as f:
+                segment, offset = struct.unpack("<QQ", f.read(16))
+        except (OSError, struct.error):
+            segment, offset = (self._segments[0] if self._segments else 0), 0
+        return segment, max(offset, len(SEGMENT_MAGIC))
+
+    def _save_cursor(self) -> None:
+        cursor_path = os.path.join(self.path, CURSOR_FILE)
+        with open(cursor_path + ".tmp", "wb") as f:
+            f.write(struct.pack("<QQ", self._read_segment, self._read_offset))
+        os.replace(cursor_path + ".tmp", cursor_path)
+
+    def _scan(self) -> Tuple[int, int]:
+        """Count unread records and bytes left by a previous run."""
+        records = size = 0
+        for segment in self._segments:
+            start = self._read_offset if segment == self._read_segment else None
+            found, end, _, _ = self._read_records(segment, start, None)
+            records += len(found)
+            size += end - (start or len(SEGMENT_MAGIC))
+        return records, size
+
+    def _read_records(
+        self, segment: int, offset: Optional[int], limit: Optional[int]
+    ) -> Tuple[List[Metric], int, bool, bool]:
+        """Read up to ``limit`` records from ``offset``.
+
+        Returns the records, the offset after them, whether the end of the
+        segment was reached and whether that end is a corrupt record.
+        """
+        offset = offset or len(SEGMENT_MAGIC)
+        records: List[Metric] = []
+        with open(self._segment_path(segment), "rb") as f:
+            if f.read(len(SEGMENT_MAGIC)) != SEGMENT_MAGIC:
+                return records, offset, True, True
+            f.seek(offset)
+            while limit is None or len(records) < limit:
+                header = f.read(RECORD_HEADER.size)
+                if not header:
+                    return records, offset, True, False
+                if len(header) < RECORD_HEADER.size:
+                    return records, offset, True, True
+                length, crc = RECORD_HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    return records, offset, True, True
+                records.append(decode_metric(payload))
+                offset += RECORD_HEADER.size + length
+        return records, offset, False, False
+
+    def _make_room(self, size: int) -> bool:
+        """Drop the oldest sealed segments until ``size`` more bytes fit."""
+        while self._bytes + size > self.max_bytes:
+            oldest = self._segments[0] if self._segments else None
+            if oldest is None or oldest == self._active:
+                return False
+            start = self._read_offset if oldest == self._read_segment else None
+            records, end, _, _ = self._read_records(oldest, start, None)
+            self._records -= len(records)
+            self._records_dropped += len(records)
+            self._bytes -= end - (start or len(SEGMENT_MAGIC))
+            self.logger.warning(
+                f"Spool full, dropped {len(records)} metrics from segment {oldest}"
+            )
+            self._drop_segment(oldest)
+        return True
+
+    def _drop_segment(self, segment: int) -> None:
+        self._segments.remove(segment)
+        try:
+            os.remove(self._segment_path(segment))
+        except OSError as e:
+            self.logger.error(f"Failed to remove spool segment {segment}: {e}")
+        if self._segments:
+            self._read_segment = self._segments[0]
+        else:
+            self._read_segment = segment + 1
+        self._read_offset = len(SEGMENT_MAGIC)
+
+    def _open_segment(self) -> None:
+        self._close_file()
+        segment = max(self._segments, default=self._read_segment - 1) + 1
+        self._file = open(self._segment_path(segment), "wb")
+        self._file.write(SEGMENT_MAGIC)
+        self._active = segment
+        self._segments.append(segment)
+        if len(self._segments) == 1:
+            self._read_segment = segment
+            self._read_offset = len(SEGMENT_MAGIC)
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+            self._file = None
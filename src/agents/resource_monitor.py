@@ -5,6 +5,8 @@ from typing import Any, Dict
 
 import psutil
 
+from src.agent.cpu_sampler import get_cpu_sampler
+
 
 class ResourceMonitor:
     def __init__(self):
@@ -13,7 +15,7 @@ class ResourceMonitor:
     def get_system_metrics(self) -> Dict[str, Any]:
         """Collect current system metrics."""
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
+            cpu_percent = get_cpu_sampler().percent()
             memory = psutil.virtual_memory()
             disk = psutil.disk_usage("/")
 
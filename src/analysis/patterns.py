@@ -0,0 +1,195 @@
+"""Weekly usage patterns computed from a 7x24 matrix.
+
+Values are binned by day of week and hour in a single ``np.add.at`` pass
+into sums, counts and sums of squares. Hourly and daily averages, idle and
+peak periods and recommendations are then read off the matrix, for one
+resource or, with a leading resource axis, for a whole fleet at once.
+Days run from Monday (0) to Sunday (6) and hours are UTC.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+DAY_NAMES = (
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+)
+# 1970-01-01 was a Thursday
+EPOCH_DAY_OF_WEEK = 3
+
+
+class WeeklyProfile:
+    """Sums, counts and sums of squares per resource, day of week and hour.
+
+    Arrays have shape ``(resources, 7, 24)``.
+    """
+
+    def __init__(self, sums: np.ndarray, counts: np.ndarray, sum_sqs: np.ndarray):
+        self.sums = sums
+        self.counts = counts
+        self.sum_sqs = sum_sqs
+
+    @classmethod
+    def from_values(
+        cls,
+        day_of_week: np.ndarray,
+        hour: np.ndarray,
+        values: np.ndarray,
+        resource: Optional[np.ndarray] = None,
+        resources: int = 1,
+    ) -> "WeeklyProfile":
+        """Bin values; ``resource`` gives each value's index into the fleet.
+
+        NaN values, such as empty aggregation windows, are left out.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        keep = np.isfinite(values)
+        if resource is None:
+            resource = np.zeros(len(values), dtype=np.intp)
+        values = values[keep]
+        index = (
+            np.asarray(resource)[keep],
+            np.asarray(day_of_week)[keep],
+            np.asarray(hour)[keep],
+        )
+        acc = np.zeros((resources, 7, 24, 3))
+        np.add.at(
+            acc, index, np.column_stack((values, np.ones_like(values), values**2))
+        )
+        return cls(acc[..., 0], acc[..., 1], acc[..., 2])
+
+    @classmethod
+    def from_timestamps(
+        cls,
+        timestamps: np.ndarray,
+        values: np.ndarray,
+        resource: Optional[np.ndarray] = None,
+        resources: int = 1,
+    ) -> "WeeklyProfile":
+        """Bin values by UTC epoch-second timestamps."""
+        seconds = np.asarray(timestamps, dtype=np.int64)
+        day_of_week = (seconds // 86400 + EPOCH_DAY_OF_WEEK) % 7
+        hour = seconds // 3600 % 24
+        return cls.from_values(day_of_week, hour, values, resource, resources)
+
+    def means(self) -> np.ndarray:
+        """Mean per resource, day and hour; NaN where there were no values."""
+        return self._mean(self.sums, self.counts)
+
+    def hourly_avg(self) -> np.ndarray:
+        """Mean per resource and hour of day, shape ``(resources, 24)``."""
+        return self._mean(self.sums.sum(axis=1), self.counts.sum(axis=1))
+
+    def daily_avg(self) -> np.ndarray:
+        """Mean per resource and day of week, shape ``(resources, 7)``."""
+        return self._mean(self.sums.sum(axis=2), self.counts.sum(axis=2))
+
+    def variability(self) -> np.ndarray:
+        """Sample standard deviation of all values per resource."""
+        n = self.counts.sum(axis=(1, 2))
+        total = self.sums.sum(axis=(1, 2))
+        total_sq = self.sum_sqs.sum(axis=(1, 2))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variance = (total_sq - total * total / n) / (n - 1)
+        # Rounding can leave a tiny negative variance for constant values
+        return np.sqrt(np.where(n > 1, np.maximum(variance, 0.0), np.nan))
+
+    @staticmethod
+    def _mean(sums: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+
+def _periods(means: np.ndarray, mask: np.ndarray) -> List[Dict[str, Any]]:
+    days, hours = np.nonzero(mask)
+    return [
+        {"day_of_week": int(day), "hour": int(hour), "avg_utilization": float(value)}
+        for day, hour, value in zip(days, hours, means[days, hours])
+    ]
+
+
+def _as_dict(averages: np.ndarray) -> Dict[int, float]:
+    present = np.flatnonzero(~np.isnan(averages))
+    return dict(zip(present.tolist(), averages[present].tolist()))
+
+
+def pattern_reports(
+    profile: WeeklyProfile,
+    idle_threshold: float = 20.0,
+    peak_threshold: float = 80.0,
+    low_usage_threshold: float = 20.0,
+) -> List[Dict[str, Any]]:
+    """Pattern analysis for each resource in the profile.
+
+    Each report has ``patterns`` (hourly and daily averages and
+    variability), ``idle_periods``, ``peak_periods`` and
+    ``recommendations``. Resources without values get an empty dict.
+    """
+    means = profile.means()
+    hourly = profile.hourly_avg()
+    daily = profile.daily_avg()
+    variability = profile.variability()
+    # Comparisons with NaN are False, so empty cells never qualify
+    with np.errstate(invalid="ignore"):
+        idle = means < idle_threshold
+        peak = means > peak_threshold
+        low_days = daily < low_usage_threshold
+        low_hours = hourly < low_usage_threshold
+    has_values = profile.counts.sum(axis=(1, 2)) > 0
+
+    reports = []
+    for r in range(len(means)):
+        if not has_values[r]:
+            reports.append({})
+            continue
+
+        recommendations = []
+        if low_days[r].any():
+            days = ", ".join(DAY_NAMES[d] for d in np.flatnonzero(low_days[r]))
+            recommendations.append(f"Consider scaling down resources on {days}")
+        if low_hours[r].any():
+            hours_str = ", ".join(f"{h:02d}:00" for h in np.flatnonzero(low_hours[r]))
+            recommendations.append(
+                f"Consider scaling down resources during hours: {hours_str}"
+            )
+
+        reports.append(
+            {
+                "patterns": {
+                    "hourly_avg": _as_dict(hourly[r]),
+                    "daily_avg": _as_dict(daily[r]),
+                    "variability": float(variability[r]),
+                },
+                "idle_periods": _periods(means[r], idle[r]),
+                "peak_periods": _periods(means[r], peak[r]),
+                "recommendations": recommendations,
+            }
+        )
+    return reports
+
+
+def fleet_pattern_reports(
+    resource_ids: Sequence[str],
+    timestamps: Sequence[np.ndarray],
+    values: Sequence[np.ndarray],
+    **thresholds: float,
+) -> Dict[str, Dict[str, Any]]:
+    """Pattern analysis per resource from per-resource timestamps and values.
+
+    The fleet is binned in one pass into a ``(resources, 7, 24)`` matrix.
+    """
+    lengths = [len(v) for v in values]
+    resource = np.repeat(np.arange(len(resource_ids)), lengths)
+    profile = WeeklyProfile.from_timestamps(
+        np.concatenate(timestamps) if lengths else np.empty(0),
+        np.concatenate(values) if lengths else np.empty(0),
+        resource,
+        len(resource_ids),
+    )
+    return dict(zip(resource_ids, pattern_reports(profile, **thresholds)))
@@ -0,0 +1,165 @@
+"""Hourly and daily rollups of ingested metrics.
+
+Each series, one metric of one resource, keeps per-bucket aggregates in
+two tiers: "1h" buckets and "1d" buckets. Each bucket holds the count,
+sum, sum of squares, min and max of its points. Rollups are updated as
+metrics are ingested, so an analysis over 30 days reads 720 hourly
+buckets rather than scanning raw points. Buckets are labelled by the UTC
+epoch second at which they start.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Tier name to bucket width in seconds
+TIERS = {"1h": 3600, "1d": 86400}
+FIELDS = ("count", "sum", "sum_sq", "min", "max")
+# (name, value, tags, timestamp, source)
+Row = Tuple[str, float, Dict[str, Any], float, Optional[str]]
+
+
+class RollupStore:
+    """In-memory rollup tiers per (resource, metric) series."""
+
+    def __init__(
+        self,
+        resource_tag: str = "resource_id",
+        hourly_retention_days: int = 35,
+        daily_retention_days: int = 400,
+    ):
+        """Initialize store; points without ``resource_tag`` are not rolled up."""
+        self.resource_tag = resource_tag
+        self.retention = {
+            "1h": hourly_retention_days * 86400,
+            "1d": daily_retention_days * 86400,
+        }
+        # tier -> (resource_id, metric_name) -> bucket start -> [count, sum,
+        # sum_sq, min, max]
+        self._tiers: Dict[str, Dict[Tuple[str, str], Dict[int, List[float]]]] = {
+            tier: {} for tier in TIERS
+        }
+        # Earliest time from which each series holds every point
+        self._covered_from: Dict[Tuple[str, str], float] = {}
+        self._latest = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, resource_id: str, metric_name: str, value: float, timestamp: float):
+        """Add one point to both tiers."""
+        with self._lock:
+            self._add((resource_id, metric_name), value, timestamp)
+
+    def add_rows(self, rows: Iterable[Row]) -> int:
+        """Add ``(name, value, tags, timestamp, source)`` rows; return how many."""
+        added = 0
+        with self._lock:
+            for name, value, tags, timestamp, _ in rows:
+                resource_id = tags.get(self.resource_tag)
+                if resource_id is not None:
+                    self._add((resource_id, name), value, timestamp)
+                    added += 1
+        return added
+
+    def merge(
+        self,
+        resource_id: str,
+        metric_name: str,
+        timestamp: float,
+        count: float,
+        total: float,
+        total_sq: float,
+        minimum: float,
+        maximum: float,
+    ) -> None:
+        """Merge pre-aggregated values for the bucket containing ``timestamp``.
+
+        Used to backfill from stored raw data; follow with ``mark_covered``.
+        """
+        with self._lock:
+            self._merge(
+                (resource_id, metric_name),
+                timestamp,
+                count,
+                total,
+                total_sq,
+                minimum,
+                maximum,
+            )
+
+    def covered_from(self, resource_id: str, metric_name: str) -> Optional[float]:
+        """Earliest timestamp from which the series is complete, if known."""
+        with self._lock:
+            return self._covered_from.get((resource_id, metric_name))
+
+    def mark_covered(self, resource_id: str, metric_name: str, start: float) -> None:
+        """Record that the series is complete from ``start``, as after a backfill."""
+        key = (resource_id, metric_name)
+        with self._lock:
+            self._covered_from[key] = min(start, self._covered_from.get(key, start))
+
+    def query(
+        self,
+        resource_id: str,
+        metric_name: str,
+        start: float,
+        end: float,
+        tier: str = "1h",
+    ) -> Dict[str, np.ndarray]:
+        """Buckets starting in ``[start, end)``, as arrays ordered by time.
+
+        Returns ``time`` (bucket start) and one array per aggregate field.
+        """
+        with self._lock:
+            buckets = self._tiers[tier].get((resource_id, metric_name), {})
+            items = sorted(
+                (bucket, values)
+                for bucket, values in buckets.items()
+                if start <= bucket < end
+            )
+        result = {"time": np.array([bucket for bucket, _ in items], dtype=np.int64)}
+        values = np.array([v for _, v in items], dtype=np.float64).reshape(-1, 5)
+        for i, field in enumerate(FIELDS):
+            result[field] = values[:, i]
+        return result
+
+    def _add(self, key: Tuple[str, str], value: float, timestamp: float) -> None:
+        value = float(value)
+        self._merge(key, timestamp, 1, value, value * value, value, value)
+        if timestamp < self._covered_from.get(key, float("inf")):
+            self._covered_from[key] = timestamp
+
+    def _merge(
+        self,
+        key: Tuple[str, str],
+        timestamp: float,
+        count: float,
+        total: float,
+        total_sq: float,
+        minimum: float,
+        maximum: float,
+    ) -> None:
+        if timestamp > self._latest:
+            self._latest = timestamp
+        for tier, width in TIERS.items():
+            series = self._tiers[tier].get(key)
+            if series is None:
+                series = self._tiers[tier][key] = {}
+            bucket = int(timestamp // width) * width
+            values = series.get(bucket)
+            if values is None:
+                cutoff = self._latest - self.retention[tier]
+                if bucket < cutoff:
+                    continue
+                # A new bucket is opened at most once per width; expire old ones
+                for old in [b for b in series if b < cutoff]:
+                    del series[old]
+                series[bucket] = [count, total, total_sq, minimum, maximum]
+                continue
+            values[0] += count
+            values[1] += total
+            values[2] += total_sq
+            if minimum < values[3]:
+                values[3] = minimum
+            if maximum > values[4]:
+                values[4] = maximum
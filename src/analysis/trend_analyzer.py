@@ -1,129 +1,160 @@
-from datetime import datetime, timedelta
-from typing import Any, Dict, List
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 from influxdb_client import InfluxDBClient
 
+from .patterns import WeeklyProfile, fleet_pattern_reports, pattern_reports
+from .rollups import RollupStore
+
+# Per-hour aggregates of raw points, for backfilling rollups
+BACKFILL_QUERY = """
+data = from(bucket: "{bucket}")
+    |> range(start: {start}, stop: {stop})
+    |> filter(fn: (r) => r["_measurement"] == "{metric_name}")
+    |> filter(fn: (r) => r["{resource_tag}"] == "{resource_id}")
+    |> group()
+    |> toFloat()
+agg = (fn, field) => data
+    |> aggregateWindow(every: 1h, fn: fn, timeSrc: "_start", createEmpty: false)
+    |> toFloat()
+    |> set(key: "_field", value: field)
+union(tables: [
+    agg(fn: count, field: "count"),
+    agg(fn: sum, field: "sum"),
+    data
+        |> map(fn: (r) => ({{r with _value: r._value * r._value}}))
+        |> aggregateWindow(every: 1h, fn: sum, timeSrc: "_start", createEmpty: false)
+        |> set(key: "_field", value: "sum_sq"),
+    agg(fn: min, field: "min"),
+    agg(fn: max, field: "max"),
+])
+    |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+"""
+
+
+def _flux_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime(
+        "%Y-%m-%dT%H:%M:%S.%fZ"
+    )
+
+
+def _epoch_seconds(times: pd.Series) -> np.ndarray:
+    """UTC epoch seconds of a time column, whatever its datetime resolution."""
+    times = pd.to_datetime(times, utc=True)
+    return ((times - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)).to_numpy()
+
 
 class TrendAnalyzer:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], rollups: Optional[RollupStore] = None):
+        """Initialize analyzer.
+
+        With ``rollups``, analyses read hourly rollups maintained at ingest,
+        backfilling a series from InfluxDB the first time its rollups do
+        not reach back far enough. Longer periods than the hourly rollups
+        retain are still queried from raw points.
+        """
         self.client = InfluxDBClient(
             url=config["url"], token=config["token"], org=config["org"]
         )
         self.query_api = self.client.query_api()
         self.bucket = config["bucket"]
+        self.rollups = rollups
 
     def analyze_resource_patterns(
         self, resource_id: str, metric_name: str, days: int = 30
     ) -> Dict[str, Any]:
         """Analyze resource usage patterns over the specified period."""
+        timestamps, values = self._hourly_series(resource_id, metric_name, days)
+        profile = WeeklyProfile.from_timestamps(timestamps, values)
+        return pattern_reports(profile)[0]
+
+    def analyze_fleet_patterns(
+        self, resource_ids: List[str], metric_name: str, days: int = 30
+    ) -> Dict[str, Dict[str, Any]]:
+        """Analyze usage patterns of many resources, binned together."""
+        series = [
+            self._hourly_series(resource_id, metric_name, days)
+            for resource_id in resource_ids
+        ]
+        return fleet_pattern_reports(
+            resource_ids,
+            [timestamps for timestamps, _ in series],
+            [values for _, values in series],
+        )
+
+    def _hourly_series(
+        self, resource_id: str, metric_name: str, days: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Hourly mean values and their epoch-second timestamps."""
+        # Rollups older than their retention are gone; query raw points then
+        if self.rollups is not None and days * 86400 <= self.rollups.retention["1h"]:
+            return self._hourly_from_rollups(resource_id, metric_name, days)
+        return self._hourly_from_raw(resource_id, metric_name, days)
+
+    def _hourly_from_rollups(
+        self, resource_id: str, metric_name: str, days: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Hourly means from the rollup store, timestamped by hour start."""
+        end = time.time()
+        start = (end - days * 86400) // 3600 * 3600
+        covered_from = self.rollups.covered_from(resource_id, metric_name)
+        if covered_from is None or covered_from > start:
+            self._backfill(resource_id, metric_name, start, covered_from or end)
+
+        buckets = self.rollups.query(resource_id, metric_name, start, end)
+        return buckets["time"], buckets["sum"] / buckets["count"]
+
+    def _backfill(
+        self, resource_id: str, metric_name: str, start: float, stop: float
+    ) -> None:
+        """Roll up raw points in ``[start, stop)`` that were not seen at ingest."""
+        query = BACKFILL_QUERY.format(
+            bucket=self.bucket,
+            start=_flux_time(start),
+            stop=_flux_time(stop),
+            metric_name=metric_name,
+            resource_tag=self.rollups.resource_tag,
+            resource_id=resource_id,
+        )
+        result = self.query_api.query_data_frame(query)
+        if isinstance(result, list):
+            result = pd.concat(result) if result else pd.DataFrame()
+        if not result.empty:
+            for timestamp, row in zip(
+                _epoch_seconds(result["_time"]), result.itertuples(index=False)
+            ):
+                self.rollups.merge(
+                    resource_id,
+                    metric_name,
+                    float(timestamp),
+                    row.count,
+                    row.sum,
+                    row.sum_sq,
+                    row.min,
+                    row.max,
+                )
+        self.rollups.mark_covered(resource_id, metric_name, start)
+
+    def _hourly_from_raw(
+        self, resource_id: str, metric_name: str, days: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Hourly means queried from raw points, timestamped by hour start."""
         query = f"""
         from(bucket: "{self.bucket}")
             |> range(start: -{days}d)
             |> filter(fn: (r) => r["_measurement"] == "{metric_name}")
             |> filter(fn: (r) => r["resource_id"] == "{resource_id}")
-            |> aggregateWindow(every: 1h, fn: mean)
+            |> aggregateWindow(every: 1h, fn: mean, timeSrc: "_start")
         """
 
         result = self.query_api.query_data_frame(query)
         if result.empty:
-            return {}
-
-        # Convert to pandas DataFrame for analysis
-        df = pd.DataFrame(result)
-        df["_time"] = pd.to_datetime(df["_time"])
-        df.set_index("_time", inplace=True)
-
-        # Add hour and day of week
-        df["hour"] = df.index.hour
-        df["day_of_week"] = df.index.dayofweek
-
-        analysis = {
-            "patterns": self._identify_patterns(df),
-            "idle_periods": self._find_idle_periods(df),
-            "peak_periods": self._find_peak_periods(df),
-            "recommendations": self._generate_recommendations(df),
-        }
-
-        return analysis
-
-    def _identify_patterns(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Identify recurring patterns in the data."""
-        patterns = {
-            "hourly_avg": df.groupby("hour")["_value"].mean().to_dict(),
-            "daily_avg": df.groupby("day_of_week")["_value"].mean().to_dict(),
-            "variability": df["_value"].std(),
-        }
-        return patterns
-
-    def _find_idle_periods(
-        self, df: pd.DataFrame, threshold: float = 20.0
-    ) -> List[Dict]:
-        """Find periods of low resource utilization."""
-        idle_periods = []
-
-        # Group by hour and day of week
-        hourly_avg = df.groupby(["day_of_week", "hour"])["_value"].mean()
-
-        for (day, hour), value in hourly_avg.items():
-            if value < threshold:
-                idle_periods.append(
-                    {"day_of_week": day, "hour": hour, "avg_utilization": value}
-                )
-
-        return idle_periods
-
-    def _find_peak_periods(
-        self, df: pd.DataFrame, threshold: float = 80.0
-    ) -> List[Dict]:
-        """Find periods of high resource utilization."""
-        peak_periods = []
+            return np.empty(0, dtype=np.int64), np.empty(0)
 
-        # Group by hour and day of week
-        hourly_avg = df.groupby(["day_of_week", "hour"])["_value"].mean()
-
-        for (day, hour), value in hourly_avg.items():
-            if value > threshold:
-                peak_periods.append(
-                    {"day_of_week": day, "hour": hour, "avg_utilization": value}
-                )
-
-        return peak_periods
-
-    def _generate_recommendations(self, df: pd.DataFrame) -> List[str]:
-        """Generate optimization recommendations based on usage patterns."""
-        recommendations = []
-
-        # Analyze daily patterns
-        daily_avg = df.groupby("day_of_week")["_value"].mean()
-        low_usage_days = daily_avg[daily_avg < 20].index
-
-        if len(low_usage_days) > 0:
-            days = [
-                [
-                    "Monday",
-                    "Tuesday",
-                    "Wednesday",
-                    "Thursday",
-                    "Friday",
-                    "Saturday",
-                    "Sunday",
-                ][d]
-                for d in low_usage_days
-            ]
-            recommendations.append(
-                f"Consider scaling down resources on {', '.join(days)}"
-            )
-
-        # Analyze hourly patterns
-        hourly_avg = df.groupby("hour")["_value"].mean()
-        low_usage_hours = hourly_avg[hourly_avg < 20].index
-
-        if len(low_usage_hours) > 0:
-            hours_str = ", ".join([f"{h:02d}:00" for h in low_usage_hours])
-            recommendations.append(
-                f"Consider scaling down resources during hours: {hours_str}"
-            )
-
-        return recommendations
+        return (
+            _epoch_seconds(result["_time"]),
+            result["_value"].to_numpy(dtype=np.float64),
+        )
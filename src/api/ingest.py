@@ -0,0 +1,222 @@
+"""Bulk metrics ingestion: decoding and vectorised validation."""
+
+import json
+import math
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+NDJSON_CONTENT_TYPES = {
+    "application/x-ndjson",
+    "application/ndjson",
+    "application/jsonl",
+}
+MSGPACK_CONTENT_TYPES = {"application/msgpack", "application/x-msgpack"}
+
+
+class IngestError(ValueError):
+    """Raised when a bulk body cannot be decoded at all."""
+
+
+class UnsupportedContentType(IngestError):
+    """Raised when the body format is not one we can decode."""
+
+
+class _Rejected:
+    """Placeholder for a record that could not be decoded."""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+
+
+def decode_records(body: bytes, content_type: str) -> List[Any]:
+    """Decode an NDJSON or msgpack body into a list of raw records.
+
+    Undecodable NDJSON lines are kept as placeholders so record indices in
+    the response line up with the lines the client sent.
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+
+    if media_type in NDJSON_CONTENT_TYPES:
+        records = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError as e:
+                records.append(_Rejected(f"invalid JSON: {e}"))
+        return records
+
+    if media_type in MSGPACK_CONTENT_TYPES:
+        if msgpack is None:
+            raise UnsupportedContentType("msgpack bodies require the msgpack package")
+        # timestamp=3 decodes the msgpack timestamp extension to datetime
+        unpacker = msgpack.Unpacker(raw=False, timestamp=3)
+        unpacker.feed(body)
+        records = []
+        try:
+            for obj in unpacker:
+                # Accept either a stream of records or a single array of them
+                if isinstance(obj, list):
+                    records.extend(obj)
+                else:
+                    records.append(obj)
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError) as e:
+            raise IngestError(f"invalid msgpack stream: {e}")
+        return records
+
+    raise UnsupportedContentType(f"unsupported content type: {content_type}")
+
+
+class MetricsBatch:
+    """Validated records split into per-resource column blocks."""
+
+    def __init__(
+        self,
+        blocks: List[Tuple[str, np.ndarray, Dict[str, np.ndarray]]],
+        accepted: int,
+        rejected: List[Dict[str, Any]],
+    ):
+        self.blocks = blocks
+        self.accepted = accepted
+        self.rejected = rejected
+
+    def __iter__(self) -> Iterator[Tuple[str, np.ndarray, Dict[str, np.ndarray]]]:
+        return iter(self.blocks)
+
+
+def validate_records(records: List[Any]) -> MetricsBatch:
+    """Validate raw records and pivot the accepted ones into columns.
+
+    Field extraction is a single pass over the records; timestamp parsing,
+    finiteness checks and the pivot into metric columns are vectorised.
+    """
+    count = len(records)
+    reasons: Dict[int, str] = {}
+
+    resource_ids = np.empty(count, dtype=object)
+    well_formed = np.zeros(count, dtype=bool)
+    raw_timestamps = np.empty(count, dtype=object)
+    value_records: List[int] = []
+    value_names: List[str] = []
+    value_list: List[Any] = []
+
+    for i, record in enumerate(records):
+        if isinstance(record, _Rejected):
+            reasons[i] = record.reason
+            continue
+        if not isinstance(record, dict):
+            reasons[i] = "record must be an object"
+            continue
+
+        resource_id = record.get("resource_id")
+        metrics = record.get("metrics")
+        if not isinstance(resource_id, str) or not resource_id:
+            reasons[i] = "missing resource_id"
+            continue
+        if not isinstance(metrics, dict) or not metrics:
+            reasons[i] = "missing metrics"
+            continue
+        if not all(isinstance(name, str) for name in metrics):
+            reasons[i] = "metric names must be strings"
+            continue
+
+        well_formed[i] = True
+        resource_ids[i] = resource_id
+        raw_timestamps[i] = record.get("timestamp")
+        for name, value in metrics.items():
+            value_records.append(i)
+            value_names.append(name)
+            value_list.append(value)
+
+    # Timestamps: ISO strings, datetimes or epoch seconds; naive means UTC
+    timestamps = np.full(count, np.iinfo(np.int64).min, dtype=np.int64)
+    is_number = np.fromiter(
+        (
+            isinstance(t, (int, float)) and not isinstance(t, bool)
+            for t in raw_timestamps
+        ),
+        dtype=bool,
+        count=count,
+    )
+    is_text = np.fromiter(
+        (isinstance(t, (str, datetime)) for t in raw_timestamps),
+        dtype=bool,
+        count=count,
+    )
+    if is_text.any():
+        parsed = pd.to_datetime(
+            pd.Series(raw_timestamps[is_text]),
+            utc=True,
+            errors="coerce",
+            format="ISO8601",
+        )
+        valid = parsed.notna().to_numpy()
+        text_ns = np.full(len(parsed), np.iinfo(np.int64).min, dtype=np.int64)
+        text_ns[valid] = parsed[valid].dt.as_unit("ns").astype("int64").to_numpy()
+        timestamps[is_text] = text_ns
+    if is_number.any():
+        seconds = raw_timestamps[is_number].astype(np.float64)
+        timestamps[is_number] = np.where(
+            np.isfinite(seconds), np.round(seconds * 1e9), np.iinfo(np.int64).min
+        ).astype(np.int64)
+
+    bad_timestamp = timestamps == np.iinfo(np.int64).min
+    for i in np.flatnonzero(bad_timestamp & well_formed).tolist():
+        reasons[i] = "invalid timestamp"
+
+    # Metric values: anything non-numeric or non-finite rejects the record
+    value_records_arr = np.asarray(value_records, dtype=np.int64)
+    values = np.fromiter(
+        (
+            v if isinstance(v, (int, float)) and not isinstance(v, bool) else math.nan
+            for v in value_list
+        ),
+        dtype=np.float64,
+        count=len(value_list),
+    )
+    bad_value = ~np.isfinite(values)
+    for i in np.unique(value_records_arr[bad_value]).tolist():
+        reasons.setdefault(i, "metric values must be finite numbers")
+
+    accepted_mask = np.zeros(count, dtype=bool)
+    accepted_mask[value_records_arr] = True
+    if reasons:
+        accepted_mask[list(reasons)] = False
+
+    blocks: List[Tuple[str, np.ndarray, Dict[str, np.ndarray]]] = []
+    accepted_idx = np.flatnonzero(accepted_mask)
+    if len(accepted_idx):
+        names, name_idx = np.unique(
+            np.asarray(value_names, dtype=object), return_inverse=True
+        )
+        matrix = np.full((count, len(names)), np.nan, dtype=np.float64)
+        keep = accepted_mask[value_records_arr]
+        matrix[value_records_arr[keep], name_idx[keep]] = values[keep]
+
+        groups, group_idx, group_sizes = np.unique(
+            resource_ids[accepted_idx], return_inverse=True, return_counts=True
+        )
+        grouped = accepted_idx[np.argsort(group_idx, kind="stable")]
+        bounds = np.cumsum(group_sizes)[:-1]
+        for resource_id, rows in zip(groups.tolist(), np.split(grouped, bounds)):
+            block = matrix[rows]
+            present = ~np.isnan(block).all(axis=0)
+            blocks.append(
+                (
+                    resource_id,
+                    timestamps[rows],
+                    {names[j]: block[:, j] for j in np.flatnonzero(present).tolist()},
+                )
+            )
+
+    rejected = [{"index": i, "error": reasons[i]} for i in sorted(reasons)]
+    return MetricsBatch(blocks, int(len(accepted_idx)), rejected)
@@ -1,18 +1,87 @@
 import base64
 import hashlib
 import hmac
+import logging
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import boto3
 
+DEFAULT_HASH_INDEX = "api_key_hash-index"
+
+
+class _TTLCache:
+    """Bounded LRU cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Dict) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def remove_where(self, account_id: str, api_key_id: str) -> None:
+        with self._lock:
+            stale = [
+                key
+                for key, (_, value) in self._entries.items()
+                if value["account_id"] == account_id
+                and value["api_key_id"] == api_key_id
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
 
 class APIKeyManager:
+    """Issues and validates API keys stored in DynamoDB.
+
+    Keys are looked up through a GSI on ``api_key_hash`` (``api_key_hash_index``
+    in the config) and validated keys are cached in-process for ``cache_ttl``
+    seconds. ``last_used`` is recorded in memory and written back every
+    ``last_used_flush_interval`` seconds.
+    """
+
     def __init__(self, config: Dict):
         self.dynamodb = boto3.resource("dynamodb")
         self.table = self.dynamodb.Table(config["dynamodb_table"])
         self.secret_key = config["secret_key"]
+        self.hash_index = config.get("api_key_hash_index", DEFAULT_HASH_INDEX)
+        self.last_used_flush_interval = config.get("last_used_flush_interval", 60)
+        self.logger = logging.getLogger(__name__)
+
+        self._cache = _TTLCache(
+            config.get("cache_size", 10000), config.get("cache_ttl", 300)
+        )
+        self._pending_last_used: Dict[Tuple[str, str], str] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_stop = threading.Event()
+        self._flush_thread: Optional[threading.Thread] = None
 
     def generate_api_key(self, account_id: str, description: str = "") -> Dict:
         """Generate a new API key for an account."""
@@ -49,48 +118,98 @@ class APIKeyManager:
         # Hash the provided key
         key_hash = hashlib.sha256(api_key.encode()).hexdigest()
 
-        # Scan for the key (in production, use a GSI for better performance)
-        response = self.table.scan(
-            FilterExpression="api_key_hash = :hash AND status = :status",
+        key_details = self._cache.get(key_hash)
+        if key_details is None:
+            key_details = self._lookup_key(key_hash)
+            if key_details is None:
+                return None
+            self._cache.put(key_hash, key_details)
+
+        self._record_last_used(key_details["account_id"], key_details["api_key_id"])
+        return dict(key_details)
+
+    def _lookup_key(self, key_hash: str) -> Optional[Dict]:
+        """Find an active key by hash through the GSI."""
+        response = self.table.query(
+            IndexName=self.hash_index,
+            KeyConditionExpression="api_key_hash = :hash",
+            FilterExpression="#status = :status",
+            ExpressionAttributeNames={"#status": "status"},
             ExpressionAttributeValues={":hash": key_hash, ":status": "active"},
         )
 
-        if response["Items"]:
-            key_details = response["Items"][0]
+        if not response["Items"]:
+            return None
 
-            # Update last used timestamp
-            self.table.update_item(
-                Key={
-                    "account_id": key_details["account_id"],
-                    "api_key_id": key_details["api_key_id"],
-                },
-                UpdateExpression="SET last_used = :timestamp",
-                ExpressionAttributeValues={
-                    ":timestamp": str(int(datetime.utcnow().timestamp()))
-                },
-            )
-
-            return {
-                "account_id": key_details["account_id"],
-                "api_key_id": key_details["api_key_id"],
-                "created_at": datetime.fromtimestamp(
-                    int(key_details["created_at"])
-                ).isoformat(),
-            }
+        item = response["Items"][0]
+        return {
+            "account_id": item["account_id"],
+            "api_key_id": item["api_key_id"],
+            "created_at": datetime.fromtimestamp(int(item["created_at"])).isoformat(),
+        }
 
-        return None
+    def _record_last_used(self, account_id: str, api_key_id: str) -> None:
+        """Note a key was used; the write happens on the next flush."""
+        with self._pending_lock:
+            self._pending_last_used[(account_id, api_key_id)] = str(
+                int(datetime.utcnow().timestamp())
+            )
+            if self._flush_thread is None:
+                self._flush_thread = threading.Thread(
+                    target=self._flush_loop, name="api-key-last-used", daemon=True
+                )
+                self._flush_thread.start()
+
+    def _flush_loop(self) -> None:
+        while not self._flush_stop.wait(self.last_used_flush_interval):
+            self.flush_last_used()
+
+    def flush_last_used(self) -> int:
+        """Write pending ``last_used`` timestamps; returns keys updated."""
+        with self._pending_lock:
+            pending = self._pending_last_used
+            self._pending_last_used = {}
+
+        updated = 0
+        for (account_id, api_key_id), timestamp in pending.items():
+            try:
+                self.table.update_item(
+                    Key={"account_id": account_id, "api_key_id": api_key_id},
+                    UpdateExpression="SET last_used = :timestamp",
+                    ConditionExpression="attribute_exists(api_key_id)",
+                    ExpressionAttributeValues={":timestamp": timestamp},
+                )
+                updated += 1
+            except Exception as e:
+                self.logger.error(
+                    f"Failed to update last_used for {api_key_id}: {str(e)}"
+                )
+        return updated
+
+    def close(self) -> None:
+        """Stop the background flush and write pending ``last_used`` values."""
+        self._flush_stop.set()
+        if self._flush_thread is not None:
+            self._flush_thread.join()
+        self.flush_last_used()
 
     def revoke_api_key(self, account_id: str, api_key_id: str) -> bool:
         """Revoke an API key."""
+        # Drop it from the cache first so it stops validating immediately
+        self._cache.remove_where(account_id, api_key_id)
         try:
             self.table.update_item(
                 Key={"account_id": account_id, "api_key_id": api_key_id},
-                UpdateExpression="SET status = :status",
+                UpdateExpression="SET #status = :status",
+                ExpressionAttributeNames={"#status": "status"},
                 ExpressionAttributeValues={":status": "revoked"},
             )
             return True
         except Exception:
             return False
+        finally:
+            # A validation racing with the update may have re-cached the key
+            self._cache.remove_where(account_id, api_key_id)
 
     def list_api_keys(self, account_id: str) -> List[Dict]:
         """List all API keys for an account."""
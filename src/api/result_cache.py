@@ -0,0 +1,133 @@
+"""Cache of computed results, invalidated when new data is ingested.
+
+Results are keyed by ``(resource_id, metric_name, window)``. Ingest
+advances a watermark per resource and metric, and a cached result is only
+served while the watermarks it was computed at are current, so a result
+is recomputed exactly when points have arrived for its key (or after
+``max_age`` seconds, since windows such as "last 30 days" move with the
+clock). Concurrent requests for a key that is being computed wait for
+that one computation instead of starting their own.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Metric name standing for every metric of a resource
+ALL_METRICS = "*"
+
+CacheKey = Tuple[str, str, Hashable]
+
+
+class ResultCache:
+    """Bounded LRU of results with ingest watermarks and single-flight."""
+
+    def __init__(self, maxsize: int = 1024, max_age: float = 300.0):
+        """Initialize cache; entries are recomputed after ``max_age`` seconds."""
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self._entries: "OrderedDict[CacheKey, Tuple[int, float, Any]]" = OrderedDict()
+        self._watermarks: Dict[Tuple[str, str], int] = {}
+        self._in_flight: Dict[CacheKey, asyncio.Future] = {}
+        # Ingest may run on other threads than the event loop
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "stale": 0}
+
+    def advance(self, resource_id: str, metric_name: Optional[str] = None) -> None:
+        """Record that points arrived for a resource's metric.
+
+        Results keyed by that metric, and by ``ALL_METRICS`` for the
+        resource, become stale. Without ``metric_name``, every result for
+        the resource does.
+        """
+        with self._lock:
+            if metric_name is None:
+                for key in [k for k in self._watermarks if k[0] == resource_id]:
+                    self._watermarks[key] += 1
+            elif metric_name != ALL_METRICS:
+                key = (resource_id, metric_name)
+                self._watermarks[key] = self._watermarks.get(key, 0) + 1
+            key = (resource_id, ALL_METRICS)
+            self._watermarks[key] = self._watermarks.get(key, 0) + 1
+
+    async def get_or_compute(
+        self,
+        resource_id: str,
+        metric_name: str,
+        window: Hashable,
+        compute: Callable[[], Any],
+    ) -> Any:
+        """Return the cached result for the key, or run ``compute`` for it.
+
+        ``compute`` is a blocking function and runs in the default executor.
+        Its exceptions propagate to every caller waiting on it and nothing
+        is cached.
+        """
+        key = (resource_id, metric_name, window)
+        with self._lock:
+            watermark = self._watermarks.setdefault((resource_id, metric_name), 0)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == watermark and time.monotonic() - entry[1] < self.max_age:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry[2]
+                del self._entries[key]
+                self._stats["stale"] += 1
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+            else:
+                self._stats["misses"] += 1
+                leader = self._in_flight[key] = (
+                    asyncio.get_running_loop().create_future()
+                )
+        if future is not None:
+            return await asyncio.shield(future)
+
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(None, compute)
+        except asyncio.CancelledError:
+            with self._lock:
+                del self._in_flight[key]
+            leader.cancel()
+            raise
+        except Exception as e:
+            with self._lock:
+                del self._in_flight[key]
+            leader.set_exception(e)
+            # Mark retrieved so an exception nobody else waits on is not logged
+            leader.exception()
+            raise
+
+        with self._lock:
+            del self._in_flight[key]
+            # Points that arrived while computing leave the result stale
+            self._entries[key] = (watermark, time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        leader.set_result(result)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit, miss, coalesced and stale counts and the hit ratio.
+
+        The hit ratio counts coalesced requests as hits, since they did not
+        compute anything either.
+        """
+        with self._lock:
+            served = self._stats["hits"] + self._stats["coalesced"]
+            lookups = served + self._stats["misses"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "hit_ratio": served / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -5,6 +5,8 @@ from datetime import datetime, timedelta
 from typing import Optional
 from pydantic import BaseModel
 
+from src.auth.token_cache import token_cache
+
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 # Secret key for JWT token
@@ -44,7 +46,11 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = token_cache.verify(
+            token,
+            SECRET_KEY,
+            lambda t: jwt.decode(t, SECRET_KEY, algorithms=[ALGORITHM]),
+        )
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
@@ -8,6 +8,8 @@ import numpy as np
 import statistics
 from fastapi import APIRouter, HTTPException, Request
 
+from src.agent.cpu_sampler import get_cpu_sampler
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -54,9 +56,11 @@ def generate_cost_data(months: int = 6) -> List[Dict]:
     return data[::-1]  # Reverse to get chronological order
 
 def get_cpu_utilization():
+    sampler = get_cpu_sampler()
     return {
         "timestamp": datetime.now().isoformat(),
-        "value": psutil.cpu_percent(interval=1)
+        "value": sampler.percent(),
+        "percentiles": sampler.percentiles(),
     }
 
 def get_memory_usage():
@@ -227,7 +231,7 @@ async def get_cost_analysis_with_date_range(date_range: DateRange):
 async def get_resource_status():
     """Get current resource status counts and system metrics."""
     try:
-        cpu_usage = psutil.cpu_percent()
+        cpu_usage = get_cpu_sampler().percent()
         memory_usage = get_memory_usage()
         
         # Simulate resource counts based on system metrics
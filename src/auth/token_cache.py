@@ -0,0 +1,84 @@
+"""Cache of verified JWT payloads.
+
+Agents and browser sessions present the same token on every request, so
+the payload of a token that verified is kept until the token's ``exp``
+claim, and later requests with it skip signature verification. Entries
+are keyed by a SHA-256 digest of the verification key and the token, so
+raw tokens are not held and tokens are only shared between callers that
+verify with the same key. Failed verifications are never cached.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+
+class VerifiedTokenCache:
+    """Bounded LRU cache of verified token payloads, expiring with the token."""
+
+    def __init__(self, maxsize: int = 10000, max_ttl: float = 3600):
+        """Initialize cache; no entry is kept longer than ``max_ttl`` seconds."""
+        self.maxsize = maxsize
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def verify(
+        self,
+        token: str,
+        key: str,
+        decode: Callable[[str], Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Return the token's payload, calling ``decode`` only on a cache miss.
+
+        ``decode`` verifies the token with ``key`` and raises if it is
+        invalid; its exception propagates unchanged.
+        """
+        digest = hashlib.sha256(f"{key}\0{token}".encode()).digest()
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(digest)
+                    self.hits += 1
+                    return dict(entry[1])
+                del self._entries[digest]
+            self.misses += 1
+
+        payload = decode(token)
+
+        expires = now + self.max_ttl
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires = min(expires, exp)
+        if expires > now:
+            with self._lock:
+                self._entries[digest] = (expires, dict(payload))
+                self._entries.move_to_end(digest)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return payload
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit and miss counts and the number of cached tokens"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared by every verification path in the process
+token_cache = VerifiedTokenCache()
@@ -5,6 +5,7 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from . import models
+from .token_cache import token_cache
 
 # to get a string like this run:
 # openssl rand -hex 32
@@ -34,9 +35,13 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def _decode_access_token(token: str) -> dict:
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
 def verify_access_token(token: str) -> str:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = token_cache.verify(token, SECRET_KEY, _decode_access_token)
         email: str = payload.get("sub")
         if email is None:
             raise JWTError
@@ -14,11 +14,13 @@ class ResourceOptimizer:
         self.predictor = predictor or MetricsPredictor()
         self.logger = logging.getLogger(__name__)
 
-    def optimize_resource(self, resource_id: str) -> List[Dict[str, Any]]:
-        """Get optimization recommendations for a resource."""
+    def optimize_resource(
+        self, resource_id: str, hours: float = 24
+    ) -> List[Dict[str, Any]]:
+        """Get optimization recommendations from the last ``hours`` of metrics."""
         try:
             # Get current metrics and predictions
-            metrics = self.predictor.get_historical_metrics(resource_id)
+            metrics = self.predictor.get_historical_metrics(resource_id, hours=hours)
             predictions = self.predictor.predict({"resource_id": resource_id})
 
             # Generate recommendations
@@ -86,10 +88,12 @@ class ResourceOptimizer:
             self.logger.error(f"Failed to get recommendations: {str(e)}")
             raise
 
-    def get_optimization_metrics(self, resource_id: str) -> Dict[str, Any]:
-        """Get optimization metrics for a resource."""
+    def get_optimization_metrics(
+        self, resource_id: str, hours: float = 24
+    ) -> Dict[str, Any]:
+        """Get optimization metrics over the last ``hours`` for a resource."""
         try:
-            metrics = self.predictor.get_historical_metrics(resource_id)
+            metrics = self.predictor.get_historical_metrics(resource_id, hours=hours)
             if metrics.empty:
                 return {}
 
@@ -5,12 +5,15 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, List
 
 import uvicorn
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.api.models import (MetricsPrediction, MetricsSubmission,
                             ResourceRecommendation, ScheduledAction,
                             ScheduleResponse)
+from src.api.ingest import (IngestError, UnsupportedContentType,
+                            decode_records, validate_records)
+from src.api.result_cache import ALL_METRICS, ResultCache
 from src.api.routes import router as api_router
 from src.api.routes.metrics import router as metrics_router
 from src.api.routes.cost_optimization import router as cost_optimization_router
@@ -44,6 +47,7 @@ app.add_middleware(
 _predictor = None
 _scheduler = None
 _optimizer = None
+_result_cache = None
 
 def get_predictor() -> ResourcePredictor:
     """Get metrics predictor instance."""
@@ -66,6 +70,13 @@ def get_optimizer() -> ResourceOptimizer:
         _optimizer = ResourceOptimizer()
     return _optimizer
 
+def get_result_cache() -> ResultCache:
+    """Get cache of computed results."""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache()
+    return _result_cache
+
 # Include routers
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
 app.include_router(api_router, prefix="/api/v1", tags=["api"])
@@ -85,7 +96,9 @@ async def health_check():
 
 @app.post("/api/v1/metrics")
 async def submit_metrics(
-    metrics: MetricsSubmission, predictor: ResourcePredictor = Depends(get_predictor)
+    metrics: MetricsSubmission,
+    predictor: ResourcePredictor = Depends(get_predictor),
+    cache: ResultCache = Depends(get_result_cache),
 ) -> Dict[str, Any]:
     """Submit resource metrics."""
     try:
@@ -95,12 +108,46 @@ async def submit_metrics(
             timestamp=data["timestamp"],
             metrics=data["metrics"],
         )
+        cache.advance(data["resource_id"])
         return {"status": "success", "message": "Metrics stored successfully"}
     except Exception as e:
         logger.error(f"Error submitting metrics: {str(e)}")
         return {"status": "error", "message": str(e)}
 
 
+@app.post("/api/v1/metrics/bulk")
+async def submit_metrics_bulk(
+    request: Request,
+    predictor: ResourcePredictor = Depends(get_predictor),
+    cache: ResultCache = Depends(get_result_cache),
+) -> Dict[str, Any]:
+    """Submit many metric records as an NDJSON or msgpack stream.
+
+    Invalid records are reported by index instead of failing the batch.
+    """
+    body = await request.body()
+    try:
+        records = decode_records(body, request.headers.get("content-type", ""))
+    except UnsupportedContentType as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except IngestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        batch = validate_records(records)
+        predictor.store_metrics_batch(batch)
+        for resource_id, _, _ in batch:
+            cache.advance(resource_id)
+        return {
+            "status": "success",
+            "accepted": batch.accepted,
+            "rejected": batch.rejected,
+        }
+    except Exception as e:
+        logger.error(f"Error submitting metrics batch: {str(e)}")
+        return {"status": "error", "message": str(e)}
+
+
 @app.get("/api/v1/metrics/{resource_id}")
 async def get_metrics(
     resource_id: str, predictor: ResourcePredictor = Depends(get_predictor)
@@ -125,17 +172,33 @@ async def get_metrics(
 
 @app.get("/api/v1/recommendations/{resource_id}")
 async def get_recommendations(
-    resource_id: str, optimizer: ResourceOptimizer = Depends(get_optimizer)
+    resource_id: str,
+    optimizer: ResourceOptimizer = Depends(get_optimizer),
+    cache: ResultCache = Depends(get_result_cache),
 ) -> Dict[str, Any]:
     """Get resource optimization recommendations."""
     try:
-        recommendations = optimizer.get_recommendations(resource_id)
+        # Recomputed only once new metrics arrive for the resource
+        recommendations = await cache.get_or_compute(
+            resource_id,
+            ALL_METRICS,
+            "recommendations",
+            lambda: optimizer.get_recommendations(resource_id),
+        )
         return {"status": "success", "data": recommendations}
     except Exception as e:
         logger.error(f"Error getting recommendations: {str(e)}")
         return {"status": "error", "message": str(e)}
 
 
+@app.get("/api/v1/cache/stats")
+async def get_cache_stats(
+    cache: ResultCache = Depends(get_result_cache),
+) -> Dict[str, Any]:
+    """Get result cache hit ratio and counts."""
+    return {"status": "success", "data": cache.get_stats()}
+
+
 @app.post("/api/v1/schedule")
 async def schedule_action(
     action: ScheduledAction, scheduler: ResourceScheduler = Depends(get_scheduler)
@@ -0,0 +1,182 @@
+"""Fleet-wide batch recommendation job.
+
+Example::
+
+    python -m src.ml.batch_recommendations --resource-ids-file ids.txt --workers 32
+"""
+
+import argparse
+import logging
+import sys
+import time
+from typing import Any, Dict, List, Sequence
+
+import pandas as pd
+
+from .resource_optimizer import ResourceOptimizer
+
+REPORT_COLUMNS = [
+    "resource_id",
+    "status",
+    "metric",
+    "prediction",
+    "confidence",
+    "recommendation",
+    "reason",
+    "message",
+]
+
+
+class ProgressReporter:
+    """Logs progress and throughput while a batch job runs."""
+
+    def __init__(self, total: int, interval: float = 5.0):
+        """Initialize reporter for ``total`` resources."""
+        self.total = total
+        self.interval = interval
+        self.started = time.monotonic()
+        self._last_report = self.started
+        self.logger = logging.getLogger(__name__)
+
+    def __call__(self, done: int, total: int) -> None:
+        now = time.monotonic()
+        if done < total and now - self._last_report < self.interval:
+            return
+        self._last_report = now
+        elapsed = now - self.started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        self.logger.info(
+            f"Fetched {done}/{total} resources ({done / max(total, 1):.0%}, "
+            f"{rate:.1f} resources/s)"
+        )
+
+
+def results_to_frame(results: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Flatten batch results to one row per resource and metric."""
+    rows = []
+    for result in results:
+        resource_id = result["resource_id"]
+        if result["status"] != "success":
+            rows.append(
+                {
+                    "resource_id": resource_id,
+                    "status": result["status"],
+                    "message": result.get("message"),
+                }
+            )
+            continue
+
+        recommendations = {r["metric"]: r for r in result["recommendations"]}
+        for prediction in result["predictions"]:
+            recommendation = recommendations.get(prediction["metric"], {})
+            rows.append(
+                {
+                    "resource_id": resource_id,
+                    "status": result["status"],
+                    "metric": prediction["metric"],
+                    "prediction": prediction["prediction"],
+                    "confidence": prediction["confidence"],
+                    "recommendation": recommendation.get("recommendation"),
+                    "reason": recommendation.get("reason"),
+                }
+            )
+    return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+
+def write_report(results: List[Dict[str, Any]], output_path: str) -> int:
+    """Write results as Parquet (``.parquet``) or JSONL; returns rows written."""
+    frame = results_to_frame(results)
+    if output_path.endswith(".parquet"):
+        frame.to_parquet(output_path, index=False)
+    else:
+        frame.to_json(output_path, orient="records", lines=True)
+    return len(frame)
+
+
+def run_batch(
+    resource_ids: Sequence[str],
+    output_path: str,
+    optimizer: ResourceOptimizer = None,
+    days: int = 7,
+    max_workers: int = 16,
+) -> Dict[str, Any]:
+    """Run the recommendation job and write the report."""
+    logger = logging.getLogger(__name__)
+    optimizer = optimizer or ResourceOptimizer({})
+    reporter = ProgressReporter(len(resource_ids))
+
+    results = optimizer.get_recommendations_batch(
+        resource_ids,
+        days=days,
+        max_workers=max_workers,
+        progress_callback=reporter,
+    )
+    rows = write_report(results, output_path)
+
+    elapsed = time.monotonic() - reporter.started
+    summary = {
+        "resources": len(resource_ids),
+        "succeeded": sum(r["status"] == "success" for r in results),
+        "recommendations": sum(len(r.get("recommendations", [])) for r in results),
+        "rows": rows,
+        "elapsed_seconds": round(elapsed, 3),
+        "resources_per_second": (
+            round(len(resource_ids) / elapsed, 1) if elapsed > 0 else None
+        ),
+    }
+    logger.info(f"Wrote {rows} rows to {output_path}: {summary}")
+    return summary
+
+
+def _read_resource_ids(path: str) -> List[str]:
+    with open(path, "r") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate optimization recommendations for many resources"
+    )
+    parser.add_argument("resource_ids", nargs="*", help="Resource IDs to analyse")
+    parser.add_argument(
+        "--resource-ids-file", type=str, help="File with one resource ID per line"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="recommendations.jsonl",
+        help="Report path (.jsonl or .parquet)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=16, help="Concurrent history fetches"
+    )
+    parser.add_argument("--days", type=int, default=7, help="Days of history")
+    parser.add_argument(
+        "--log-level",
+        type=str,
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Logging level",
+    )
+
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=args.log_level,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    resource_ids = list(args.resource_ids)
+    if args.resource_ids_file:
+        resource_ids.extend(_read_resource_ids(args.resource_ids_file))
+    if not resource_ids:
+        parser.error("no resource IDs given")
+
+    try:
+        run_batch(resource_ids, args.output, days=args.days, max_workers=args.workers)
+    except Exception as e:
+        logging.error(f"Batch recommendation job failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""Columnar, time-indexed in-memory metrics store."""
+
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+from dateutil import parser
+
+# 30 days of one-minute samples per resource
+DEFAULT_MAX_POINTS = 43200
+
+_INITIAL_CAPACITY = 64
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+Timestamp = Union[str, datetime, int, float]
+
+
+def to_epoch_ns(timestamp: Timestamp) -> int:
+    """Convert an ISO string, datetime or epoch seconds to UTC epoch nanoseconds.
+
+    Naive timestamps are treated as UTC.
+    """
+    if isinstance(timestamp, (int, float)) and not isinstance(timestamp, bool):
+        return int(round(timestamp * 1e9))
+
+    if isinstance(timestamp, datetime):
+        dt = timestamp
+    else:
+        try:
+            dt = datetime.fromisoformat(timestamp)
+        except ValueError:
+            dt = parser.parse(timestamp)
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+
+    delta = dt - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 10**9 + delta.microseconds * 1000
+
+
+def from_epoch_ns(timestamp_ns: int) -> str:
+    """Render UTC epoch nanoseconds as an ISO 8601 string."""
+    return (_EPOCH + timedelta(microseconds=int(timestamp_ns) // 1000)).isoformat()
+
+
+class ResourceSeries:
+    """Append-only columnar series for a single resource.
+
+    Timestamps are kept sorted in an int64 array and every metric name gets
+    its own float64 column. Points that do not report a metric hold NaN.
+    """
+
+    def __init__(self, max_points: int = DEFAULT_MAX_POINTS):
+        """Initialize an empty series capped at ``max_points``."""
+        if max_points <= 0:
+            raise ValueError("max_points must be positive")
+        self.max_points = max_points
+        # Trimming happens in chunks so appends at the cap stay amortised O(1)
+        self._slack = max(1, max_points // 8)
+        self._capacity = min(_INITIAL_CAPACITY, max_points + self._slack)
+        self._size = 0
+        self._timestamps = np.empty(self._capacity, dtype=np.int64)
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return min(self._size, self.max_points)
+
+    @property
+    def metric_names(self) -> List[str]:
+        return list(self._columns)
+
+    def _reserve(self, size: int) -> None:
+        """Grow the backing arrays to hold at least ``size`` points."""
+        if size <= self._capacity:
+            return
+        capacity = self._capacity
+        while capacity < size:
+            capacity *= 2
+
+        timestamps = np.empty(capacity, dtype=np.int64)
+        timestamps[: self._size] = self._timestamps[: self._size]
+        self._timestamps = timestamps
+
+        for name, column in self._columns.items():
+            grown = np.full(capacity, np.nan, dtype=np.float64)
+            grown[: self._size] = column[: self._size]
+            self._columns[name] = grown
+
+        self._capacity = capacity
+
+    def _trim(self) -> None:
+        """Drop the oldest points once the series exceeds its retention cap."""
+        if self._size <= self.max_points + self._slack:
+            return
+        drop = self._size - self.max_points
+        keep = self.max_points
+        self._timestamps[:keep] = self._timestamps[drop : self._size]
+        for column in self._columns.values():
+            column[:keep] = column[drop : self._size]
+            column[keep:] = np.nan
+        self._size = keep
+
+    def extend(self, timestamps: np.ndarray, columns: Mapping[str, np.ndarray]) -> None:
+        """Append a block of points.
+
+        ``timestamps`` are epoch nanoseconds and each column must be aligned
+        with them. Out-of-order blocks are merged so the series stays sorted.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        count = len(timestamps)
+        if count == 0:
+            return
+
+        columns = {
+            name: np.asarray(values, dtype=np.float64)
+            for name, values in columns.items()
+        }
+        if count > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind="stable")
+            timestamps = timestamps[order]
+            columns = {name: values[order] for name, values in columns.items()}
+
+        start = self._size
+        end = start + count
+        self._reserve(end)
+        for name in columns:
+            if name not in self._columns:
+                self._columns[name] = np.full(self._capacity, np.nan, dtype=np.float64)
+
+        self._timestamps[start:end] = timestamps
+        for name, column in self._columns.items():
+            values = columns.get(name)
+            column[start:end] = np.nan if values is None else values
+
+        if start and timestamps[0] < self._timestamps[start - 1]:
+            # Late data: re-sort the live window. Rare on the ingest path.
+            order = np.argsort(self._timestamps[:end], kind="stable")
+            self._timestamps[:end] = self._timestamps[:end][order]
+            for column in self._columns.values():
+                column[:end] = column[:end][order]
+
+        self._size = end
+        self._trim()
+
+    def range(
+        self, start_ns: int, end_ns: int
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Return copies of all points with ``start_ns <= timestamp <= end_ns``."""
+        lo = max(0, self._size - self.max_points)
+        window = self._timestamps[lo : self._size]
+        left = lo + int(np.searchsorted(window, start_ns, side="left"))
+        right = lo + int(np.searchsorted(window, end_ns, side="right"))
+        return (
+            self._timestamps[left:right].copy(),
+            {name: column[left:right].copy() for name, column in self._columns.items()},
+        )
+
+
+class ColumnarMetricsStore:
+    """Per-resource columnar store with binary-search range queries."""
+
+    def __init__(self, max_points_per_resource: int = DEFAULT_MAX_POINTS):
+        """Initialize store with a per-resource retention cap."""
+        self.max_points_per_resource = max_points_per_resource
+        self._series: Dict[str, ResourceSeries] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, resource_id: str) -> bool:
+        return resource_id in self._series
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def resource_ids(self) -> List[str]:
+        """List resources that have stored metrics."""
+        return list(self._series)
+
+    def _get_series(self, resource_id: str) -> ResourceSeries:
+        series = self._series.get(resource_id)
+        if series is None:
+            series = ResourceSeries(self.max_points_per_resource)
+            self._series[resource_id] = series
+        return series
+
+    def append(
+        self, resource_id: str, timestamp: Timestamp, metrics: Mapping[str, float]
+    ) -> None:
+        """Append a single point for a resource."""
+        self.extend(
+            resource_id,
+            np.array([to_epoch_ns(timestamp)], dtype=np.int64),
+            {
+                name: np.array([value], dtype=np.float64)
+                for name, value in metrics.items()
+            },
+        )
+
+    def extend(
+        self,
+        resource_id: str,
+        timestamps_ns: np.ndarray,
+        columns: Mapping[str, np.ndarray],
+    ) -> None:
+        """Append a block of aligned points for a resource."""
+        with self._lock:
+            self._get_series(resource_id).extend(timestamps_ns, columns)
+
+    def extend_many(
+        self, blocks: Iterable[Tuple[str, np.ndarray, Mapping[str, np.ndarray]]]
+    ) -> int:
+        """Append blocks for many resources under a single lock acquisition.
+
+        Returns the number of points written.
+        """
+        written = 0
+        with self._lock:
+            for resource_id, timestamps_ns, columns in blocks:
+                self._get_series(resource_id).extend(timestamps_ns, columns)
+                written += len(timestamps_ns)
+        return written
+
+    def range(
+        self, resource_id: str, start_ns: int, end_ns: int
+    ) -> Optional[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+        """Return timestamps and metric columns in ``[start_ns, end_ns]``."""
+        with self._lock:
+            series = self._series.get(resource_id)
+            if series is None:
+                return None
+            return series.range(start_ns, end_ns)
+
+    def query(
+        self, resource_id: str, start_time: Timestamp, end_time: Timestamp
+    ) -> List[Dict[str, Any]]:
+        """Return points in range as ``{"timestamp", "metrics"}`` records.
+
+        Timestamps are stored as epoch nanoseconds, so they are returned
+        normalised to UTC ISO 8601 with a ``+00:00`` offset, not in the
+        form they were submitted in.
+        """
+        result = self.range(resource_id, to_epoch_ns(start_time), to_epoch_ns(end_time))
+        if result is None:
+            return []
+
+        timestamps, columns = result
+        names = list(columns)
+        rows = (
+            zip(*(columns[name].tolist() for name in names))
+            if names
+            else (() for _ in range(len(timestamps)))
+        )
+
+        records = []
+        for timestamp_ns, values in zip(timestamps.tolist(), rows):
+            records.append(
+                {
+                    "timestamp": from_epoch_ns(timestamp_ns),
+                    "metrics": {
+                        name: value
+                        for name, value in zip(names, values)
+                        if value == value  # skip NaN gaps
+                    },
+                }
+            )
+        return records
@@ -3,5 +3,6 @@
 from typing import Any, Dict
 
 from .prediction import MetricsPredictor
+from .write_buffer import WriteBehindBuffer, WriteBufferFull
 
-__all__ = ["MetricsPredictor"]
+__all__ = ["MetricsPredictor", "WriteBehindBuffer", "WriteBufferFull"]
@@ -1,23 +1,76 @@
 """Metrics prediction module."""
 
 import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 import boto3
+import numpy as np
 import pandas as pd
 
+from .write_buffer import WriteBehindBuffer
+
 
 class MetricsPredictor:
     """Predicts resource metrics based on historical data."""
 
-    def __init__(self, dynamodb=None):
-        """Initialize predictor with DynamoDB resource."""
-        self.dynamodb = dynamodb or boto3.resource("dynamodb")
+    def __init__(
+        self,
+        dynamodb=None,
+        query_workers: int = 8,
+        segment_hours: int = 24,
+        session: Optional[boto3.session.Session] = None,
+        client=None,
+    ):
+        """Initialize predictor with DynamoDB resource.
+
+        The resource and the bulk-read client are built from ``session``
+        (the default boto3 session if omitted) unless passed in; inject a
+        resource from a custom session together with that ``session`` or a
+        ``client`` so both use the same credentials.
+
+        History queries longer than ``segment_hours`` are split into
+        sub-range queries run on up to ``query_workers`` threads.
+        """
+        self.session = session or boto3.session.Session()
+        self.dynamodb = dynamodb or self.session.resource("dynamodb")
         self.metrics_table = self.dynamodb.Table("cloud_pioneer_metrics")
+        self.query_workers = query_workers
+        self.segment_hours = segment_hours
+        self._client = client
+        self.write_buffer: Optional[WriteBehindBuffer] = None
         self.logger = logging.getLogger(__name__)
 
+    def enable_write_behind(self, **options) -> WriteBehindBuffer:
+        """Buffer ``store_metrics`` writes and flush them in batches.
+
+        ``options`` are passed to ``WriteBehindBuffer``.
+        """
+        if self.write_buffer is None:
+            options.setdefault("overwrite_by_pkeys", ["resource_id", "timestamp"])
+            self.write_buffer = WriteBehindBuffer(self.metrics_table, **options)
+        return self.write_buffer
+
+    @property
+    def client(self):
+        """Low-level DynamoDB client for bulk reads.
+
+        The resource's ``meta.client`` has the resource layer's handlers
+        attached, which turn every number into a Decimal; this plain client
+        returns numbers as raw strings so they can be parsed in bulk.
+        """
+        if self._client is None:
+            meta = self.dynamodb.meta.client.meta
+            self._client = self.session.client(
+                "dynamodb",
+                region_name=meta.region_name,
+                endpoint_url=meta.endpoint_url,
+            )
+        return self._client
+
     def store_metrics(self, metrics: Dict[str, Any]) -> None:
         """Store metrics in DynamoDB."""
         try:
@@ -28,12 +81,32 @@ class MetricsPredictor:
                 "metrics": {k: Decimal(str(v)) for k, v in metrics["metrics"].items()},
             }
 
-            self.metrics_table.put_item(Item=item)
+            if self.write_buffer is not None:
+                self.write_buffer.put(item)
+            else:
+                self.metrics_table.put_item(Item=item)
 
         except Exception as e:
             self.logger.error(f"Failed to store metrics: {str(e)}")
             raise
 
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write any buffered metrics; returns False on timeout."""
+        if self.write_buffer is None:
+            return True
+        return self.write_buffer.flush(timeout)
+
+    def close(self) -> None:
+        """Stop the write-behind buffer, if any."""
+        if self.write_buffer is not None:
+            self.write_buffer.close()
+
+    def get_write_stats(self) -> Dict[str, Any]:
+        """Return write-behind queue depth and flush latency metrics."""
+        if self.write_buffer is None:
+            return {}
+        return self.write_buffer.get_stats()
+
     def predict(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
         """Predict future metrics based on current metrics."""
         try:
@@ -55,39 +128,103 @@ class MetricsPredictor:
             self.logger.error(f"Failed to predict metrics: {str(e)}")
             raise
 
-    def get_historical_metrics(self, resource_id: str) -> pd.DataFrame:
-        """Get historical metrics for a resource."""
+    def get_historical_metrics(
+        self,
+        resource_id: str,
+        hours: float = 24,
+        end_time: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        """Get historical metrics for a resource over the last ``hours``."""
         try:
-            # Query metrics from the last 24 hours
-            end_time = datetime.now()
-            start_time = end_time - timedelta(hours=24)
-
-            response = self.metrics_table.query(
-                KeyConditionExpression="resource_id = :rid AND #ts BETWEEN :start AND :end",
-                ExpressionAttributeNames={"#ts": "timestamp"},
-                ExpressionAttributeValues={
-                    ":rid": resource_id,
-                    ":start": start_time.isoformat(),
-                    ":end": end_time.isoformat(),
-                },
-            )
-
-            if not response["Items"]:
+            end_time = end_time or datetime.now()
+            start_time = end_time - timedelta(hours=hours)
+
+            segments = self._split_range(start_time, end_time)
+            client = self.client
+            if len(segments) == 1:
+                results = [self._query_range(client, resource_id, *segments[0])]
+            else:
+                workers = min(self.query_workers, len(segments))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = list(
+                        executor.map(
+                            lambda segment: self._query_range(
+                                client, resource_id, *segment
+                            ),
+                            segments,
+                        )
+                    )
+
+            items = [item for segment_items in results for item in segment_items]
+            if not items:
                 return pd.DataFrame()
 
-            # Convert to DataFrame
-            metrics = []
-            for item in response["Items"]:
-                metrics.append(
-                    {
-                        "resource_id": item["resource_id"],
-                        "timestamp": item["timestamp"],
-                        **{k: float(v) for k, v in item["metrics"].items()},
-                    }
-                )
-
-            return pd.DataFrame(metrics)
+            return self._decode_items(resource_id, items)
 
         except Exception as e:
             self.logger.error(f"Failed to get historical metrics: {str(e)}")
             raise
+
+    def _split_range(
+        self, start_time: datetime, end_time: datetime
+    ) -> List[Tuple[str, str]]:
+        """Split a time range into non-overlapping ISO sub-ranges."""
+        total = end_time - start_time
+        count = max(1, math.ceil(total / timedelta(hours=self.segment_hours)))
+        step = total / count
+
+        segments = []
+        for i in range(count):
+            segment_start = start_time + step * i
+            if i == count - 1:
+                segment_end = end_time
+            else:
+                # BETWEEN is inclusive, so stop just before the next segment
+                segment_end = start_time + step * (i + 1) - timedelta(microseconds=1)
+            segments.append((segment_start.isoformat(), segment_end.isoformat()))
+        return segments
+
+    def _query_range(
+        self, client, resource_id: str, start: str, end: str
+    ) -> List[Dict]:
+        """Query one sub-range, following every page."""
+        paginator = client.get_paginator("query")
+        pages = paginator.paginate(
+            TableName=self.metrics_table.name,
+            KeyConditionExpression="resource_id = :rid AND #ts BETWEEN :start AND :end",
+            ExpressionAttributeNames={"#ts": "timestamp"},
+            ExpressionAttributeValues={
+                ":rid": {"S": resource_id},
+                ":start": {"S": start},
+                ":end": {"S": end},
+            },
+        )
+
+        items = []
+        for page in pages:
+            items.extend(page.get("Items", []))
+        return items
+
+    @staticmethod
+    def _decode_items(resource_id: str, items: List[Dict]) -> pd.DataFrame:
+        """Decode low-level items straight into typed numpy columns."""
+        count = len(items)
+        timestamps = np.empty(count, dtype=object)
+        columns: Dict[str, np.ndarray] = {}
+
+        for i, item in enumerate(items):
+            timestamps[i] = item["timestamp"]["S"]
+            for name, value in item.get("metrics", {}).get("M", {}).items():
+                column = columns.get(name)
+                if column is None:
+                    column = columns[name] = np.full(count, np.nan)
+                if "N" in value:
+                    column[i] = float(value["N"])
+
+        return pd.DataFrame(
+            {
+                "resource_id": np.full(count, resource_id, dtype=object),
+                "timestamp": timestamps,
+                **columns,
+            }
+        )
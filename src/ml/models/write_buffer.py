@@ -0,0 +1,244 @@
+"""Write-behind buffering for DynamoDB metric writes."""
+
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence
+
+BACKPRESSURE_MODES = ("block", "drop_oldest", "error")
+
+
+class WriteBufferFull(RuntimeError):
+    """Raised when an item cannot be queued because the buffer is full."""
+
+
+class WriteBehindBuffer:
+    """Coalesces items and writes them to a table with ``batch_writer``.
+
+    Items are flushed from a background thread once ``max_batch_size`` items
+    are queued or the oldest queued item is ``max_age_seconds`` old. When the
+    queue holds ``max_queue_size`` items, ``backpressure`` decides whether
+    ``put`` blocks, drops the oldest item or raises ``WriteBufferFull``.
+    """
+
+    def __init__(
+        self,
+        table,
+        max_batch_size: int = 100,
+        max_age_seconds: float = 1.0,
+        max_queue_size: int = 10000,
+        backpressure: str = "block",
+        put_timeout: Optional[float] = None,
+        max_retries: int = 3,
+        retry_backoff: float = 0.2,
+        flush_on_close: bool = True,
+        flush_on_exit: bool = True,
+        overwrite_by_pkeys: Optional[Sequence[str]] = None,
+    ):
+        """Initialize buffer for ``table``; the writer starts on first put."""
+        if backpressure not in BACKPRESSURE_MODES:
+            raise ValueError(
+                f"Unknown backpressure mode {backpressure!r}, "
+                f"expected one of {BACKPRESSURE_MODES}"
+            )
+        self.table = table
+        self.max_batch_size = max_batch_size
+        self.max_age_seconds = max_age_seconds
+        self.max_queue_size = max_queue_size
+        self.backpressure = backpressure
+        self.put_timeout = put_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.flush_on_close = flush_on_close
+        self.overwrite_by_pkeys = list(overwrite_by_pkeys or [])
+        self.logger = logging.getLogger(__name__)
+
+        # Queue entries are (enqueue time, item)
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+        self._stats = {
+            "items_enqueued": 0,
+            "items_written": 0,
+            "items_dropped": 0,
+            "items_failed": 0,
+            "flushes": 0,
+            "flush_failures": 0,
+            "retries": 0,
+            "max_queue_depth": 0,
+        }
+        self._flush_latency_total = 0.0
+        self._flush_latency_last = 0.0
+        self._flush_latency_max = 0.0
+
+        if flush_on_exit:
+            atexit.register(self.close)
+
+    def put(self, item: Dict[str, Any]) -> None:
+        """Queue an item for writing."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Write buffer is closed")
+            self._ensure_started()
+
+            if len(self._queue) >= self.max_queue_size:
+                if self.backpressure == "error":
+                    raise WriteBufferFull(
+                        f"Write buffer is full ({self.max_queue_size} items)"
+                    )
+                if self.backpressure == "drop_oldest":
+                    self._queue.popleft()
+                    self._stats["items_dropped"] += 1
+                else:
+                    self._cond.notify_all()
+                    if not self._cond.wait_for(
+                        lambda: len(self._queue) < self.max_queue_size or self._closed,
+                        timeout=self.put_timeout,
+                    ):
+                        raise WriteBufferFull(
+                            f"Timed out waiting for space in write buffer "
+                            f"({self.max_queue_size} items)"
+                        )
+                    if self._closed:
+                        raise RuntimeError("Write buffer is closed")
+
+            self._queue.append((time.monotonic(), item))
+            self._stats["items_enqueued"] += 1
+            depth = len(self._queue)
+            if depth > self._stats["max_queue_depth"]:
+                self._stats["max_queue_depth"] = depth
+            if depth >= self.max_batch_size:
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything queued so far; returns False on timeout."""
+        with self._cond:
+            if self._thread is None:
+                return not self._queue
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(
+                lambda: not self._queue and not self._in_flight, timeout=timeout
+            )
+
+    def close(self, flush: Optional[bool] = None, timeout: Optional[float] = None):
+        """Stop the writer, flushing queued items unless ``flush`` is False."""
+        flush = self.flush_on_close if flush is None else flush
+        with self._cond:
+            if self._closed:
+                return
+            if flush:
+                self._flush_requested = True
+            else:
+                self._stats["items_dropped"] += len(self._queue)
+                self._queue.clear()
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+
+        if thread is not None:
+            thread.join(timeout)
+        atexit.unregister(self.close)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return queue depth, throughput counters and flush latency."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["queue_depth"] = len(self._queue)
+            stats["in_flight"] = self._in_flight
+            flushes = stats["flushes"]
+            stats["last_flush_latency_seconds"] = self._flush_latency_last
+            stats["max_flush_latency_seconds"] = self._flush_latency_max
+            stats["avg_flush_latency_seconds"] = (
+                self._flush_latency_total / flushes if flushes else 0.0
+            )
+        return stats
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="dynamodb-write-behind", daemon=True
+            )
+            self._thread.start()
+
+    def _ready(self) -> bool:
+        if not self._queue:
+            return False
+        if self._flush_requested or self._closed:
+            return True
+        if len(self._queue) >= self.max_batch_size:
+            return True
+        return time.monotonic() - self._queue[0][0] >= self.max_age_seconds
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._ready():
+                    if self._closed:
+                        return
+                    if not self._queue:
+                        self._flush_requested = False
+                        self._cond.wait()
+                    else:
+                        age = time.monotonic() - self._queue[0][0]
+                        self._cond.wait(max(self.max_age_seconds - age, 0.001))
+
+                count = min(len(self._queue), self.max_batch_size)
+                batch = [self._queue.popleft()[1] for _ in range(count)]
+                self._in_flight = count
+                # Wake producers blocked on a full queue
+                self._cond.notify_all()
+
+            self._write(batch)
+
+            with self._cond:
+                self._in_flight = 0
+                if not self._queue:
+                    self._flush_requested = False
+                self._cond.notify_all()
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """Write a batch, retrying failed requests with backoff.
+
+        ``batch_writer`` already resubmits unprocessed items; retries here
+        cover requests that fail outright, e.g. throttling errors.
+        """
+        started = time.monotonic()
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.table.batch_writer(
+                    overwrite_by_pkeys=self.overwrite_by_pkeys or None
+                ) as writer:
+                    for item in batch:
+                        writer.put_item(Item=item)
+                written, failed = len(batch), 0
+                break
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.logger.error(
+                        f"Failed to write {len(batch)} metrics after "
+                        f"{attempt + 1} attempts: {str(e)}"
+                    )
+                    written, failed = 0, len(batch)
+                    break
+                with self._cond:
+                    self._stats["retries"] += 1
+                self.logger.warning(f"Retrying metrics batch write: {str(e)}")
+                time.sleep(self.retry_backoff * 2**attempt)
+
+        latency = time.monotonic() - started
+        with self._cond:
+            self._stats["flushes"] += 1
+            self._stats["items_written"] += written
+            self._stats["items_failed"] += failed
+            if failed:
+                self._stats["flush_failures"] += 1
+            self._flush_latency_last = latency
+            self._flush_latency_total += latency
+            self._flush_latency_max = max(self._flush_latency_max, latency)
@@ -1,18 +1,18 @@
 import logging
-from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Tuple
 
 import numpy as np
 import pytz
 import tensorflow as tf
-from dateutil import parser
+
+from .metrics_store import DEFAULT_MAX_POINTS, ColumnarMetricsStore
 
 
 class ResourcePredictor:
-    def __init__(self):
+    def __init__(self, max_points_per_resource: int = DEFAULT_MAX_POINTS):
         self.model = None
-        self._metrics_store = defaultdict(list)
+        self._metrics_store = ColumnarMetricsStore(max_points_per_resource)
         self.logger = logging.getLogger(__name__)
 
     def build_model(self, input_shape: tuple) -> None:
@@ -72,9 +72,7 @@ class ResourcePredictor:
     ) -> None:
         """Store resource metrics."""
         try:
-            self._metrics_store[resource_id].append(
-                {"timestamp": timestamp, "metrics": metrics}
-            )
+            self._metrics_store.append(resource_id, timestamp, metrics)
             self.logger.info(
                 f"Stored metrics for resource {resource_id} at {timestamp}"
             )
@@ -82,30 +80,24 @@ class ResourcePredictor:
             self.logger.error(f"Failed to store metrics: {str(e)}")
             raise
 
+    def store_metrics_batch(
+        self, blocks: Iterable[Tuple[str, np.ndarray, Dict[str, np.ndarray]]]
+    ) -> int:
+        """Store pre-validated column blocks for many resources at once."""
+        try:
+            written = self._metrics_store.extend_many(blocks)
+            self.logger.info(f"Stored batch of {written} metric points")
+            return written
+        except Exception as e:
+            self.logger.error(f"Failed to store metrics batch: {str(e)}")
+            raise
+
     def get_historical_metrics(
         self, resource_id: str, start_time: str, end_time: str
     ) -> List[Dict[str, Any]]:
         """Get historical metrics for a resource."""
         try:
-            metrics = self._metrics_store.get(resource_id, [])
-
-            # Convert timestamps to UTC for comparison
-            def parse_timestamp(ts: str) -> datetime:
-                dt = parser.parse(ts)
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=pytz.UTC)
-                return dt.astimezone(pytz.UTC)
-
-            start = parse_timestamp(start_time)
-            end = parse_timestamp(end_time)
-
-            filtered_metrics = []
-            for metric in metrics:
-                timestamp = parse_timestamp(metric["timestamp"])
-                if start <= timestamp <= end:
-                    filtered_metrics.append(metric)
-
-            return filtered_metrics
+            return self._metrics_store.query(resource_id, start_time, end_time)
         except Exception as e:
             self.logger.error(f"Failed to get historical metrics: {str(e)}")
             raise
@@ -1,6 +1,7 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
 import boto3
 import joblib
@@ -9,6 +10,72 @@ import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
 
+FORECAST_MODES = ("recursive", "incremental", "direct")
+
+ROLLING_WINDOW = 24
+LAGS = (1, 24, 168)  # 1 hour, 1 day, 1 week
+MODEL_FEATURES = [
+    "hour",
+    "day_of_week",
+    "is_weekend",
+    "rolling_mean",
+    "rolling_std",
+    "lag_1",
+    "lag_24",
+    "lag_168",
+]
+
+# Moving-average window used for recommendations
+RECOMMENDATION_WINDOW = 24
+RECOMMENDATION_THRESHOLDS = {
+    "cpu_utilization": {"low": 20, "high": 80},
+    "memory_utilization": {"low": 30, "high": 85},
+    "network_in": {"low": 1000000, "high": 100000000},  # 1MB/s to 100MB/s
+    "network_out": {"low": 1000000, "high": 100000000},
+}
+
+
+def _recommendation(metric: str, value: float, action: str) -> Dict[str, Any]:
+    """Build a downsize/upsize recommendation entry."""
+    if action == "downsize":
+        reason = (
+            f'{metric} is consistently below {RECOMMENDATION_THRESHOLDS[metric]["low"]}'
+        )
+    else:
+        reason = f'{metric} is consistently above {RECOMMENDATION_THRESHOLDS[metric]["high"]}'
+    return {
+        "metric": metric,
+        "current_value": value,
+        "recommendation": action,
+        "reason": reason,
+    }
+
+
+class _LagRing:
+    """Ring buffer of the most recent values for lag and rolling features."""
+
+    def __init__(self, values: np.ndarray, size: int):
+        """Initialize ring with the tail of ``values``."""
+        self.size = size
+        self.buffer = np.full(size, np.nan, dtype=np.float64)
+        tail = np.asarray(values, dtype=np.float64)[-size:]
+        self.buffer[: len(tail)] = tail
+        self.head = len(tail) % size
+        self._offsets = np.arange(size)
+
+    def push(self, value: float) -> None:
+        """Append the newest value, overwriting the oldest."""
+        self.buffer[self.head] = value
+        self.head = (self.head + 1) % self.size
+
+    def lag(self, k: int) -> float:
+        """Return the value ``k`` steps before the newest one."""
+        return self.buffer[(self.head - 1 - k) % self.size]
+
+    def window(self, n: int) -> np.ndarray:
+        """Return the newest ``n`` values, oldest first."""
+        return self.buffer[(self.head - n + self._offsets[:n]) % self.size]
+
 
 class ResourceOptimizer:
     def __init__(self, config: Dict[str, Any]):
@@ -18,6 +85,8 @@ class ResourceOptimizer:
         self.logger = logging.getLogger(__name__)
         self.dynamodb = boto3.resource("dynamodb")
         self.table = self.dynamodb.Table("cloud_pioneer_metrics")
+        # Low-level client for bulk reads: thread-safe and returns raw strings
+        self.client = boto3.client("dynamodb")
         self.feature_columns = [
             "cpu_utilization",
             "memory_utilization",
@@ -35,25 +104,14 @@ class ResourceOptimizer:
         df["is_weekend"] = df["day_of_week"].isin([5, 6]).astype(int)
 
         # Rolling statistics
-        df["rolling_mean"] = df["value"].rolling(window=24).mean()
-        df["rolling_std"] = df["value"].rolling(window=24).std()
+        df["rolling_mean"] = df["value"].rolling(window=ROLLING_WINDOW).mean()
+        df["rolling_std"] = df["value"].rolling(window=ROLLING_WINDOW).std()
 
         # Lag features
-        for lag in [1, 24, 168]:  # 1 hour, 1 day, 1 week
+        for lag in LAGS:
             df[f"lag_{lag}"] = df["value"].shift(lag)
 
-        feature_columns = [
-            "hour",
-            "day_of_week",
-            "is_weekend",
-            "rolling_mean",
-            "rolling_std",
-            "lag_1",
-            "lag_24",
-            "lag_168",
-        ]
-
-        return df[feature_columns].fillna(method="bfill")
+        return df[MODEL_FEATURES].bfill()
 
     def train(self, historical_data: pd.DataFrame):
         """Train the resource optimization model."""
@@ -83,29 +141,76 @@ class ResourceOptimizer:
             self.logger.error(f"Error training model: {e}")
             raise
 
+    def _load_model(self) -> None:
+        """Load the persisted model and scaler if none is in memory."""
+        if self.model is None:
+            self.model = joblib.load("models/resource_optimizer.joblib")
+            self.scaler = joblib.load("models/scaler.joblib")
+
+    def _predict_rows(self, rows: np.ndarray) -> np.ndarray:
+        """Scale raw feature rows and run the model on all of them at once."""
+        features = pd.DataFrame(rows, columns=MODEL_FEATURES)
+        return self.model.predict(self.scaler.transform(features))
+
+    def _predict_step(self, row: np.ndarray) -> float:
+        """Predict a single feature row without per-call ensemble overhead.
+
+        ``RandomForestRegressor.predict`` dispatches every call through a
+        joblib pool, which dominates when called once per forecast step.
+        The result is the same mean over the fitted trees.
+        """
+        if not (
+            isinstance(self.scaler, StandardScaler)
+            and self.scaler.with_mean
+            and self.scaler.with_std
+            and isinstance(self.model, RandomForestRegressor)
+        ):
+            return self._predict_rows(row[np.newaxis, :])[0]
+
+        scaled = ((row - self.scaler.mean_) / self.scaler.scale_).astype(np.float32)
+        X = scaled[np.newaxis, :]
+        return float(
+            np.mean(
+                [
+                    tree.predict(X, check_input=False)[0]
+                    for tree in self.model.estimators_
+                ]
+            )
+        )
+
     def predict_utilization(
-        self, current_data: pd.DataFrame, horizon_hours: int = 24
+        self,
+        current_data: pd.DataFrame,
+        horizon_hours: int = 24,
+        mode: str = "recursive",
     ) -> Dict[str, Any]:
-        """Predict resource utilization for the next n hours."""
-        try:
-            if self.model is None:
-                self.model = joblib.load("models/resource_optimizer.joblib")
-                self.scaler = joblib.load("models/scaler.joblib")
-
-            predictions = []
-            last_data = current_data.copy()
-
-            for i in range(horizon_hours):
-                features = self.prepare_features(last_data)
-                scaled_features = self.scaler.transform(features.iloc[[-1]])
-                pred = self.model.predict(scaled_features)[0]
+        """Predict resource utilization for the next n hours.
+
+        ``mode`` selects the forecasting strategy:
+
+        - ``recursive``: rebuild all features from the full history after
+          every predicted step.
+        - ``incremental``: same forecasts as ``recursive``, but the feature
+          matrix is computed once and lag/rolling features are then updated
+          from ring buffers, one model call per step.
+        - ``direct``: one model call for the whole horizon. Lag and rolling
+          inputs that would need earlier predictions use the most recent
+          observed value for the same hour of day instead.
+        """
+        if mode not in FORECAST_MODES:
+            raise ValueError(
+                f"Unknown forecast mode {mode!r}, expected one of {FORECAST_MODES}"
+            )
 
-                timestamp = last_data.index[-1] + timedelta(hours=1)
-                predictions.append({"timestamp": timestamp, "predicted_value": pred})
+        try:
+            self._load_model()
 
-                # Add prediction to historical data for next iteration
-                new_row = pd.DataFrame({"value": [pred]}, index=[timestamp])
-                last_data = pd.concat([last_data, new_row])
+            if mode == "incremental":
+                predictions = self._forecast_incremental(current_data, horizon_hours)
+            elif mode == "direct":
+                predictions = self._forecast_direct(current_data, horizon_hours)
+            else:
+                predictions = self._forecast_recursive(current_data, horizon_hours)
 
             return {
                 "predictions": predictions,
@@ -116,6 +221,104 @@ class ResourceOptimizer:
             self.logger.error(f"Error making predictions: {e}")
             raise
 
+    def _forecast_recursive(
+        self, current_data: pd.DataFrame, horizon_hours: int
+    ) -> List[Dict[str, Any]]:
+        """Forecast by recomputing features over the whole history each step."""
+        predictions = []
+        last_data = current_data.copy()
+
+        for i in range(horizon_hours):
+            features = self.prepare_features(last_data)
+            scaled_features = self.scaler.transform(features.iloc[[-1]])
+            pred = self.model.predict(scaled_features)[0]
+
+            timestamp = last_data.index[-1] + timedelta(hours=1)
+            predictions.append({"timestamp": timestamp, "predicted_value": pred})
+
+            # Add prediction to historical data for next iteration
+            new_row = pd.DataFrame({"value": [pred]}, index=[timestamp])
+            last_data = pd.concat([last_data, new_row])
+
+        return predictions
+
+    def _forecast_incremental(
+        self, current_data: pd.DataFrame, horizon_hours: int
+    ) -> List[Dict[str, Any]]:
+        """Forecast recursively, updating lag and rolling features in place."""
+        features = self.prepare_features(current_data.copy())
+        row = features.iloc[-1].to_numpy(dtype=np.float64)
+        ring = _LagRing(current_data["value"].to_numpy(), max(LAGS) + 1)
+        timestamp = current_data.index[-1]
+
+        predictions = []
+        for _ in range(horizon_hours):
+            pred = self._predict_step(row)
+            timestamp = timestamp + timedelta(hours=1)
+            predictions.append({"timestamp": timestamp, "predicted_value": pred})
+
+            ring.push(pred)
+            window = ring.window(ROLLING_WINDOW)
+            day_of_week = timestamp.dayofweek
+            row = np.array(
+                [
+                    timestamp.hour,
+                    day_of_week,
+                    int(day_of_week in (5, 6)),
+                    window.mean(),
+                    window.std(ddof=1),
+                    *(ring.lag(lag) for lag in LAGS),
+                ],
+                dtype=np.float64,
+            )
+
+        return predictions
+
+    def _forecast_direct(
+        self, current_data: pd.DataFrame, horizon_hours: int
+    ) -> List[Dict[str, Any]]:
+        """Forecast the whole horizon with a single vectorised model call."""
+        if horizon_hours <= 0:
+            return []
+
+        # Observed tail, NaN-padded so every window and lag index is valid
+        tail_size = max(LAGS) + ROLLING_WINDOW
+        observed = current_data["value"].to_numpy(dtype=np.float64)[-tail_size:]
+        values = np.full(tail_size + horizon_hours - 1, np.nan)
+        values[tail_size - len(observed) : tail_size] = observed
+
+        # Values inside the horizon take the most recent observed value for
+        # the same hour of day, so every lag and rolling input is known
+        steps = np.arange(1, horizon_hours)
+        values[tail_size - 1 + steps] = values[tail_size - 1 - (-steps % 24)]
+
+        # Row h describes the state just before the (h + 1)-th forecast
+        ends = tail_size - 1 + np.arange(horizon_hours)
+        windows = np.lib.stride_tricks.sliding_window_view(values, ROLLING_WINDOW)
+        window_rows = windows[ends - ROLLING_WINDOW + 1]
+
+        row_times = current_data.index[-1] + pd.to_timedelta(
+            np.arange(horizon_hours), unit="h"
+        )
+        day_of_week = np.asarray(row_times.dayofweek)
+        rows = np.column_stack(
+            [
+                np.asarray(row_times.hour),
+                day_of_week,
+                np.isin(day_of_week, [5, 6]).astype(int),
+                window_rows.mean(axis=1),
+                window_rows.std(axis=1, ddof=1),
+                *(values[ends - lag] for lag in LAGS),
+            ]
+        ).astype(np.float64)
+
+        preds = self._predict_rows(rows)
+        timestamps = row_times + timedelta(hours=1)
+        return [
+            {"timestamp": timestamp, "predicted_value": pred}
+            for timestamp, pred in zip(timestamps, preds)
+        ]
+
     def _generate_recommendations(self, predictions: List[Dict]) -> List[Dict]:
         """Generate resource optimization recommendations."""
         recommendations = []
@@ -205,7 +408,7 @@ class ResourceOptimizer:
                 return pd.DataFrame(columns=self.feature_columns)
 
             df = pd.DataFrame(response["Items"])
-            return df[self.feature_columns].fillna(method="ffill")
+            return df[self.feature_columns].ffill()
         except Exception as e:
             print(f"Error getting historical data: {e}")
             return pd.DataFrame(columns=self.feature_columns)
@@ -214,7 +417,7 @@ class ResourceOptimizer:
         """Predict future resource usage based on historical data"""
         try:
             # Simple moving average prediction for now
-            window = min(24, len(data))
+            window = min(RECOMMENDATION_WINDOW, len(data))
             predictions = []
 
             for col in self.feature_columns:
@@ -248,12 +451,7 @@ class ResourceOptimizer:
 
             # Generate recommendations
             recommendations = []
-            thresholds = {
-                "cpu_utilization": {"low": 20, "high": 80},
-                "memory_utilization": {"low": 30, "high": 85},
-                "network_in": {"low": 1000000, "high": 100000000},  # 1MB/s to 100MB/s
-                "network_out": {"low": 1000000, "high": 100000000},
-            }
+            thresholds = RECOMMENDATION_THRESHOLDS
 
             for pred in predictions:
                 metric = pred["metric"]
@@ -262,22 +460,10 @@ class ResourceOptimizer:
                 if metric in thresholds:
                     if value < thresholds[metric]["low"]:
                         recommendations.append(
-                            {
-                                "metric": metric,
-                                "current_value": value,
-                                "recommendation": "downsize",
-                                "reason": f'{metric} is consistently below {thresholds[metric]["low"]}',
-                            }
+                            _recommendation(metric, value, "downsize")
                         )
                     elif value > thresholds[metric]["high"]:
-                        recommendations.append(
-                            {
-                                "metric": metric,
-                                "current_value": value,
-                                "recommendation": "upsize",
-                                "reason": f'{metric} is consistently above {thresholds[metric]["high"]}',
-                            }
-                        )
+                        recommendations.append(_recommendation(metric, value, "upsize"))
 
             return {
                 "status": "success",
@@ -287,3 +473,187 @@ class ResourceOptimizer:
             }
         except Exception as e:
             return {"status": "error", "message": str(e)}
+
+    def get_recommendations_batch(
+        self,
+        resource_ids: Sequence[str],
+        days: int = 7,
+        max_workers: int = 16,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get recommendations for many resources in one pass.
+
+        History is fetched concurrently through a bounded thread pool; the
+        moving average and threshold checks then run once over a stacked
+        ``(resources, window, metrics)`` array. Each result has the same
+        shape as :meth:`get_recommendations`.
+        """
+        end_time = datetime.now()
+        start_time = end_time - timedelta(days=days)
+        count = len(resource_ids)
+
+        # Row 0 carries the last value seen before the window for ffill
+        windows = np.full(
+            (count, RECOMMENDATION_WINDOW + 1, len(self.feature_columns)), np.nan
+        )
+        has_data = np.zeros(count, dtype=bool)
+        errors: Dict[int, str] = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self._fetch_recent_window, resource_id, start_time, end_time
+                ): i
+                for i, resource_id in enumerate(resource_ids)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                i = futures[future]
+                try:
+                    window = future.result()
+                    if window is not None:
+                        windows[i] = window
+                        has_data[i] = True
+                except Exception as e:
+                    errors[i] = str(e)
+                if progress_callback:
+                    progress_callback(done, count)
+
+        predictions = self._moving_average(windows)
+        return self._batch_results(resource_ids, predictions, has_data, errors)
+
+    def _fetch_recent_window(
+        self, resource_id: str, start_time: datetime, end_time: datetime
+    ) -> Optional[np.ndarray]:
+        """Fetch a resource's recent history as a ``(window + 1, metrics)`` array.
+
+        Uses the low-level client (resources are not thread-safe) and follows
+        every page. Only the last window of rows is kept, plus one row with
+        each metric's last value before it.
+        """
+        paginator = self.client.get_paginator("query")
+        pages = paginator.paginate(
+            TableName=self.table.name,
+            KeyConditionExpression="resource_id = :rid AND #ts BETWEEN :start AND :end",
+            ExpressionAttributeNames={"#ts": "timestamp"},
+            ExpressionAttributeValues={
+                ":rid": {"S": resource_id},
+                ":start": {"S": start_time.isoformat()},
+                ":end": {"S": end_time.isoformat()},
+            },
+        )
+
+        rows = []
+        for page in pages:
+            for item in page.get("Items", []):
+                nested = item.get("metrics", {}).get("M", {})
+                rows.append(
+                    [
+                        _attribute_to_float(item.get(col) or nested.get(col))
+                        for col in self.feature_columns
+                    ]
+                )
+        if not rows:
+            return None
+
+        values = np.array(rows, dtype=np.float64)
+        window = np.full((RECOMMENDATION_WINDOW + 1, len(self.feature_columns)), np.nan)
+        tail = values[-RECOMMENDATION_WINDOW:]
+        window[RECOMMENDATION_WINDOW + 1 - len(tail) :] = tail
+
+        before = values[:-RECOMMENDATION_WINDOW]
+        if len(before):
+            valid = ~np.isnan(before)
+            last = np.where(
+                valid.any(axis=0), len(before) - 1 - np.argmax(valid[::-1], axis=0), 0
+            )
+            window[0] = before[last, np.arange(before.shape[1])]
+        return window
+
+    @staticmethod
+    def _moving_average(windows: np.ndarray) -> np.ndarray:
+        """Forward-fill along the window axis and average it, for all resources."""
+        positions = np.arange(windows.shape[1])[np.newaxis, :, np.newaxis]
+        index = np.where(np.isnan(windows), 0, positions)
+        np.maximum.accumulate(index, axis=1, out=index)
+        filled = np.take_along_axis(windows, index, axis=1)[:, 1:, :]
+
+        counts = (~np.isnan(filled)).sum(axis=1)
+        sums = np.nansum(filled, axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    def _batch_results(
+        self,
+        resource_ids: Sequence[str],
+        predictions: np.ndarray,
+        has_data: np.ndarray,
+        errors: Dict[int, str],
+    ) -> List[Dict[str, Any]]:
+        """Apply thresholds to the stacked predictions and build results."""
+        low = np.array(
+            [
+                RECOMMENDATION_THRESHOLDS.get(col, {}).get("low", -np.inf)
+                for col in self.feature_columns
+            ]
+        )
+        high = np.array(
+            [
+                RECOMMENDATION_THRESHOLDS.get(col, {}).get("high", np.inf)
+                for col in self.feature_columns
+            ]
+        )
+        downsize = predictions < low
+        upsize = predictions > high
+        present = ~np.isnan(predictions)
+
+        results = []
+        for i, resource_id in enumerate(resource_ids):
+            if i in errors:
+                results.append(
+                    {
+                        "status": "error",
+                        "resource_id": resource_id,
+                        "message": errors[i],
+                    }
+                )
+                continue
+            if not has_data[i]:
+                results.append(
+                    {
+                        "status": "error",
+                        "resource_id": resource_id,
+                        "message": "No historical data available",
+                    }
+                )
+                continue
+
+            resource_predictions = []
+            recommendations = []
+            for j, metric in enumerate(self.feature_columns):
+                if not present[i, j]:
+                    continue
+                value = float(predictions[i, j])
+                resource_predictions.append(
+                    {"metric": metric, "prediction": value, "confidence": 0.8}
+                )
+                if downsize[i, j]:
+                    recommendations.append(_recommendation(metric, value, "downsize"))
+                elif upsize[i, j]:
+                    recommendations.append(_recommendation(metric, value, "upsize"))
+
+            results.append(
+                {
+                    "status": "success",
+                    "resource_id": resource_id,
+                    "predictions": resource_predictions,
+                    "recommendations": recommendations,
+                }
+            )
+        return results
+
+
+def _attribute_to_float(attribute: Optional[Dict[str, Any]]) -> float:
+    """Decode a low-level DynamoDB number attribute, NaN if absent."""
+    if not attribute or "N" not in attribute:
+        return np.nan
+    return float(attribute["N"])
@@ -0,0 +1,197 @@
+"""Background batching writer for InfluxDB.
+
+Request handlers hand line protocol to ``BatchingWriter.submit``, which
+only appends to an in-memory buffer. A task on the event loop writes the
+buffer in batches of ``batch_size`` lines, or whatever has accumulated
+every ``flush_interval`` seconds, calling the blocking write function in
+the default executor and retrying failed writes with exponential backoff.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+OVERFLOW_POLICIES = ("block", "reject")
+
+
+class BufferFullError(Exception):
+    """Raised when points cannot be buffered for writing."""
+
+
+class BatchingWriter:
+    """Buffers line protocol and writes it in batches in the background."""
+
+    def __init__(
+        self,
+        write: Callable[[str], None],
+        batch_size: int = 5000,
+        flush_interval: float = 1.0,
+        max_buffer: int = 100000,
+        overflow: str = "block",
+        block_timeout: float = 5.0,
+        max_retries: int = 5,
+        retry_interval: float = 0.5,
+        max_retry_interval: float = 30.0,
+    ):
+        """Initialize writer.
+
+        When ``max_buffer`` lines are waiting, "block" makes ``submit`` wait
+        up to ``block_timeout`` seconds for room and "reject" fails at
+        once; either way ``BufferFullError`` is raised if there is no room.
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.write = write
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.max_retries = max_retries
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        self.logger = logging.getLogger(__name__)
+
+        self._buffer: Deque[str] = deque()
+        # Created by start() on the loop that runs the flush task; on older
+        # Pythons they bind to the loop current at creation, which may not be
+        # the server's when the writer is built at import
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Condition] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._stats = {
+            "points_written": 0,
+            "points_failed": 0,
+            "points_rejected": 0,
+            "batches_written": 0,
+            "last_batch_size": 0,
+            "write_latency_last": 0.0,
+            "write_latency_max": 0.0,
+        }
+        self._write_time = 0.0
+
+    def start(self) -> None:
+        """Start the flush task on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._space = asyncio.Condition()
+            self._task = None
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._task = loop.create_task(self._run())
+
+    async def submit(self, lines: List[str]) -> None:
+        """Buffer lines for writing, waiting for room per the overflow policy."""
+        self.start()
+        count = len(lines)
+        if len(self._buffer) + count > self.max_buffer:
+            if self.overflow == "block" and count <= self.max_buffer:
+                try:
+                    await asyncio.wait_for(
+                        self._wait_for_room(count), self.block_timeout
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            if len(self._buffer) + count > self.max_buffer:
+                self._stats["points_rejected"] += count
+                raise BufferFullError(
+                    f"Write buffer full ({len(self._buffer)}/{self.max_buffer} points)"
+                )
+
+        self._buffer.extend(lines)
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def close(self) -> None:
+        """Write everything buffered and stop the flush task."""
+        if self._task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get buffer occupancy, batch sizes and write latency in seconds"""
+        batches = self._stats["batches_written"]
+        return {
+            **self._stats,
+            "buffered": len(self._buffer),
+            "buffer_capacity": self.max_buffer,
+            "buffer_utilization": len(self._buffer) / self.max_buffer,
+            "avg_batch_size": self._stats["points_written"] / batches if batches else 0,
+            "write_latency_avg": self._write_time / batches if batches else 0.0,
+        }
+
+    async def _wait_for_room(self, count: int) -> None:
+        async with self._space:
+            await self._space.wait_for(
+                lambda: len(self._buffer) + count <= self.max_buffer
+            )
+
+    async def _run(self) -> None:
+        """Flush full batches as they fill and partial ones on each interval."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            while self._buffer:
+                batch = [
+                    self._buffer.popleft()
+                    for _ in range(min(self.batch_size, len(self._buffer)))
+                ]
+                async with self._space:
+                    self._space.notify_all()
+                await self._write_batch(batch)
+                # A partial batch waits for the next interval unless closing
+                if len(self._buffer) < self.batch_size and not self._closing:
+                    break
+
+            if self._closing and not self._buffer:
+                return
+
+    async def _write_batch(self, lines: List[str]) -> None:
+        """Write one batch, retrying with backoff; give up on client errors."""
+        body = "\n".join(lines)
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                await loop.run_in_executor(None, self.write, body)
+            except Exception as e:
+                status = getattr(e, "status", None)
+                retryable = status is None or status == 429 or status >= 500
+                if not retryable or attempt == self.max_retries:
+                    self._stats["points_failed"] += len(lines)
+                    self.logger.error(
+                        f"Dropping {len(lines)} points after {attempt + 1} "
+                        f"write attempts: {str(e)}"
+                    )
+                    return
+                delay = min(self.retry_interval * 2**attempt, self.max_retry_interval)
+                self.logger.warning(
+                    f"InfluxDB write failed, retrying in {delay:.1f}s: {str(e)}"
+                )
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+                continue
+
+            latency = time.perf_counter() - started
+            self._write_time += latency
+            self._stats["points_written"] += len(lines)
+            self._stats["batches_written"] += 1
+            self._stats["last_batch_size"] = len(lines)
+            self._stats["write_latency_last"] = latency
+            self._stats["write_latency_max"] = max(
+                self._stats["write_latency_max"], latency
+            )
+            return
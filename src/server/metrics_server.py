@@ -1,4 +1,5 @@
 import time
+from contextlib import asynccontextmanager
 from typing import Any, Dict, List
 
 import jwt
@@ -6,11 +7,25 @@ import uvicorn
 from fastapi import FastAPI, HTTPException, Security
 from fastapi.security import HTTPBearer
 from influxdb_client import InfluxDBClient
+from influxdb_client.client.write_api import SYNCHRONOUS
 from pydantic import BaseModel
 
+from ..agent.backends.line_protocol import format_lines
+from ..analysis.rollups import RollupStore
 from ..analysis.trend_analyzer import TrendAnalyzer
+from ..api.result_cache import ResultCache
+from ..auth.token_cache import token_cache
+from .influx_writer import BatchingWriter, BufferFullError
 
-app = FastAPI(title="Cloud Pioneer Metrics Server")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Write out points still buffered before exiting
+    await metrics_server.writer.close()
+
+
+app = FastAPI(title="Cloud Pioneer Metrics Server", lifespan=lifespan)
 security = HTTPBearer()
 
 
@@ -40,41 +55,55 @@ class MetricsServer:
             url=config["influxdb"]["url"],
             token=config["influxdb"]["token"],
             org=config["influxdb"]["org"],
+            enable_gzip=config["influxdb"].get("gzip", True),
         )
-        self.write_api = self.influx_client.write_api()
-        self.trend_analyzer = TrendAnalyzer(config["influxdb"])
+        # Batching is done by self.writer, so each write is one request
+        self.write_api = self.influx_client.write_api(write_options=SYNCHRONOUS)
+        self.writer = BatchingWriter(self._write_lines, **config.get("ingest", {}))
+        self.rollups = RollupStore(**config.get("rollups", {}))
+        self.trend_analyzer = TrendAnalyzer(config["influxdb"], self.rollups)
+        self.results = ResultCache(**config.get("result_cache", {}))
+
+    def _write_lines(self, body: str):
+        self.write_api.write(bucket=self.config["influxdb"]["bucket"], record=body)
 
     def verify_token(self, token: str) -> bool:
+        secret = self.config["jwt_secret"]
         try:
-            jwt.decode(token, self.config["jwt_secret"], algorithms=["HS256"])
+            token_cache.verify(
+                token, secret, lambda t: jwt.decode(t, secret, algorithms=["HS256"])
+            )
             return True
         except:
             return False
 
     async def store_metrics(self, metrics: List[MetricData], agent_id: str):
-        points = []
-        for metric in metrics:
-            point = {
-                "measurement": metric.name,
-                "tags": {**metric.tags, "agent_id": agent_id},
-                "fields": {"value": metric.value},
-                "time": int(metric.timestamp * 1e9),
-            }
-            points.append(point)
-
+        rows = [(m.name, m.value, m.tags, m.timestamp, m.source) for m in metrics]
+        lines = list(format_lines(rows, {"agent_id": agent_id}))
         try:
-            self.write_api.write(
-                bucket=self.config["influxdb"]["bucket"], record=points
+            await self.writer.submit(lines)
+        except BufferFullError as e:
+            raise HTTPException(
+                status_code=503, detail=str(e), headers={"Retry-After": "1"}
             )
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+        self.rollups.add_rows(rows)
+        # Cached analyses of these series are now out of date
+        resource_tag = self.rollups.resource_tag
+        for resource_id, name in {(m.tags.get(resource_tag), m.name) for m in metrics}:
+            if resource_id is not None:
+                self.results.advance(resource_id, name)
 
     async def get_analysis(
         self, resource_id: str, metric_name: str, days: int
     ) -> Dict[str, Any]:
         try:
-            return self.trend_analyzer.analyze_resource_patterns(
-                resource_id=resource_id, metric_name=metric_name, days=days
+            return await self.results.get_or_compute(
+                resource_id,
+                metric_name,
+                days,
+                lambda: self.trend_analyzer.analyze_resource_patterns(
+                    resource_id=resource_id, metric_name=metric_name, days=days
+                ),
             )
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
@@ -89,6 +118,18 @@ server_config = {
         "bucket": "metrics",
     },
     "jwt_secret": "your-secret-key",
+    "ingest": {
+        "batch_size": 5000,
+        "flush_interval": 1.0,
+        "max_buffer": 100000,
+        "overflow": "block",
+    },
+    "result_cache": {"maxsize": 1024, "max_age": 300},
+    "rollups": {
+        "resource_tag": "resource_id",
+        "hourly_retention_days": 35,
+        "daily_retention_days": 400,
+    },
 }
 
 metrics_server = MetricsServer(server_config)
@@ -105,6 +146,22 @@ async def receive_metrics(
     return {"status": "success"}
 
 
+@app.get("/ingest/stats")
+async def get_ingest_stats(token: HTTPBearer = Security(security)):
+    if not metrics_server.verify_token(token.credentials):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    return metrics_server.writer.get_stats()
+
+
+@app.get("/analysis/stats")
+async def get_analysis_stats(token: HTTPBearer = Security(security)):
+    if not metrics_server.verify_token(token.credentials):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    return metrics_server.results.get_stats()
+
+
 @app.get("/analysis")
 async def get_analysis(
     request: AnalysisRequest, token: HTTPBearer = Security(security)
@@ -0,0 +1,420 @@
+"""Online anomaly and threshold detection over the metrics stream.
+
+Every (resource, metric) series keeps a fixed set of numbers: an EWMA and
+exponentially weighted variance, streaming estimates of a few quantiles,
+and threshold-crossing state. There is no history, so memory is constant
+per series. State lives in numpy arrays indexed by series, and a batch of
+points is applied in rounds: round ``r`` updates every series that has an
+``r``-th point in the batch, all at once, so points of one series are
+still applied in order. Once rounds get small, as with few series or a
+hot series, the remaining points are applied one series at a time in
+plain Python, which costs less than a numpy round per point.
+
+Three kinds of events are produced:
+
+- ``anomaly``: a point more than ``z_threshold`` standard deviations from
+  the EWMA, at most once per ``anomaly_cooldown`` seconds per series.
+- ``scale_up``: the EWMA stays above the metric's high threshold for
+  ``sustain`` points.
+- ``scale_down``: even the upper quantile stays below the metric's low
+  threshold for ``sustain`` points.
+
+Scale events fire when a series enters the state. The series leaves the
+state once it is back inside the band by ``hysteresis``.
+"""
+
+import logging
+import math
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Same bands as the batch recommendations in ml.resource_optimizer
+DEFAULT_THRESHOLDS = {
+    "cpu_utilization": (20.0, 80.0),
+    "memory_utilization": (30.0, 85.0),
+    "system.cpu.utilization": (20.0, 80.0),
+    "system.memory.utilization": (30.0, 85.0),
+    "docker.cpu.usage_percent": (20.0, 80.0),
+    "docker.memory.usage_percent": (30.0, 85.0),
+}
+# Tags naming the resource a metric belongs to, in order of preference
+DEFAULT_RESOURCE_TAGS = ("resource_id", "container_name", "host")
+
+NORMAL, HIGH, LOW = 0, 1, -1
+# Rounds updating fewer series than this are cheaper point by point
+MIN_ROUND_SERIES = 32
+
+
+class StreamingDetector:
+    """Per-series EWMA, quantile and threshold state, updated in batches."""
+
+    def __init__(
+        self,
+        thresholds: Optional[Dict[str, Tuple[float, float]]] = None,
+        alpha: float = 0.05,
+        z_threshold: float = 4.0,
+        warmup: int = 30,
+        quantiles: Sequence[float] = (0.05, 0.5, 0.95),
+        quantile_rate: float = 0.05,
+        sustain: int = 6,
+        hysteresis: float = 5.0,
+        anomaly_cooldown: float = 300.0,
+        resource_tags: Sequence[str] = DEFAULT_RESOURCE_TAGS,
+        capacity: int = 1024,
+    ):
+        """Initialize detector.
+
+        ``thresholds`` maps metric names to ``(low, high)``; metrics without
+        thresholds only produce anomaly events. ``alpha`` is the EWMA
+        weight of each new point and ``warmup`` the points a series needs
+        before anomalies are reported. Scale-down decisions use the
+        highest of ``quantiles``.
+        """
+        self.thresholds = DEFAULT_THRESHOLDS if thresholds is None else thresholds
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.warmup = warmup
+        self.quantiles = np.asarray(sorted(quantiles), dtype=np.float64)
+        self._levels = self.quantiles.tolist()
+        self.quantile_rate = quantile_rate
+        self.sustain = sustain
+        self.hysteresis = hysteresis
+        self.anomaly_cooldown = anomaly_cooldown
+        self.resource_tags = tuple(resource_tags)
+        self.logger = logging.getLogger(__name__)
+
+        self._index: Dict[Tuple[str, str], int] = {}
+        self._keys: List[Tuple[str, str]] = []
+        self._size = 0
+        self._allocate(capacity)
+        self._stats = {"points": 0, "events": 0, "max_delay": 0.0}
+
+    def _allocate(self, capacity: int) -> None:
+        """Create or grow the per-series state arrays."""
+        old = self._size
+        fields = {
+            "count": (np.int64, 0),
+            "mean": (np.float64, 0.0),
+            "var": (np.float64, 0.0),
+            "low": (np.float64, np.nan),
+            "high": (np.float64, np.nan),
+            "state": (np.int8, NORMAL),
+            "high_streak": (np.int32, 0),
+            "low_streak": (np.int32, 0),
+            "last_anomaly": (np.float64, -np.inf),
+        }
+        for name, (dtype, fill) in fields.items():
+            array = np.full(capacity, fill, dtype=dtype)
+            if old:
+                array[:old] = getattr(self, f"_{name}")[:old]
+            setattr(self, f"_{name}", array)
+        quantiles = np.zeros((capacity, len(self.quantiles)))
+        if old:
+            quantiles[:old] = self._q[:old]
+        self._q = quantiles
+        self._capacity = capacity
+
+    def _series_id(self, key: Tuple[str, str]) -> int:
+        series_id = self._index.get(key)
+        if series_id is None:
+            series_id = self._index[key] = self._size
+            if self._size == self._capacity:
+                self._allocate(self._capacity * 2)
+            low, high = self.thresholds.get(key[1], (np.nan, np.nan))
+            self._low[series_id], self._high[series_id] = low, high
+            self._keys.append(key)
+            self._size += 1
+        return series_id
+
+    def process_records(self, records: Iterable[Dict[str, Any]]) -> List[Dict]:
+        """Update from metric dicts as carried on the metrics topic.
+
+        Records without a resource tag or a numeric value are skipped.
+        """
+        resource_ids, names, values, timestamps = [], [], [], []
+        for record in records:
+            tags = record.get("tags") or {}
+            resource_id = next(
+                (tags[tag] for tag in self.resource_tags if tag in tags), None
+            )
+            value = record.get("value")
+            if resource_id is None or not isinstance(value, (int, float)):
+                continue
+            resource_ids.append(resource_id)
+            names.append(record["name"])
+            values.append(value)
+            timestamps.append(record.get("timestamp") or time.time())
+        return self.update(resource_ids, names, values, timestamps)
+
+    def update(
+        self,
+        resource_ids: Sequence[str],
+        metric_names: Sequence[str],
+        values: Sequence[float],
+        timestamps: Sequence[float],
+    ) -> List[Dict]:
+        """Apply points, in time order per series, and return new events."""
+        count = len(values)
+        if not count:
+            return []
+        series_id = self._series_id
+        ids = np.fromiter(
+            (series_id(key) for key in zip(resource_ids, metric_names)),
+            dtype=np.int64,
+            count=count,
+        )
+        values = np.asarray(values, dtype=np.float64)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+
+        # Rank each point among the batch's points of its series, then
+        # process rank 0 of every series, rank 1, and so on
+        order = np.argsort(ids, kind="stable")
+        sorted_ids = ids[order]
+        starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+        lengths = np.diff(np.r_[starts, count])
+        rank = np.arange(count) - np.repeat(starts, lengths)
+        by_rank = order[np.argsort(rank, kind="stable")]
+        round_sizes = np.bincount(rank)
+
+        events: List[Dict] = []
+        offset = 0
+        rounds = int(np.searchsorted(-round_sizes, -MIN_ROUND_SERIES, side="right"))
+        for size in round_sizes[:rounds]:
+            points = by_rank[offset : offset + size]
+            offset += size
+            self._update_round(ids[points], values[points], timestamps[points], events)
+
+        if offset < count:
+            # The rest, grouped by series in arrival order
+            tail = order[rank >= rounds]
+            tail_ids = ids[tail]
+            tail_values = values[tail].tolist()
+            tail_timestamps = timestamps[tail].tolist()
+            bounds = np.flatnonzero(np.diff(tail_ids)) + 1
+            starts = [0, *bounds.tolist()]
+            ends = [*bounds.tolist(), len(tail)]
+            for start, end in zip(starts, ends):
+                self._update_series(
+                    int(tail_ids[start]),
+                    tail_values[start:end],
+                    tail_timestamps[start:end],
+                    events,
+                )
+
+        self._stats["points"] += count
+        self._stats["events"] += len(events)
+        self._stats["max_delay"] = max(
+            self._stats["max_delay"], time.time() - float(timestamps.min())
+        )
+        return events
+
+    def _update_round(
+        self,
+        sid: np.ndarray,
+        x: np.ndarray,
+        ts: np.ndarray,
+        events: List[Dict],
+    ) -> None:
+        """Update series ``sid``, each appearing once, with one point each."""
+        n = self._count[sid]
+        first = n == 0
+        mean = np.where(first, x, self._mean[sid])
+        var = self._var[sid]
+        std = np.sqrt(var)
+
+        # Score against the state before this point
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.where((n >= self.warmup) & (std > 0), (x - mean) / std, 0.0)
+        anomalous = (np.abs(z) > self.z_threshold) & (
+            ts - self._last_anomaly[sid] >= self.anomaly_cooldown
+        )
+
+        # Exponentially weighted mean and variance
+        delta = x - mean
+        increment = self.alpha * delta
+        mean = mean + increment
+        var = (1 - self.alpha) * (var + delta * increment)
+
+        # Stochastic-approximation quantiles, stepping in units of the spread
+        q = np.where(first[:, None], x[:, None], self._q[sid])
+        step = self.quantile_rate * np.maximum(std, 1e-9)
+        q += step[:, None] * (self.quantiles - (x[:, None] < q))
+        # Keep the estimates ordered
+        q.sort(axis=1)
+
+        # Threshold crossing with hysteresis
+        low, high = self._low[sid], self._high[sid]
+        upper = q[:, -1]
+        state = self._state[sid]
+        high_streak = np.where(mean > high, self._high_streak[sid] + 1, 0)
+        low_streak = np.where(upper < low, self._low_streak[sid] + 1, 0)
+        new_state = state.copy()
+        new_state[(state == HIGH) & (mean < high - self.hysteresis)] = NORMAL
+        new_state[(state == LOW) & (upper > low + self.hysteresis)] = NORMAL
+        new_state[high_streak >= self.sustain] = HIGH
+        new_state[low_streak >= self.sustain] = LOW
+
+        self._count[sid] = n + 1
+        self._mean[sid] = mean
+        self._var[sid] = var
+        self._q[sid] = q
+        self._state[sid] = new_state
+        self._high_streak[sid] = high_streak
+        self._low_streak[sid] = low_streak
+        self._last_anomaly[sid[anomalous]] = ts[anomalous]
+
+        changed = (new_state != state) & (new_state != NORMAL)
+        for i in np.flatnonzero(anomalous | changed):
+            if anomalous[i]:
+                events.append(self._event("anomaly", sid[i], x[i], ts[i], z[i]))
+            if changed[i]:
+                kind = "scale_up" if new_state[i] == HIGH else "scale_down"
+                events.append(self._event(kind, sid[i], x[i], ts[i], z[i]))
+
+    def _update_series(
+        self,
+        sid: int,
+        values: List[float],
+        timestamps: List[float],
+        events: List[Dict],
+    ) -> None:
+        """Apply points of one series in order; same rules as ``_update_round``."""
+        alpha, levels = self.alpha, self._levels
+        n = int(self._count[sid])
+        mean, var = float(self._mean[sid]), float(self._var[sid])
+        q = self._q[sid].tolist()
+        low, high = float(self._low[sid]), float(self._high[sid])
+        state = int(self._state[sid])
+        high_streak = int(self._high_streak[sid])
+        low_streak = int(self._low_streak[sid])
+        last_anomaly = float(self._last_anomaly[sid])
+
+        for x, ts in zip(values, timestamps):
+            if n == 0:
+                mean = x
+                q = [x] * len(levels)
+            std = math.sqrt(var)
+            z = (x - mean) / std if n >= self.warmup and std > 0 else 0.0
+            anomalous = (
+                abs(z) > self.z_threshold and ts - last_anomaly >= self.anomaly_cooldown
+            )
+
+            delta = x - mean
+            increment = alpha * delta
+            mean += increment
+            var = (1 - alpha) * (var + delta * increment)
+
+            step = self.quantile_rate * max(std, 1e-9)
+            q = sorted(
+                estimate + step * (level - (x < estimate))
+                for estimate, level in zip(q, levels)
+            )
+
+            upper = q[-1]
+            high_streak = high_streak + 1 if mean > high else 0
+            low_streak = low_streak + 1 if upper < low else 0
+            new_state = state
+            if state == HIGH and mean < high - self.hysteresis:
+                new_state = NORMAL
+            if state == LOW and upper > low + self.hysteresis:
+                new_state = NORMAL
+            if high_streak >= self.sustain:
+                new_state = HIGH
+            if low_streak >= self.sustain:
+                new_state = LOW
+            changed = new_state != state and new_state != NORMAL
+            n += 1
+            state = new_state
+            if anomalous:
+                last_anomaly = ts
+
+            if anomalous or changed:
+                # Events read the series' state from the arrays
+                self._count[sid], self._mean[sid], self._var[sid] = n, mean, var
+                self._q[sid] = q
+                if anomalous:
+                    events.append(self._event("anomaly", sid, x, ts, z))
+                if changed:
+                    kind = "scale_up" if state == HIGH else "scale_down"
+                    events.append(self._event(kind, sid, x, ts, z))
+
+        self._count[sid] = n
+        self._mean[sid] = mean
+        self._var[sid] = var
+        self._q[sid] = q
+        self._state[sid] = state
+        self._high_streak[sid] = high_streak
+        self._low_streak[sid] = low_streak
+        self._last_anomaly[sid] = last_anomaly
+
+    def _event(
+        self, kind: str, sid: int, value: float, timestamp: float, zscore: float
+    ) -> Dict[str, Any]:
+        resource_id, metric_name = self._keys[sid]
+        quantiles = self._q[sid]
+        return {
+            "type": kind,
+            "resource_id": resource_id,
+            "metric": metric_name,
+            "value": float(value),
+            "ewma": float(self._mean[sid]),
+            "std": float(np.sqrt(self._var[sid])),
+            "zscore": float(zscore),
+            "quantiles": {
+                f"p{round(level * 100):02d}": float(estimate)
+                for level, estimate in zip(self.quantiles, quantiles)
+            },
+            "thresholds": {
+                "low": float(self._low[sid]),
+                "high": float(self._high[sid]),
+            },
+            "timestamp": float(timestamp),
+            "detected_at": time.time(),
+        }
+
+    def series_state(self, resource_id: str, metric_name: str) -> Dict[str, Any]:
+        """Current EWMA, spread, quantiles and threshold state of one series"""
+        sid = self._index.get((resource_id, metric_name))
+        if sid is None:
+            return {}
+        return {
+            "count": int(self._count[sid]),
+            "ewma": float(self._mean[sid]),
+            "std": float(np.sqrt(self._var[sid])),
+            "quantiles": dict(zip(self.quantiles.tolist(), self._q[sid].tolist())),
+            "state": {HIGH: "high", LOW: "low"}.get(int(self._state[sid]), "normal"),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get points processed, events emitted, series tracked and max delay"""
+        return {**self._stats, "series": self._size}
+
+    def run(
+        self,
+        kafka_manager,
+        metrics_topic: str = "cloud-pioneer-metrics",
+        events_topic: str = "cloud-pioneer-events",
+        emit: Optional[Callable[[List[Dict]], Any]] = None,
+        **consume_options: Any,
+    ) -> None:
+        """Consume the metrics topic and publish events to the events topic.
+
+        Events of each polled batch are sent as soon as the batch is
+        processed. ``consume_options`` go to ``consume_batches``; the
+        detector is not thread-safe, so partitions are handled one at a
+        time.
+        """
+        if emit is None:
+
+            def emit(events: List[Dict]) -> None:
+                kafka_manager.send_batch(events_topic, events)
+
+        def handle(records: List[Dict[str, Any]]) -> None:
+            events = self.process_records(records)
+            if events:
+                emit(events)
+
+        consume_options["workers"] = 1
+        kafka_manager.consume_batches(metrics_topic, handle, **consume_options)
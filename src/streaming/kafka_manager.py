@@ -2,22 +2,84 @@
 Kafka manager for handling real-time data streaming.
 """
 
-import json
 import logging
-from typing import Any, Callable, Dict, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 from kafka import KafkaConsumer, KafkaProducer
 from kafka.errors import NoBrokersAvailable
+from kafka.structs import OffsetAndMetadata, TopicPartition
+
+from ..agent.models import Metric, metric_rows
+from .serialization import (
+    JSON_FORMAT,
+    SerializationError,
+    decode_message,
+    encode_json,
+    format_headers,
+    get_serializer,
+)
+
+PRODUCER_MODES = ("reliable", "throughput")
+
+# Every send is flushed and acknowledged by all replicas before returning
+RELIABLE_PRODUCER_CONFIG = {
+    "acks": "all",
+    "retries": 3,
+    "max_in_flight_requests_per_connection": 1,
+}
+
+# Sends return at once and are batched by the client; delivery is reported
+# through callbacks and flushes happen only at batch boundaries
+THROUGHPUT_PRODUCER_CONFIG = {
+    "acks": 1,
+    "retries": 3,
+    "linger_ms": 20,
+    "batch_size": 256 * 1024,
+    "compression_type": "gzip",
+    "max_in_flight_requests_per_connection": 5,
+}
 
 
 class KafkaManager:
-    def __init__(self, bootstrap_servers: str, client_id: str, testing: bool = False):
+    def __init__(
+        self,
+        bootstrap_servers: str,
+        client_id: str,
+        testing: bool = False,
+        mode: str = "reliable",
+        producer_config: Optional[Dict[str, Any]] = None,
+        max_in_flight: int = 10000,
+        send_timeout: float = 10.0,
+        message_format: str = JSON_FORMAT,
+    ):
+        """Initialize manager.
+
+        In "throughput" mode at most ``max_in_flight`` messages may be
+        awaiting delivery; further sends wait up to ``send_timeout`` seconds
+        for room. ``producer_config`` overrides the mode's producer settings.
+        ``message_format`` is the format ``send_metrics`` writes; consumers
+        read whichever format each message's header names.
+        """
+        if mode not in PRODUCER_MODES:
+            raise ValueError(f"Unknown producer mode: {mode}")
         self.bootstrap_servers = bootstrap_servers
         self.client_id = client_id
         self.testing = testing
+        self.mode = mode
+        self.producer_config = producer_config or {}
+        self.send_timeout = send_timeout
+        self.serializer = get_serializer(message_format)
         self.logger = logging.getLogger(__name__)
         self.producer = None
 
+        self._window = threading.BoundedSemaphore(max_in_flight)
+        self._stats_lock = threading.Lock()
+        self._stats = {"sent": 0, "delivered": 0, "failed": 0, "in_flight": 0}
+        self._last_error: Optional[str] = None
+
         if not testing:
             try:
                 self.producer = self._create_producer()
@@ -28,23 +90,33 @@ class KafkaManager:
             except Exception as e:
                 self.logger.error(f"Failed to create Kafka producer: {str(e)}")
         self.consumers = {}
+        # Next offset to consume per partition, as last committed here
+        self._committed: Dict[TopicPartition, int] = {}
+        # Lag per topic and partition, computed on the polling thread
+        self._lag_lock = threading.Lock()
+        self._lag: Dict[str, Dict[int, int]] = {}
 
     def _create_producer(self) -> Optional[KafkaProducer]:
-        """Create Kafka producer with default settings"""
+        """Create Kafka producer with the settings of the producer mode"""
+        if self.mode == "throughput":
+            config = dict(THROUGHPUT_PRODUCER_CONFIG)
+        else:
+            config = dict(RELIABLE_PRODUCER_CONFIG)
+        config.update(self.producer_config)
         try:
             return KafkaProducer(
                 bootstrap_servers=self.bootstrap_servers,
                 client_id=self.client_id,
-                value_serializer=lambda v: json.dumps(v).encode("utf-8"),
-                acks="all",
-                retries=3,
-                max_in_flight_requests_per_connection=1,
+                value_serializer=encode_json,
+                **config,
             )
         except Exception as e:
             self.logger.error(f"Failed to create Kafka producer: {str(e)}")
             return None
 
-    def create_consumer(self, topic: str, group_id: str) -> KafkaConsumer:
+    def create_consumer(
+        self, topic: str, group_id: str, enable_auto_commit: bool = True
+    ) -> KafkaConsumer:
         """Create a Kafka consumer for a specific topic"""
         try:
             consumer = KafkaConsumer(
@@ -52,7 +124,7 @@ class KafkaManager:
                 bootstrap_servers=self.bootstrap_servers,
                 group_id=group_id,
                 auto_offset_reset="earliest",
-                value_deserializer=lambda x: json.loads(x.decode("utf-8")),
+                enable_auto_commit=enable_auto_commit,
             )
             self.consumers[topic] = consumer
             return consumer
@@ -72,16 +144,139 @@ class KafkaManager:
             )
             return False
 
+        if self.mode == "throughput":
+            return self._send_async(topic, message)
+
+        self._record("sent", in_flight=1)
         try:
             future = self.producer.send(topic, value=message)
             self.producer.flush()
             future.get(timeout=10)
+            self._record("delivered")
             self.logger.debug(f"Message sent to topic {topic}")
             return True
         except Exception as e:
+            self._record("failed", e)
             self.logger.error(f"Failed to send message to topic {topic}: {str(e)}")
             return False
 
+    def send_batch(
+        self,
+        topic: str,
+        messages: Iterable[Any],
+        headers: Optional[List[Tuple[str, bytes]]] = None,
+    ) -> int:
+        """Send messages and flush once at the end of the batch.
+
+        Returns how many were accepted; in "reliable" mode, how many were
+        delivered. Messages already encoded as bytes are sent unchanged.
+        """
+        if self.testing:
+            messages = list(messages)
+            self.logger.info(f"[TEST MODE] Would send {len(messages)} to {topic}")
+            return len(messages)
+
+        if not self.producer:
+            self.logger.warning(
+                f"No Kafka producer available. Messages to {topic} not sent."
+            )
+            return 0
+
+        if self.mode == "throughput":
+            accepted = sum(
+                self._send_async(topic, message, headers) for message in messages
+            )
+            self.flush()
+            return accepted
+
+        futures = []
+        for message in messages:
+            self._record("sent", in_flight=1)
+            try:
+                futures.append(
+                    self.producer.send(topic, value=message, headers=headers)
+                )
+            except Exception as e:
+                self._record("failed", e)
+                self.logger.error(f"Failed to send message to topic {topic}: {str(e)}")
+        self.flush()
+        delivered = 0
+        for future in futures:
+            try:
+                future.get(timeout=10)
+                self._record("delivered")
+                delivered += 1
+            except Exception as e:
+                self._record("failed", e)
+                self.logger.error(f"Failed to send message to topic {topic}: {str(e)}")
+        return delivered
+
+    def send_metrics(self, topic: str, metrics: Iterable[Metric]) -> int:
+        """Send metrics in the manager's message format as one batch.
+
+        Returns the number of messages accepted, which for the binary
+        format is one per tag set rather than one per metric.
+        """
+        messages = self.serializer.encode(metric_rows(metrics))
+        return self.send_batch(topic, messages, format_headers(self.serializer))
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Wait until every pending message has been delivered or failed"""
+        if self.producer and not self.testing:
+            try:
+                self.producer.flush(timeout=timeout)
+            except Exception as e:
+                self.logger.error(f"Failed to flush Kafka producer: {str(e)}")
+
+    def get_delivery_stats(self) -> Dict[str, Any]:
+        """Get sent, delivered, failed and in-flight message counts"""
+        with self._stats_lock:
+            return {**self._stats, "mode": self.mode, "last_error": self._last_error}
+
+    def _send_async(
+        self,
+        topic: str,
+        message: Any,
+        headers: Optional[List[Tuple[str, bytes]]] = None,
+    ) -> bool:
+        """Queue a message, reporting delivery through callbacks"""
+        if not self._window.acquire(timeout=self.send_timeout):
+            self._record("failed", TimeoutError("in-flight window full"), in_flight=0)
+            self.logger.error(
+                f"Failed to send message to topic {topic}: "
+                f"{self.send_timeout}s waiting for in-flight messages"
+            )
+            return False
+
+        self._record("sent", in_flight=1)
+        try:
+            future = self.producer.send(topic, value=message, headers=headers)
+        except Exception as e:
+            self._on_delivery_error(e)
+            self.logger.error(f"Failed to send message to topic {topic}: {str(e)}")
+            return False
+        future.add_callback(self._on_delivered)
+        future.add_errback(self._on_delivery_error)
+        return True
+
+    def _on_delivered(self, _metadata) -> None:
+        self._window.release()
+        self._record("delivered")
+
+    def _on_delivery_error(self, error: Exception) -> None:
+        self._window.release()
+        self._record("failed", error)
+
+    def _record(
+        self, outcome: str, error: Optional[Exception] = None, in_flight: int = -1
+    ) -> None:
+        """Count an outcome; ``in_flight`` is how it changes messages pending"""
+        with self._stats_lock:
+            self._stats[outcome] += 1
+            self._stats["in_flight"] += in_flight
+            if error is not None:
+                self._last_error = str(error)
+
     def consume_messages(self, topic: str, handler: Callable[[Dict[str, Any]], None]):
         """Consume messages from specified topic with a handler function"""
         if topic not in self.consumers:
@@ -90,10 +285,227 @@ class KafkaManager:
         consumer = self.consumers[topic]
         try:
             for message in consumer:
-                handler(message.value)
+                for value in self._decode(message):
+                    handler(value)
+        except Exception as e:
+            self.logger.error(f"Error consuming messages from topic {topic}: {str(e)}")
+            raise
+
+    def consume_batches(
+        self,
+        topic: str,
+        handler: Callable[[List[Any]], None],
+        max_records: int = 500,
+        timeout_ms: int = 1000,
+        workers: int = 1,
+        stop: Optional[threading.Event] = None,
+        max_retries: Optional[int] = 5,
+        retry_backoff: float = 1.0,
+        max_retry_backoff: float = 60.0,
+        dead_letter_topic: Optional[str] = None,
+    ):
+        """Consume messages in batches, committing offsets after processing.
+
+        Each poll returns up to ``max_records`` messages. The handler is
+        called once per partition in the poll with that partition's decoded
+        values, in offset order; with ``workers`` above one, partitions are
+        handled concurrently. Offsets of a partition are committed only once
+        its handler returns. Consumes until ``stop`` is set.
+
+        If the handler raises, the partition is rewound to the start of the
+        batch and paused for ``retry_backoff`` seconds, doubling with each
+        failure of the same batch up to ``max_retry_backoff``; other
+        partitions keep being consumed. After ``max_retries`` retries the
+        batch is skipped: its messages are sent unchanged to
+        ``dead_letter_topic`` if one is given, and its offsets committed.
+        With ``max_retries`` None a batch is retried until it succeeds.
+        """
+        if topic not in self.consumers:
+            self.create_consumer(
+                topic, f"{self.client_id}-{topic}-group", enable_auto_commit=False
+            )
+
+        consumer = self.consumers[topic]
+        executor = (
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kafka-batch")
+            if workers > 1
+            else None
+        )
+        retry = _RetryPolicy(
+            max_retries, retry_backoff, max_retry_backoff, dead_letter_topic
+        )
+        try:
+            while stop is None or not stop.is_set():
+                self._resume_partitions(consumer, retry)
+                batches = consumer.poll(timeout_ms=timeout_ms, max_records=max_records)
+                if batches:
+                    self._process_batches(consumer, batches, handler, executor, retry)
+                self._update_lag(consumer, topic)
         except Exception as e:
             self.logger.error(f"Error consuming messages from topic {topic}: {str(e)}")
             raise
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    def _process_batches(
+        self,
+        consumer: KafkaConsumer,
+        batches: Dict[TopicPartition, List[Any]],
+        handler: Callable[[List[Any]], None],
+        executor: Optional[ThreadPoolExecutor],
+        retry: "_RetryPolicy",
+    ) -> None:
+        """Handle one poll's records per partition, then commit what succeeded"""
+
+        def handle(records: List[Any]) -> None:
+            handler([value for record in records for value in self._decode(record)])
+
+        if executor is None:
+            errors = {}
+            for partition, records in batches.items():
+                try:
+                    handle(records)
+                except Exception as e:
+                    errors[partition] = e
+        else:
+            futures = {
+                partition: executor.submit(handle, records)
+                for partition, records in batches.items()
+            }
+            errors = {
+                partition: future.exception() for partition, future in futures.items()
+            }
+
+        offsets = {}
+        for partition, records in batches.items():
+            error = errors.get(partition)
+            if error is None or self._skip_batch(partition, records, error, retry):
+                retry.attempts.pop(partition, None)
+                offsets[partition] = OffsetAndMetadata(records[-1].offset + 1, None)
+                continue
+            delay = retry.delay(partition)
+            self.logger.error(
+                f"Failed to handle {len(records)} messages from {partition.topic}:"
+                f"{partition.partition}, retrying from offset {records[0].offset} "
+                f"in {delay:.1f}s: {str(error)}"
+            )
+            consumer.seek(partition, records[0].offset)
+            if delay > 0:
+                consumer.pause(partition)
+                retry.paused[partition] = time.monotonic() + delay
+
+        if offsets:
+            consumer.commit(offsets=offsets)
+            self._committed.update(
+                (partition, offset.offset) for partition, offset in offsets.items()
+            )
+
+    def _skip_batch(
+        self,
+        partition: TopicPartition,
+        records: List[Any],
+        error: Exception,
+        retry: "_RetryPolicy",
+    ) -> bool:
+        """Count a failure of the batch; return whether to give up on it"""
+        first = records[0].offset
+        offset, failures = retry.attempts.get(partition, (first, 0))
+        failures = failures + 1 if offset == first else 1
+        retry.attempts[partition] = (first, failures)
+        if retry.max_retries is None or failures <= retry.max_retries:
+            return False
+
+        location = (
+            f"{partition.topic}:{partition.partition} offsets "
+            f"{first}-{records[-1].offset}"
+        )
+        if retry.dead_letter_topic is not None:
+            sent = 0
+            for record in records:
+                headers = list(record.headers or [])
+                sent += self.send_batch(
+                    retry.dead_letter_topic, [record.value], headers
+                )
+            if sent < len(records):
+                self.logger.error(
+                    f"Could not move {location} to {retry.dead_letter_topic}; "
+                    f"retrying"
+                )
+                return False
+            self.logger.error(
+                f"Moved {location} to {retry.dead_letter_topic} after {failures} "
+                f"failures: {str(error)}"
+            )
+        else:
+            self.logger.error(
+                f"Skipping {location} after {failures} failures: {str(error)}"
+            )
+        return True
+
+    def _resume_partitions(
+        self, consumer: KafkaConsumer, retry: "_RetryPolicy"
+    ) -> None:
+        """Resume partitions whose retry delay is over"""
+        if not retry.paused:
+            return
+        now = time.monotonic()
+        assigned = set(consumer.assignment())
+        for partition, resume_at in list(retry.paused.items()):
+            if partition not in assigned:
+                del retry.paused[partition]
+                retry.attempts.pop(partition, None)
+            elif resume_at <= now:
+                del retry.paused[partition]
+                consumer.resume(partition)
+
+    def _update_lag(self, consumer: KafkaConsumer, topic: str) -> None:
+        """Snapshot lag of the assigned partitions of a topic.
+
+        Runs on the polling thread, since the consumer is not thread-safe.
+        Partitions without a high watermark from a fetch yet are left out.
+        """
+        assigned = {tp for tp in consumer.assignment() if tp.topic == topic}
+        for tp in [tp for tp in self._committed if tp.topic == topic]:
+            if tp not in assigned:
+                # Revoked in a rebalance
+                del self._committed[tp]
+
+        lag = {}
+        for tp in assigned:
+            end = consumer.highwater(tp)
+            if end is None:
+                continue
+            committed = self._committed.get(tp)
+            if committed is None:
+                committed = consumer.committed(tp)
+                if committed is not None:
+                    self._committed[tp] = committed
+            if committed is None:
+                committed = consumer.position(tp)
+            lag[tp.partition] = max(end - committed, 0)
+        with self._lag_lock:
+            self._lag[topic] = lag
+
+    def get_consumer_lag(self, topic: str) -> Dict[int, int]:
+        """Get messages not yet committed for each assigned partition of a topic.
+
+        Returns the snapshot taken after the last poll of ``consume_batches``,
+        so it is safe to call from any thread.
+        """
+        with self._lag_lock:
+            return dict(self._lag.get(topic, {}))
+
+    def _decode(self, message) -> List[Any]:
+        """Decode a consumed message in the format its header names"""
+        try:
+            return decode_message(message.value, message.headers)
+        except SerializationError as e:
+            self.logger.error(
+                f"Skipping undecodable message at {message.topic}:"
+                f"{message.partition}:{message.offset}: {str(e)}"
+            )
+            return []
 
     def close(self):
         """Close all Kafka connections"""
@@ -104,3 +516,28 @@ class KafkaManager:
                 self.logger.error(f"Failed to close Kafka producer: {str(e)}")
         for consumer in self.consumers.values():
             consumer.close()
+
+
+class _RetryPolicy:
+    """Retry settings and per-partition failure state of one consume loop."""
+
+    def __init__(
+        self,
+        max_retries: Optional[int],
+        backoff: float,
+        max_backoff: float,
+        dead_letter_topic: Optional[str],
+    ):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.dead_letter_topic = dead_letter_topic
+        # Partition -> (first offset of the failing batch, failures)
+        self.attempts: Dict[TopicPartition, Tuple[int, int]] = {}
+        # Partition -> monotonic time to resume it
+        self.paused: Dict[TopicPartition, float] = {}
+
+    def delay(self, partition: TopicPartition) -> float:
+        """Seconds to wait before retrying the partition's failing batch"""
+        failures = self.attempts[partition][1]
+        return min(self.backoff * 2 ** (failures - 1), self.max_backoff)
@@ -1,30 +1,24 @@
-import json
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable
 
 from kafka import KafkaProducer
 
 from ..agent import Metric
+from ..agent.models import metric_rows
+from .serialization import JSON_FORMAT, format_headers, get_serializer
 
 
 class MetricsProducer:
     def __init__(self, config: Dict[str, Any]):
         self.producer = KafkaProducer(
             bootstrap_servers=config["kafka_servers"],
-            value_serializer=lambda v: json.dumps(v).encode("utf-8"),
             security_protocol="SSL" if config.get("use_ssl", True) else "PLAINTEXT",
         )
         self.topic = config["topic"]
+        # "json" sends one message per metric; "cp-metrics-v1" one per tag set
+        self.serializer = get_serializer(config.get("message_format", JSON_FORMAT))
+        self.headers = format_headers(self.serializer)
 
-    def send_metrics(self, metrics: List[Metric]):
-        for metric in metrics:
-            self.producer.send(
-                self.topic,
-                {
-                    "name": metric.name,
-                    "value": metric.value,
-                    "tags": metric.tags,
-                    "timestamp": metric.timestamp,
-                    "source": metric.source,
-                },
-            )
+    def send_metrics(self, metrics: Iterable[Metric]):
+        for message in self.serializer.encode(metric_rows(metrics)):
+            self.producer.send(self.topic, message, headers=self.headers)
         self.producer.flush()
@@ -0,0 +1,223 @@
+"""Message formats for metrics on Kafka topics.
+
+Producers name the format of each message in the ``content-format`` header
+and consumers pick the matching decoder, so formats can change without
+coordinating deploys. Messages without the header are JSON.
+
+The ``cp-metrics-v1`` format packs every metric sharing one tag set into a
+single message::
+
+    header    <4sBHI   magic, version, string count, point count
+    strings   <H+utf8  per string; names, sources, tag keys and tag values
+    tags      <H, then <HH per tag: key and value string ids
+    columns   <u2[n] name ids, <u2[n] source ids, <f8[n] timestamps,
+              <f8[n] values
+
+Serializers encode ``(name, value, tags, timestamp, source)`` rows, as
+yielded by ``metric_rows``; decoding yields the dicts the JSON format has
+always carried.
+"""
+
+import json
+import struct
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# (name, value, tags, timestamp, source)
+Row = Tuple[str, float, Dict[str, Any], float, Optional[str]]
+
+FORMAT_HEADER = "content-format"
+JSON_FORMAT = "json"
+BATCH_FORMAT = "cp-metrics-v1"
+
+BATCH_MAGIC = b"CPMB"
+BATCH_VERSION = 1
+BATCH_HEADER = struct.Struct("<4sBHI")
+STRING_LENGTH = struct.Struct("<H")
+TAG_PAIR = struct.Struct("<HH")
+NO_SOURCE = 0xFFFF
+
+
+class SerializationError(ValueError):
+    """Raised when a message cannot be decoded."""
+
+
+def encode_json(value: Any) -> bytes:
+    """JSON-encode a value; bytes are passed through already encoded."""
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return json.dumps(value).encode("utf-8")
+
+
+class JSONSerializer:
+    """One JSON document per message."""
+
+    format = JSON_FORMAT
+
+    def encode(self, rows: Iterable[Row]) -> List[bytes]:
+        """Encode metrics, one message each."""
+        return [
+            encode_json(
+                {
+                    "name": name,
+                    "value": value,
+                    "tags": tags,
+                    "timestamp": timestamp,
+                    "source": source,
+                }
+            )
+            for name, value, tags, timestamp, source in rows
+        ]
+
+    def decode(self, payload: bytes) -> List[Any]:
+        """Decode a message into a list of one value."""
+        try:
+            return [json.loads(payload)]
+        except ValueError as e:
+            raise SerializationError(f"invalid JSON message: {e}") from e
+
+
+class MetricBatchSerializer:
+    """Binary frames of metrics sharing a tag set."""
+
+    format = BATCH_FORMAT
+
+    def __init__(self, max_points: int = 10000):
+        """Initialize serializer; larger groups are split across frames."""
+        self.max_points = max_points
+
+    def encode(self, rows: Iterable[Row]) -> List[bytes]:
+        """Encode metrics, one message per distinct tag set."""
+        # Interned tag sets are the same object, so the key is built once each
+        keys: Dict[int, Tuple] = {}
+        groups: Dict[Tuple, List[Row]] = {}
+        for row in rows:
+            tags = row[2]
+            key = keys.get(id(tags))
+            if key is None:
+                key = keys[id(tags)] = tuple(
+                    sorted((str(k), str(v)) for k, v in (tags or {}).items())
+                )
+            groups.setdefault(key, []).append(row)
+        return [
+            self.encode_group(dict(key), group[start : start + self.max_points])
+            for key, group in groups.items()
+            for start in range(0, len(group), self.max_points)
+        ]
+
+    def encode_group(self, tags: Dict[str, str], rows: List[Row]) -> bytes:
+        """Encode metrics that all carry ``tags`` as one frame."""
+        strings: Dict[str, int] = {}
+
+        def string_id(value: str) -> int:
+            sid = strings.get(value)
+            if sid is None:
+                sid = strings[value] = len(strings)
+                if sid >= NO_SOURCE:
+                    raise SerializationError("too many distinct strings in a frame")
+            return sid
+
+        tag_pairs = [(string_id(str(k)), string_id(str(v))) for k, v in tags.items()]
+        count = len(rows)
+        name_ids = np.array([string_id(row[0]) for row in rows], dtype="<u2")
+        source_ids = np.array(
+            [NO_SOURCE if row[4] is None else string_id(row[4]) for row in rows],
+            dtype="<u2",
+        )
+        timestamps = np.array([row[3] for row in rows], dtype="<f8")
+        values = np.array([row[1] for row in rows], dtype="<f8")
+
+        parts = [BATCH_HEADER.pack(BATCH_MAGIC, BATCH_VERSION, len(strings), count)]
+        for value in strings:
+            data = value.encode("utf-8")
+            parts.append(STRING_LENGTH.pack(len(data)) + data)
+        parts.append(STRING_LENGTH.pack(len(tag_pairs)))
+        parts.extend(TAG_PAIR.pack(*pair) for pair in tag_pairs)
+        parts.extend(
+            column.tobytes() for column in (name_ids, source_ids, timestamps, values)
+        )
+        return b"".join(parts)
+
+    def decode(self, payload: bytes) -> List[Dict[str, Any]]:
+        """Decode a frame back into metric dicts."""
+        try:
+            magic, version, string_count, count = BATCH_HEADER.unpack_from(payload)
+            if magic != BATCH_MAGIC or version != BATCH_VERSION:
+                raise SerializationError(
+                    f"not a {BATCH_FORMAT} frame (magic {magic!r}, version {version})"
+                )
+            offset = BATCH_HEADER.size
+
+            strings = []
+            for _ in range(string_count):
+                (length,) = STRING_LENGTH.unpack_from(payload, offset)
+                offset += STRING_LENGTH.size
+                strings.append(payload[offset : offset + length].decode("utf-8"))
+                offset += length
+
+            (tag_count,) = STRING_LENGTH.unpack_from(payload, offset)
+            offset += STRING_LENGTH.size
+            tags = {}
+            for _ in range(tag_count):
+                key, value = TAG_PAIR.unpack_from(payload, offset)
+                offset += TAG_PAIR.size
+                tags[strings[key]] = strings[value]
+
+            columns = []
+            for dtype in ("<u2", "<u2", "<f8", "<f8"):
+                column = np.frombuffer(payload, dtype=dtype, count=count, offset=offset)
+                offset += column.nbytes
+                columns.append(column.tolist())
+        except SerializationError:
+            raise
+        except (struct.error, ValueError, IndexError) as e:
+            raise SerializationError(f"corrupt {BATCH_FORMAT} frame: {e}") from e
+
+        name_ids, source_ids, timestamps, values = columns
+        return [
+            {
+                "name": strings[name_id],
+                "value": value,
+                # Each dict gets its own copy, as with JSON
+                "tags": dict(tags),
+                "timestamp": timestamp,
+                "source": None if source_id == NO_SOURCE else strings[source_id],
+            }
+            for name_id, source_id, timestamp, value in zip(
+                name_ids, source_ids, timestamps, values
+            )
+        ]
+
+
+SERIALIZERS = {
+    JSON_FORMAT: JSONSerializer(),
+    BATCH_FORMAT: MetricBatchSerializer(),
+}
+
+
+def get_serializer(name: str):
+    """Return the serializer for a format name."""
+    try:
+        return SERIALIZERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown message format: {name}") from None
+
+
+def format_headers(serializer) -> List[Tuple[str, bytes]]:
+    """Kafka headers announcing the serializer's format."""
+    return [(FORMAT_HEADER, serializer.format.encode("ascii"))]
+
+
+def decode_message(
+    payload: bytes, headers: Optional[Iterable[Tuple[str, bytes]]] = None
+) -> List[Any]:
+    """Decode a message with the format named in its headers."""
+    fmt = JSON_FORMAT
+    for key, value in headers or ():
+        if key == FORMAT_HEADER:
+            fmt = value.decode("ascii")
+            break
+    if fmt not in SERIALIZERS:
+        raise SerializationError(f"Unknown message format: {fmt}")
+    return SERIALIZERS[fmt].decode(payload)
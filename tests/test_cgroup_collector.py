@@ -0,0 +1,165 @@
+"""Test the cgroup v2 container collector."""
+
+import queue
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.agent.collectors.cgroup import CgroupCollector
+
+NET_DEV = (
+    "Inter-|   Receive                            |  Transmit\n"
+    " face |bytes    packets errs drop fifo frame compressed multicast|bytes\n"
+    "    lo: 10 1 0 0 0 0 0 0 10 1 0 0 0 0 0 0\n"
+    "  eth0: 1500 10 0 0 0 0 0 0 2500 20 0 0 0 0 0 0\n"
+)
+
+
+class FakeEvents:
+    """Blocking Docker event stream fed from a queue."""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+
+    def __iter__(self):
+        while True:
+            event = self.queue.get()
+            if event is None:
+                return
+            yield event
+
+    def close(self):
+        self.queue.put(None)
+
+
+def _write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def _add_container(root, index, usage_usec=1000):
+    """Create cgroup and proc files for a container; return its mock."""
+    container_id = f"{index:064x}"
+    pid = 100 + index
+    cgroup = root / "cgroup" / "system.slice" / f"docker-{container_id}.scope"
+    _write(cgroup / "cpu.stat", f"usage_usec {usage_usec}\nthrottled_usec 7\n")
+    _write(cgroup / "memory.current", "262144\n")
+    _write(cgroup / "memory.max", "1048576\n")
+    _write(cgroup / "io.stat", "8:0 rbytes=100 wbytes=200 rios=1 wios=2 dbytes=0\n")
+    _write(
+        cgroup / "cpu.pressure",
+        "some avg10=1.50 avg60=0.00 avg300=0.00 total=10\n"
+        "full avg10=0.25 avg60=0.00 avg300=0.00 total=5\n",
+    )
+    _write(
+        root / "proc" / str(pid) / "cgroup",
+        f"0::/system.slice/docker-{container_id}.scope\n",
+    )
+    _write(root / "proc" / str(pid) / "net" / "dev", NET_DEV)
+
+    container = MagicMock()
+    container.id = container_id
+    container.name = f"app-{index}"
+    container.attrs = {"State": {"Pid": pid}, "Config": {"Image": "app"}}
+    container.image.tags = ["app:latest", "app:1.0"]
+    return container, cgroup
+
+
+@pytest.fixture
+def host(tmp_path):
+    """Fake cgroup and proc trees with two containers."""
+    _write(tmp_path / "proc" / "meminfo", "MemTotal: 4096 kB\n")
+    return tmp_path, [_add_container(tmp_path, i) for i in range(2)]
+
+
+@pytest.fixture
+def collector(host):
+    """Collector reading the fake trees, with a mocked Docker client."""
+    root, containers = host
+    events = FakeEvents()
+    config = {
+        "collectors": {
+            "docker": {
+                "cgroup_root": str(root / "cgroup"),
+                "proc_root": str(root / "proc"),
+            }
+        }
+    }
+    with patch("docker.from_env") as from_env:
+        client = from_env.return_value
+        client.containers.list.return_value = [c for c, _ in containers]
+        client.events.return_value = events
+        collector = CgroupCollector(config)
+        collector.events = events
+        yield collector
+        collector.close()
+
+
+def _values(metrics, container_name):
+    return {
+        (m.name, m.tags.get("interface")): m.value
+        for m in metrics
+        if m.tags["container_name"] == container_name
+    }
+
+
+def test_collect_reads_cgroup_files(collector):
+    """Test metrics use the Docker collector's names and tags."""
+    values = _values(collector.collect(), "app-0")
+
+    assert values[("docker.memory.usage_bytes", None)] == 262144
+    assert values[("docker.memory.usage_percent", None)] == pytest.approx(25.0)
+    assert values[("docker.io.read_bytes", None)] == 100
+    assert values[("docker.io.write_ops", None)] == 2
+    assert values[("docker.pressure.cpu.some_avg10", None)] == 1.5
+    assert values[("docker.pressure.cpu.full_avg10", None)] == 0.25
+    assert values[("docker.network.rx_bytes", "eth0")] == 1500
+    assert values[("docker.network.tx_bytes", "eth0")] == 2500
+    assert ("docker.network.rx_bytes", "lo") not in values
+    # CPU usage needs a previous reading
+    assert ("docker.cpu.usage_percent", None) not in values
+
+
+def test_image_tag_matches_docker_collector(collector):
+    """Test the image tag is the image's first tag, as DockerCollector uses."""
+    metrics = collector.collect()
+
+    assert {m.tags["image"] for m in metrics} == {"app:latest"}
+
+
+def test_cpu_percent_from_usage_delta(collector, host):
+    """Test CPU usage is the usage delta over elapsed time on all CPUs."""
+    _, containers = host
+    collector.cpu_count = 1
+    collector.collect()
+    cgroup = containers[0][1]
+    time.sleep(0.1)
+    (cgroup / "cpu.stat").write_text("usage_usec 51000\nthrottled_usec 7\n")
+
+    values = _values(collector.collect(), "app-0")
+
+    # 50ms of CPU in a bit over 100ms
+    assert 30.0 < values[("docker.cpu.usage_percent", None)] <= 50.0
+
+
+def test_container_list_refreshed_on_events(collector, host):
+    """Test containers are listed once until a container event arrives."""
+    root, containers = host
+    client = collector.docker_client
+    collector.collect()
+    collector.collect()
+    assert client.containers.list.call_count == 1
+
+    new_container, _ = _add_container(root, 2)
+    client.containers.list.return_value = [c for c, _ in containers] + [new_container]
+    collector.events.queue.put({"Type": "container", "Action": "start"})
+    for _ in range(50):
+        if collector._stale.is_set():
+            break
+        time.sleep(0.01)
+
+    metrics = collector.collect()
+
+    assert client.containers.list.call_count == 2
+    assert {m.tags["container_name"] for m in metrics} == {"app-0", "app-1", "app-2"}
@@ -0,0 +1,47 @@
+"""Test background CPU sampler."""
+
+import time
+
+import pytest
+
+from src.agent.cpu_sampler import CPUSampler
+
+
+@pytest.fixture
+def sampler():
+    """Running sampler with a fine resolution."""
+    sampler = CPUSampler(resolution=0.02, history=1.0).start()
+    time.sleep(0.15)
+    yield sampler
+    sampler.stop()
+
+
+def test_percent_does_not_block(sampler):
+    """Test reads return immediately with sane values."""
+    started = time.monotonic()
+    total = sampler.percent()
+    per_core = sampler.percent(percpu=True)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.05
+    assert 0.0 <= total <= 100.0
+    assert all(0.0 <= p <= 100.0 for p in per_core)
+
+
+def test_percentiles_and_history(sampler):
+    """Test sub-second percentiles are computed from the ring."""
+    percentiles = sampler.percentiles(window=1.0)
+    assert set(percentiles) == {"p50", "p95", "p99"}
+    assert percentiles["p50"] <= percentiles["p95"] <= percentiles["p99"]
+
+    history = sampler.history(window=1.0)
+    timestamps = [t for t, _ in history]
+    assert len(history) >= 3
+    assert timestamps == sorted(timestamps)
+
+
+def test_ring_wraps(sampler):
+    """Test the ring keeps only the configured history."""
+    for _ in range(sampler.size * 2):
+        sampler.sample()
+    assert len(sampler.history(window=100.0)) == sampler.size
@@ -0,0 +1,146 @@
+"""Test the streaming detector."""
+
+import numpy as np
+import pytest
+
+from src.streaming.detector import StreamingDetector
+
+T0 = 1700000000.0
+
+
+def feed(detector, resource_id, metric, values, start=T0, step=10.0):
+    """Feed one point per call, returning all events."""
+    events = []
+    for i, value in enumerate(values):
+        events += detector.update([resource_id], [metric], [value], [start + i * step])
+    return events
+
+
+def test_sustained_high_utilization_scales_up_once():
+    """Test one scale_up after the EWMA stays above the high threshold."""
+    detector = StreamingDetector(alpha=0.5, sustain=3)
+    feed(detector, "i-1", "cpu_utilization", [50.0] * 10)
+
+    events = feed(detector, "i-1", "cpu_utilization", [95.0] * 10)
+
+    assert [e["type"] for e in events] == ["scale_up"]
+    assert events[0]["resource_id"] == "i-1"
+    assert events[0]["ewma"] > 80
+    assert detector.series_state("i-1", "cpu_utilization")["state"] == "high"
+
+    # Back inside the band by the hysteresis margin, then high again
+    feed(detector, "i-1", "cpu_utilization", [50.0] * 10)
+    assert detector.series_state("i-1", "cpu_utilization")["state"] == "normal"
+    # The jump itself is far outside the settled spread
+    events = feed(detector, "i-1", "cpu_utilization", [95.0] * 10)
+    assert [e["type"] for e in events] == ["anomaly", "scale_up"]
+
+
+def test_idle_series_scales_down_on_upper_quantile():
+    """Test scale_down needs even the upper quantile below the low threshold."""
+    detector = StreamingDetector(sustain=5, quantile_rate=0.5)
+    rng = np.random.default_rng(1)
+
+    events = feed(detector, "i-1", "cpu_utilization", rng.uniform(2, 8, 200))
+
+    assert [e["type"] for e in events] == ["scale_down"]
+    assert events[0]["quantiles"]["p95"] < 20
+    # Metrics without thresholds never scale
+    assert feed(detector, "i-1", "disk.free", rng.uniform(2, 8, 200)) == []
+
+
+def test_spike_after_warmup_is_an_anomaly_with_cooldown():
+    """Test a large deviation is reported once per cooldown period."""
+    detector = StreamingDetector(warmup=20, anomaly_cooldown=60)
+    rng = np.random.default_rng(2)
+    feed(detector, "i-1", "latency", 100 + rng.normal(0, 1, 50))
+
+    events = feed(detector, "i-1", "latency", [200.0, 200.0], start=T0 + 1000)
+
+    assert [e["type"] for e in events] == ["anomaly"]
+    assert events[0]["zscore"] > 4
+    events = feed(detector, "i-1", "latency", [1000.0], start=T0 + 1070)
+    assert [e["type"] for e in events] == ["anomaly"]
+
+
+@pytest.mark.parametrize("series,hot_share", [(3, 0.0), (40, 0.5)])
+def test_batches_match_point_by_point_updates(series, hot_share):
+    """Test batched updates apply each series' points in order.
+
+    With many series the first rounds are vectorised, and the tail of the
+    hot series is applied point by point.
+    """
+    rng = np.random.default_rng(3)
+    names = [f"r{i}" for i in range(series)]
+    weights = np.full(series, (1 - hot_share) / series)
+    weights[0] += hot_share
+    resources = rng.choice(names, 2000, p=weights)
+    values = rng.uniform(0, 100, 2000)
+    timestamps = T0 + np.arange(2000)
+    batched = StreamingDetector(warmup=5)
+    single = StreamingDetector(warmup=5)
+
+    batch_events = batched.update(
+        resources, ["cpu_utilization"] * 2000, values, timestamps
+    )
+    single_events = []
+    for resource_id, value, timestamp in zip(resources, values, timestamps):
+        single_events += single.update(
+            [resource_id], ["cpu_utilization"], [value], [timestamp]
+        )
+
+    for resource_id in names:
+        expected = single.series_state(resource_id, "cpu_utilization")
+        actual = batched.series_state(resource_id, "cpu_utilization")
+        assert actual.pop("quantiles") == pytest.approx(expected.pop("quantiles"))
+        assert actual == pytest.approx(expected)
+    key = lambda e: (e["resource_id"], e["timestamp"], e["type"])  # noqa: E731
+    assert sorted(map(key, batch_events)) == sorted(map(key, single_events))
+    assert batch_events
+
+
+def test_records_are_read_from_topic_messages():
+    """Test topic records map to series by resource tag."""
+    detector = StreamingDetector()
+    records = [
+        {"name": "cpu_utilization", "value": 10.0, "tags": {"host": "web-1"}},
+        {"name": "cpu_utilization", "value": 10.0, "tags": {"resource_id": "i-9"}},
+        {"name": "cpu_utilization", "value": "n/a", "tags": {"host": "web-1"}},
+        {"name": "cpu_utilization", "value": 10.0, "tags": {}},
+    ]
+
+    detector.process_records(records)
+
+    assert detector.get_stats()["points"] == 2
+    assert detector.get_stats()["series"] == 2
+    assert detector.series_state("web-1", "cpu_utilization")["count"] == 1
+
+
+def test_run_publishes_events_per_batch():
+    """Test the Kafka loop sends each batch's events to the events topic."""
+
+    class FakeManager:
+        def __init__(self):
+            self.sent = []
+
+        def consume_batches(self, topic, handler, **options):
+            assert options["workers"] == 1
+            for _ in range(10):
+                handler(
+                    [
+                        {
+                            "name": "cpu_utilization",
+                            "value": 99.0,
+                            "tags": {"resource_id": "i-1"},
+                            "timestamp": T0,
+                        }
+                    ]
+                )
+
+        def send_batch(self, topic, messages):
+            self.sent.append((topic, [m["type"] for m in messages]))
+
+    manager = FakeManager()
+    StreamingDetector(sustain=3, alpha=1.0).run(manager, workers=4)
+
+    assert manager.sent == [("cloud-pioneer-events", ["scale_up"])]
@@ -0,0 +1,75 @@
+"""Test Docker container stats collection."""
+
+import time
+from unittest.mock import MagicMock, PropertyMock, patch
+
+import pytest
+
+from src.agent.collectors.docker import DockerCollector
+
+
+def _stats(usage):
+    return {
+        "cpu_stats": {"cpu_usage": {"total_usage": 200}, "system_cpu_usage": 2000},
+        "precpu_stats": {"cpu_usage": {"total_usage": 100}, "system_cpu_usage": 1000},
+        "memory_stats": {"usage": usage, "limit": 1000},
+        "networks": {"eth0": {"rx_bytes": 1, "tx_bytes": 2}},
+    }
+
+
+def _container(i, delay=0.0):
+    container = MagicMock()
+    container.id = f"id-{i}"
+    container.name = f"app-{i}"
+    container.stats.side_effect = lambda stream=False: (
+        time.sleep(delay) or _stats(100 * i)
+    )
+    image = PropertyMock(return_value=MagicMock(tags=[f"app:{i}"]))
+    type(container).image = image
+    return container, image
+
+
+@pytest.fixture
+def containers():
+    """Twenty containers whose stats take 0.2s each."""
+    return [_container(i, delay=0.2) for i in range(20)]
+
+
+@pytest.fixture
+def collector(containers):
+    """Collector with a mocked Docker client."""
+    config = {"collectors": {"docker": {"stats_workers": 20}}}
+    with patch("docker.from_env") as from_env:
+        from_env.return_value.containers.list.return_value = [c for c, _ in containers]
+        collector = DockerCollector(config)
+        yield collector
+        collector.close()
+
+
+def test_stats_fetched_concurrently(collector):
+    """Test a cycle takes about one stats call, not one per container."""
+    started = time.monotonic()
+    metrics = collector.collect()
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 1.0
+    memory = {
+        m.tags["container_name"]: m.value
+        for m in metrics
+        if m.name == "docker.memory.usage_bytes"
+    }
+    assert len(memory) == 20
+    assert memory["app-3"] == 300
+    cpu = next(m for m in metrics if m.name == "docker.cpu.usage_percent")
+    assert cpu.value == pytest.approx(10.0)
+
+
+def test_image_tags_cached(collector, containers):
+    """Test the image is resolved once per container across cycles."""
+    collector.collect()
+    metrics = collector.collect()
+
+    assert all(image.call_count == 1 for _, image in containers)
+    assert {
+        m.tags["image"] for m in metrics if m.tags["container_name"] == "app-1"
+    } == {"app:1"}
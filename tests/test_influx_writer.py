@@ -0,0 +1,169 @@
+"""Test the batching InfluxDB writer."""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.agent.backends.line_protocol import format_lines
+from src.server.influx_writer import BatchingWriter, BufferFullError
+
+
+class FakeWrite:
+    """Records written bodies; optionally blocks, or fails as listed per call."""
+
+    def __init__(self, failures=()):
+        self.bodies = []
+        self.failures = list(failures)
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, body):
+        self.release.wait(5)
+        error = self.failures.pop(0) if self.failures else None
+        if error is not None:
+            raise error
+        self.bodies.append(body)
+
+
+class ApiError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+def lines(count, start=0):
+    return [f"cpu value={i}.0 {i}" for i in range(start, start + count)]
+
+
+def test_format_lines_escapes_and_adds_tags():
+    """Test rows become line protocol with the extra tags merged in."""
+    rows = [("disk used", 1.5, {"path": "/a b", "host": "x,y"}, 2.0, "system")]
+
+    assert list(format_lines(rows, {"agent_id": "a1"})) == [
+        r"disk\ used,agent_id=a1,host=x\,y,path=/a\ b value=1.5 2000000000"
+    ]
+
+
+def test_format_lines_keeps_int_fields_and_skips_non_finite_values():
+    """Test int values stay integer fields and NaN or inf rows are dropped."""
+    rows = [
+        ("system.memory.used", 1024, {}, 1.0, None),
+        ("system.memory.utilization", 50.0, {}, 1.0, None),
+        ("system.cpu.utilization", float("nan"), {}, 1.0, None),
+        ("system.cpu.utilization", float("inf"), {}, 1.0, None),
+    ]
+
+    assert list(format_lines(rows)) == [
+        "system.memory.used value=1024i 1000000000",
+        "system.memory.utilization value=50.0 1000000000",
+    ]
+
+
+def test_writer_built_outside_the_loop_keeps_flushing():
+    """Test a writer made before the server's loop, as at import, works on it."""
+    write = FakeWrite()
+    writer = BatchingWriter(write, batch_size=10, flush_interval=0.01)
+
+    async def serve(start):
+        for batch in range(2):
+            await writer.submit(lines(10, start + 10 * batch))
+            await asyncio.sleep(0.05)
+        await writer.close()
+
+    # A later loop, such as a restarted server's, gets its own primitives
+    for start in (0, 20):
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(serve(start))
+        finally:
+            loop.close()
+
+    assert len(write.bodies) == 4
+    assert writer.get_stats()["points_written"] == 40
+
+
+@pytest.mark.asyncio
+async def test_full_batches_are_written_without_waiting_for_interval():
+    """Test size triggers a flush and the remainder goes on close."""
+    write = FakeWrite()
+    writer = BatchingWriter(write, batch_size=100, flush_interval=60)
+
+    await writer.submit(lines(250))
+    await asyncio.sleep(0.1)
+    assert [body.count("\n") + 1 for body in write.bodies] == [100, 100]
+
+    await writer.close()
+    assert write.bodies[-1].splitlines() == lines(50, 200)
+    stats = writer.get_stats()
+    assert stats["points_written"] == 250
+    assert stats["batches_written"] == 3
+    assert stats["buffered"] == 0
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_flushed_after_interval():
+    """Test points below batch_size are written after flush_interval."""
+    write = FakeWrite()
+    writer = BatchingWriter(write, batch_size=100, flush_interval=0.05)
+
+    await writer.submit(lines(3))
+    await asyncio.sleep(0.2)
+
+    assert write.bodies == ["\n".join(lines(3))]
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_server_errors_are_retried_and_client_errors_dropped():
+    """Test 5xx writes are retried and 4xx batches are given up on."""
+    write = FakeWrite([ApiError(503), None, ApiError(400)])
+    writer = BatchingWriter(write, batch_size=2, flush_interval=60, retry_interval=0)
+
+    await writer.submit(lines(2))
+    await writer.submit(lines(2, 2))
+    await writer.close()
+
+    # The first batch succeeds on retry; the second is rejected by the server
+    assert write.bodies == ["\n".join(lines(2))]
+    stats = writer.get_stats()
+    assert stats["points_written"] == 2
+    assert stats["points_failed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_reject_policy_raises_when_buffer_full():
+    """Test submits fail at once when the buffer has no room."""
+    write = FakeWrite()
+    write.release.clear()
+    writer = BatchingWriter(
+        write, batch_size=10, flush_interval=60, max_buffer=20, overflow="reject"
+    )
+
+    await writer.submit(lines(10))
+    await asyncio.sleep(0.05)  # the first batch is now being written
+    await writer.submit(lines(20))
+    with pytest.raises(BufferFullError):
+        await writer.submit(lines(1))
+    assert writer.get_stats()["points_rejected"] == 1
+    assert writer.get_stats()["buffer_utilization"] == 1.0
+
+    write.release.set()
+    await writer.close()
+    assert writer.get_stats()["points_written"] == 30
+
+
+@pytest.mark.asyncio
+async def test_block_policy_waits_for_room():
+    """Test submits wait while the buffer drains."""
+    write = FakeWrite()
+    writer = BatchingWriter(
+        write, batch_size=10, flush_interval=60, max_buffer=10, block_timeout=5
+    )
+
+    await writer.submit(lines(10))
+    await writer.submit(lines(10, 10))
+    await writer.close()
+
+    assert "\n".join(write.bodies).splitlines() == lines(20)
+    assert writer.get_stats()["points_rejected"] == 0
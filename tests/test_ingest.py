@@ -0,0 +1,98 @@
+"""Test bulk metrics ingestion."""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.ingest import decode_records, validate_records
+from src.main import app, get_predictor
+from src.ml.predictor import ResourcePredictor
+
+
+@pytest.fixture
+def records():
+    """Bulk records covering two resources with two bad entries."""
+    start = datetime.now(timezone.utc) - timedelta(hours=1)
+    good = [
+        {
+            "resource_id": f"test-instance-{i % 2}",
+            "timestamp": (start + timedelta(minutes=i)).isoformat(),
+            "metrics": {"cpu_utilization": float(i), "memory_utilization": 60.0},
+        }
+        for i in range(6)
+    ]
+    bad_timestamp = {
+        "resource_id": "test-instance-0",
+        "timestamp": "not-a-time",
+        "metrics": {"cpu_utilization": 1.0},
+    }
+    bad_value = {
+        "resource_id": "test-instance-1",
+        "timestamp": start.isoformat(),
+        "metrics": {"cpu_utilization": "high"},
+    }
+    return good[:3] + [bad_timestamp] + good[3:] + [bad_value]
+
+
+@pytest.fixture
+def bulk_client():
+    """Test client backed by a fresh in-memory predictor."""
+    predictor = ResourcePredictor()
+    app.dependency_overrides[get_predictor] = lambda: predictor
+    with TestClient(app) as client:
+        yield client, predictor
+    app.dependency_overrides.clear()
+
+
+def test_validate_records_groups_by_resource(records):
+    """Test accepted records are pivoted per resource."""
+    batch = validate_records(records)
+
+    assert batch.accepted == 6
+    assert [r["index"] for r in batch.rejected] == [3, 7]
+    blocks = {resource_id: columns for resource_id, _, columns in batch}
+    assert list(blocks["test-instance-0"]["cpu_utilization"]) == [0.0, 2.0, 4.0]
+    assert list(blocks["test-instance-1"]["cpu_utilization"]) == [1.0, 3.0, 5.0]
+
+
+def test_decode_ndjson_keeps_line_indices():
+    """Test a malformed line is rejected without shifting indices."""
+    body = b'{"resource_id": "a"}\n{broken\n\n{"resource_id": "b"}\n'
+    records = decode_records(body, "application/x-ndjson")
+
+    assert len(records) == 3
+    assert validate_records(records).rejected[1]["index"] == 1
+
+
+def test_bulk_endpoint_ndjson(bulk_client, records):
+    """Test NDJSON bulk submission writes accepted records."""
+    client, predictor = bulk_client
+    body = "\n".join(json.dumps(r) for r in records)
+
+    response = client.post(
+        "/api/v1/metrics/bulk",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    data = response.json()
+    assert response.status_code == 200
+    assert data["accepted"] == 6
+    assert [r["index"] for r in data["rejected"]] == [3, 7]
+
+    end = datetime.now(timezone.utc)
+    stored = predictor.get_historical_metrics(
+        "test-instance-0", (end - timedelta(hours=2)).isoformat(), end.isoformat()
+    )
+    assert [m["metrics"]["cpu_utilization"] for m in stored] == [0.0, 2.0, 4.0]
+
+
+def test_bulk_endpoint_unsupported_content_type(bulk_client):
+    """Test unknown body formats are refused."""
+    client, _ = bulk_client
+    response = client.post(
+        "/api/v1/metrics/bulk", content=b"x", headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 415
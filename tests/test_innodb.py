@@ -0,0 +1,73 @@
+"""Test parsing of SHOW ENGINE INNODB STATUS output."""
+
+import pytest
+
+from src.agent.collectors.innodb import parse_innodb_status
+
+STATUS = """
+=====================================
+2024-01-15 10:00:00 0x7f INNODB MONITOR OUTPUT
+=====================================
+------------
+TRANSACTIONS
+------------
+Trx id counter 123456
+Purge done for trx's n:o < 123400 undo n:o < 0 state: running but idle
+History list length 42
+---TRANSACTION 123455, ACTIVE 3 sec starting index read
+mysql tables in use 1, locked 1
+LOCK WAIT 2 lock struct(s), heap size 1136, 1 row lock(s)
+---
+LOG
+---
+Log sequence number          5000000
+Log buffer assigned up to    5000000
+Last checkpoint at           4200000
+----------------------
+BUFFER POOL AND MEMORY
+----------------------
+Total large memory allocated 137363456
+Buffer pool size   8192
+Free buffers       1024
+Database pages     7000
+Modified db pages  150
+Pending reads      3
+Buffer pool hit rate 995 / 1000, young-making rate 0 / 1000 not 0 / 1000
+----------------------
+INDIVIDUAL BUFFER POOL INFO
+----------------------
+---BUFFER POOL 0
+Free buffers       512
+Database pages     3500
+Buffer pool hit rate 990 / 1000, young-making rate 0 / 1000 not 0 / 1000
+--------------
+ROW OPERATIONS
+--------------
+Number of rows inserted 100, updated 20, deleted 3, read 50000
+0.00 inserts/s, 0.00 updates/s, 0.00 deletes/s, 0.00 reads/s
+"""
+
+
+def test_parse_innodb_status():
+    """Test values are taken from the aggregate sections."""
+    metrics = parse_innodb_status(STATUS)
+
+    assert metrics["mysql.innodb.history_list_length"] == 42
+    assert metrics["mysql.innodb.buffer_pool.hit_ratio"] == pytest.approx(0.995)
+    assert metrics["mysql.innodb.buffer_pool.pages_total"] == 7000
+    assert metrics["mysql.innodb.buffer_pool.pages_free"] == 1024
+    assert metrics["mysql.innodb.buffer_pool.pages_dirty"] == 150
+    assert metrics["mysql.innodb.pending_reads"] == 3
+    assert metrics["mysql.innodb.rows.inserted"] == 100
+    assert metrics["mysql.innodb.rows.read"] == 50000
+    assert metrics["mysql.innodb.lock_wait_transactions"] == 1
+    assert metrics["mysql.innodb.checkpoint_age"] == 800000
+
+
+def test_parse_innodb_status_without_page_gets():
+    """Test the hit ratio is left out when there were no page requests."""
+    status = STATUS.replace(
+        "Buffer pool hit rate 995 / 1000", "No buffer pool page gets since"
+    ).replace("Buffer pool hit rate 990 / 1000", "No buffer pool page gets since")
+
+    assert "mysql.innodb.buffer_pool.hit_ratio" not in parse_innodb_status(status)
@@ -0,0 +1,299 @@
+"""Test KafkaManager producer modes."""
+
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from kafka.structs import TopicPartition
+
+from src.agent.models import Metric
+from src.streaming.kafka_manager import KafkaManager
+
+
+class FakeFuture:
+    """Future resolved by the test, with kafka-python's callback interface."""
+
+    def __init__(self):
+        self.callbacks = []
+        self.errbacks = []
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+        return self
+
+    def add_errback(self, errback):
+        self.errbacks.append(errback)
+        return self
+
+    def get(self, timeout=None):
+        return None
+
+    def succeed(self):
+        for callback in self.callbacks:
+            callback(None)
+
+    def fail(self, error):
+        for errback in self.errbacks:
+            errback(error)
+
+
+class FakeProducer:
+    """Producer that records sends and flushes."""
+
+    def __init__(self):
+        self.futures = []
+        self.sent = []
+        self.flushes = 0
+
+    def send(self, topic, value=None, headers=None):
+        future = FakeFuture()
+        self.futures.append(future)
+        self.sent.append((value, headers))
+        return future
+
+    def flush(self, timeout=None):
+        self.flushes += 1
+
+
+class FakeConsumer:
+    """Consumer returning queued polls, then setting the stop event."""
+
+    def __init__(self, polls, stop):
+        self.polls = list(polls)
+        self.stop = stop
+        self.commits = []
+        self.seeks = []
+        self.paused = set()
+        self.highwaters = {}
+
+    def poll(self, timeout_ms=0, max_records=None):
+        if not self.polls:
+            self.stop.set()
+            return {}
+        return self.polls.pop(0)
+
+    def commit(self, offsets=None):
+        self.commits.append({tp: meta.offset for tp, meta in offsets.items()})
+
+    def seek(self, partition, offset):
+        self.seeks.append((partition, offset))
+
+    def pause(self, *partitions):
+        self.paused.update(partitions)
+
+    def resume(self, *partitions):
+        self.paused.difference_update(partitions)
+
+    def assignment(self):
+        return set(self.highwaters) | {tp for poll in self.polls for tp in poll}
+
+    def highwater(self, partition):
+        return self.highwaters.get(partition)
+
+    def committed(self, partition):
+        return 40
+
+    def position(self, partition):
+        return 45
+
+    def close(self):
+        pass
+
+
+def records(partition, start, count):
+    return [
+        SimpleNamespace(
+            topic=partition.topic,
+            partition=partition.partition,
+            offset=offset,
+            value=f'{{"offset": {offset}}}'.encode(),
+            headers=[],
+        )
+        for offset in range(start, start + count)
+    ]
+
+
+def make_manager(**kwargs):
+    producer = FakeProducer()
+    with patch.object(KafkaManager, "_create_producer", return_value=producer):
+        return KafkaManager("localhost:9092", "test", **kwargs), producer
+
+
+def test_reliable_mode_flushes_every_message():
+    """Test the default mode waits for each message."""
+    manager, producer = make_manager()
+
+    assert manager.send_message("metrics", {"value": 1})
+    assert manager.send_message("metrics", {"value": 2})
+
+    assert producer.flushes == 2
+    assert manager.get_delivery_stats()["delivered"] == 2
+
+
+def test_throughput_mode_reports_delivery_through_callbacks():
+    """Test sends return at once and outcomes are counted on delivery."""
+    manager, producer = make_manager(mode="throughput")
+
+    assert manager.send_batch("metrics", [{"value": i} for i in range(3)]) == 3
+    assert producer.flushes == 1
+    assert manager.get_delivery_stats()["in_flight"] == 3
+
+    producer.futures[0].succeed()
+    producer.futures[1].succeed()
+    producer.futures[2].fail(RuntimeError("leader not available"))
+
+    stats = manager.get_delivery_stats()
+    assert stats["sent"] == 3
+    assert stats["delivered"] == 2
+    assert stats["failed"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["last_error"] == "leader not available"
+
+
+def test_throughput_mode_bounds_in_flight_messages():
+    """Test a full window blocks sends until a delivery completes."""
+    manager, producer = make_manager(
+        mode="throughput", max_in_flight=2, send_timeout=0.05
+    )
+    assert manager.send_message("metrics", {"value": 1})
+    assert manager.send_message("metrics", {"value": 2})
+
+    # Times out while both are in flight
+    assert not manager.send_message("metrics", {"value": 3})
+    assert manager.get_delivery_stats()["failed"] == 1
+
+    manager.send_timeout = 5
+    threading.Timer(0.05, producer.futures[0].succeed).start()
+    assert manager.send_message("metrics", {"value": 4})
+    assert manager.get_delivery_stats()["in_flight"] == 2
+
+
+def test_metrics_sent_in_binary_format_are_consumed_as_dicts():
+    """Test the consumer decodes by header and still reads plain JSON."""
+    manager, producer = make_manager(message_format="cp-metrics-v1")
+    metrics = [
+        Metric("system.cpu.utilization", 12.5, {"host": "web-1"}, 1700000000.0),
+        Metric("system.memory.used", 1024.0, {"host": "web-1"}, 1700000000.0),
+    ]
+
+    assert manager.send_metrics("metrics", metrics) == 1
+    value, headers = producer.sent[0]
+    records = [
+        SimpleNamespace(value=value, headers=headers),
+        SimpleNamespace(value=b'{"name": "legacy", "value": 1.0}', headers=[]),
+    ]
+    manager.consumers["metrics"] = records
+    received = []
+    manager.consume_messages("metrics", received.append)
+
+    assert [m["name"] for m in received] == [
+        "system.cpu.utilization",
+        "system.memory.used",
+        "legacy",
+    ]
+    assert received[0]["tags"] == {"host": "web-1"}
+    assert received[1]["value"] == 1024.0
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_batches_are_handled_per_partition_and_committed(workers):
+    """Test each partition's batch is handled in order, then committed."""
+    manager, _ = make_manager()
+    p0, p1 = TopicPartition("metrics", 0), TopicPartition("metrics", 1)
+    stop = threading.Event()
+    consumer = FakeConsumer(
+        [{p0: records(p0, 0, 3), p1: records(p1, 10, 2)}, {p0: records(p0, 3, 2)}],
+        stop,
+    )
+    manager.consumers["metrics"] = consumer
+    handled = []
+
+    manager.consume_batches(
+        "metrics",
+        lambda batch: handled.append([m["offset"] for m in batch]),
+        workers=workers,
+        stop=stop,
+    )
+
+    assert sorted(handled) == [[0, 1, 2], [3, 4], [10, 11]]
+    assert consumer.commits == [{p0: 3, p1: 12}, {p0: 5}]
+    assert consumer.seeks == []
+
+
+def test_failed_batch_is_rewound_and_not_committed():
+    """Test a failing partition is paused and retried while others commit."""
+    manager, _ = make_manager()
+    p0, p1 = TopicPartition("metrics", 0), TopicPartition("metrics", 1)
+    stop = threading.Event()
+    consumer = FakeConsumer([{p0: records(p0, 0, 2), p1: records(p1, 5, 2)}], stop)
+    manager.consumers["metrics"] = consumer
+
+    def handler(batch):
+        if batch[0]["offset"] == 5:
+            raise RuntimeError("database unavailable")
+
+    manager.consume_batches("metrics", handler, stop=stop)
+
+    assert consumer.commits == [{p0: 2}]
+    assert consumer.seeks == [(p1, 5)]
+    assert consumer.paused == {p1}
+
+
+@pytest.mark.parametrize("dead_letter_topic", [None, "metrics-dead-letter"])
+def test_batch_failing_past_max_retries_is_skipped(dead_letter_topic):
+    """Test a batch that keeps failing is committed past, once dead-lettered."""
+    manager, producer = make_manager()
+    p0 = TopicPartition("metrics", 0)
+    stop = threading.Event()
+    consumer = FakeConsumer([{p0: records(p0, 0, 2)}] * 3, stop)
+    manager.consumers["metrics"] = consumer
+
+    def handler(batch):
+        raise ValueError("unparseable metric")
+
+    manager.consume_batches(
+        "metrics",
+        handler,
+        stop=stop,
+        max_retries=2,
+        retry_backoff=0,
+        dead_letter_topic=dead_letter_topic,
+    )
+
+    assert consumer.seeks == [(p0, 0), (p0, 0)]
+    assert consumer.commits == [{p0: 2}]
+    sent = [value for value, _ in producer.sent]
+    if dead_letter_topic is None:
+        assert sent == []
+    else:
+        assert sent == [b'{"offset": 0}', b'{"offset": 1}']
+
+
+def test_consumer_lag_per_partition():
+    """Test lag is the high watermark less the committed offset."""
+    manager, _ = make_manager()
+    p0, p1, p2 = (TopicPartition("metrics", p) for p in range(3))
+    stop = threading.Event()
+    consumer = FakeConsumer([{p0: records(p0, 0, 3)}], stop)
+    consumer.highwaters = {p0: 10, p1: 50, p2: None}
+    manager.consumers["metrics"] = consumer
+
+    manager.consume_batches("metrics", lambda batch: None, stop=stop)
+
+    # p1 uses the group's committed offset; p2 has no high watermark yet
+    assert manager.get_consumer_lag("metrics") == {0: 7, 1: 10}
+    assert manager.get_consumer_lag("unknown") == {}
+
+    # p0 is revoked in a rebalance
+    consumer.highwaters = {p1: 60}
+    stop.clear()
+    manager.consume_batches("metrics", lambda batch: None, stop=stop)
+
+    assert manager.get_consumer_lag("metrics") == {1: 20}
+
+
+def test_unknown_mode_rejected():
+    """Test an unknown producer mode raises."""
+    with pytest.raises(ValueError):
+        KafkaManager("localhost:9092", "test", testing=True, mode="fast")
@@ -0,0 +1,75 @@
+"""Test API key validation."""
+
+from unittest.mock import patch
+
+import boto3
+import pytest
+from moto import mock_dynamodb
+
+from src.api.key_management import DEFAULT_HASH_INDEX, APIKeyManager
+
+
+@pytest.fixture
+def key_manager():
+    """Key manager backed by a mocked table with the hash index."""
+    with mock_dynamodb():
+        boto3.resource("dynamodb", region_name="us-east-1").create_table(
+            TableName="cloud_pioneer_api_keys",
+            KeySchema=[
+                {"AttributeName": "account_id", "KeyType": "HASH"},
+                {"AttributeName": "api_key_id", "KeyType": "RANGE"},
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "account_id", "AttributeType": "S"},
+                {"AttributeName": "api_key_id", "AttributeType": "S"},
+                {"AttributeName": "api_key_hash", "AttributeType": "S"},
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    "IndexName": DEFAULT_HASH_INDEX,
+                    "KeySchema": [{"AttributeName": "api_key_hash", "KeyType": "HASH"}],
+                    "Projection": {"ProjectionType": "ALL"},
+                }
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        manager = APIKeyManager(
+            {"dynamodb_table": "cloud_pioneer_api_keys", "secret_key": "test"}
+        )
+        yield manager
+        manager.close()
+
+
+def test_validate_uses_cache(key_manager):
+    """Test repeated validation hits DynamoDB once."""
+    key = key_manager.generate_api_key("account-1")
+
+    with patch.object(
+        key_manager.table, "query", wraps=key_manager.table.query
+    ) as query:
+        first = key_manager.validate_api_key(key["api_key"])
+        second = key_manager.validate_api_key(key["api_key"])
+
+    assert first == second
+    assert first["account_id"] == "account-1"
+    assert query.call_count == 1
+    assert key_manager.validate_api_key("cp_unknown") is None
+
+
+def test_revoke_invalidates_cache(key_manager):
+    """Test a revoked key stops validating straight away."""
+    key = key_manager.generate_api_key("account-1")
+    assert key_manager.validate_api_key(key["api_key"])
+
+    assert key_manager.revoke_api_key("account-1", key["api_key_id"])
+    assert key_manager.validate_api_key(key["api_key"]) is None
+
+
+def test_last_used_updates_are_coalesced(key_manager):
+    """Test many validations produce one last_used write per key."""
+    key = key_manager.generate_api_key("account-1")
+    for _ in range(5):
+        key_manager.validate_api_key(key["api_key"])
+
+    assert key_manager.flush_last_used() == 1
+    assert key_manager.flush_last_used() == 0
@@ -0,0 +1,113 @@
+"""Test columnar metrics store."""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from src.ml.metrics_store import ColumnarMetricsStore, from_epoch_ns, to_epoch_ns
+
+
+@pytest.fixture
+def store():
+    """Create store instance."""
+    return ColumnarMetricsStore(max_points_per_resource=100)
+
+
+@pytest.fixture
+def start_time():
+    """Reference start time."""
+    return datetime(2025, 1, 24, 18, 0, tzinfo=timezone.utc)
+
+
+def test_epoch_conversion_round_trip(start_time):
+    """Test timestamp conversion helpers."""
+    ns = to_epoch_ns(start_time)
+    assert ns == to_epoch_ns("2025-01-24T18:00:00Z")
+    assert ns == to_epoch_ns("2025-01-24T18:00:00")
+    assert from_epoch_ns(ns) == start_time.isoformat()
+
+
+def test_query_returns_records_in_range(store, start_time):
+    """Test range query keeps the record shape."""
+    for i in range(10):
+        store.append(
+            "test-instance",
+            (start_time + timedelta(minutes=i)).isoformat(),
+            {"cpu_utilization": float(i), "memory_utilization": 50.0},
+        )
+
+    records = store.query(
+        "test-instance",
+        (start_time + timedelta(minutes=2)).isoformat(),
+        (start_time + timedelta(minutes=4)).isoformat(),
+    )
+
+    assert [r["metrics"]["cpu_utilization"] for r in records] == [2.0, 3.0, 4.0]
+    assert records[0] == {
+        "timestamp": (start_time + timedelta(minutes=2)).isoformat(),
+        "metrics": {"cpu_utilization": 2.0, "memory_utilization": 50.0},
+    }
+
+
+def test_query_normalises_timestamps_to_utc(store):
+    """Test submitted timestamps come back as UTC ISO 8601 with an offset."""
+    store.append("test-instance", "2025-01-24T18:00:00.250000", {"cpu": 1.0})
+    store.append("test-instance", "2025-01-24T19:01:00+01:00", {"cpu": 2.0})
+    store.append("test-instance", "2025-01-24T18:02:00Z", {"cpu": 3.0})
+
+    records = store.query(
+        "test-instance", "2025-01-24T18:00:00Z", "2025-01-24T18:05:00Z"
+    )
+
+    assert [r["timestamp"] for r in records] == [
+        "2025-01-24T18:00:00.250000+00:00",
+        "2025-01-24T18:01:00+00:00",
+        "2025-01-24T18:02:00+00:00",
+    ]
+
+
+def test_query_unknown_resource(store, start_time):
+    """Test query for a resource with no data."""
+    assert store.query("missing", start_time, start_time) == []
+
+
+def test_sparse_metrics_are_omitted(store, start_time):
+    """Test points only report the metrics they were stored with."""
+    store.append("test-instance", start_time, {"cpu_utilization": 1.0})
+    store.append(
+        "test-instance", start_time + timedelta(minutes=1), {"network_in": 2.0}
+    )
+
+    records = store.query(
+        "test-instance", start_time, start_time + timedelta(minutes=1)
+    )
+    assert [r["metrics"] for r in records] == [
+        {"cpu_utilization": 1.0},
+        {"network_in": 2.0},
+    ]
+
+
+def test_out_of_order_points_are_sorted(store, start_time):
+    """Test late points are merged into time order."""
+    for minute in [0, 2, 1]:
+        store.append(
+            "test-instance",
+            start_time + timedelta(minutes=minute),
+            {"cpu_utilization": float(minute)},
+        )
+
+    records = store.query("test-instance", start_time, start_time + timedelta(hours=1))
+    assert [r["metrics"]["cpu_utilization"] for r in records] == [0.0, 1.0, 2.0]
+
+
+def test_retention_cap(store, start_time):
+    """Test only the newest points are retained."""
+    base = to_epoch_ns(start_time)
+    timestamps = base + np.arange(250, dtype=np.int64) * 60 * 10**9
+    store.extend("test-instance", timestamps, {"cpu_utilization": np.arange(250.0)})
+
+    records = store.query("test-instance", start_time, start_time + timedelta(days=1))
+    assert len(records) == 100
+    assert records[0]["metrics"]["cpu_utilization"] == 150.0
+    assert records[-1]["metrics"]["cpu_utilization"] == 249.0
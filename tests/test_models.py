@@ -0,0 +1,88 @@
+"""Test agent metric models."""
+
+import pickle
+
+import pytest
+
+from src.agent.models import Metric, MetricBatch, TagSet, intern_tags, metric_rows
+
+
+def test_tags_are_interned_and_read_only():
+    """Test equal tag dicts share one read-only TagSet."""
+    first = Metric("system.cpu.utilization", 1.0, {"host": "web-1"})
+    second = Metric("system.memory.used", 2.0, {"host": "web-1"})
+
+    assert first.tags is second.tags
+    assert isinstance(first.tags, TagSet)
+    assert first.tags == {"host": "web-1"}
+    with pytest.raises(TypeError):
+        first.tags["host"] = "web-2"
+    with pytest.raises(AttributeError):
+        first.extra = 1
+    assert pickle.loads(pickle.dumps(first.tags)) == {"host": "web-1"}
+
+
+def test_batch_columns_and_rows():
+    """Test a batch stores columns and shares tag sets between rows."""
+    batch = MetricBatch()
+    tags = {"container_name": "web"}
+    batch.append("docker.cpu.usage_percent", 12.5, tags, 100.0, "docker")
+    batch.append("docker.memory.usage_bytes", 1024, tags, 100.0, "docker")
+    batch.append("agent.spool.records", 0, None, 101.0)
+
+    assert len(batch) == 3
+    assert len(batch.tag_sets) == 2
+    assert batch.value_array().tolist() == [12.5, 1024.0, 0.0]
+    assert batch.names() == [
+        "docker.cpu.usage_percent",
+        "docker.memory.usage_bytes",
+        "agent.spool.records",
+    ]
+    rows = list(batch.rows())
+    assert rows[1] == ("docker.memory.usage_bytes", 1024, tags, 100.0, "docker")
+    # Int values come back as ints, so they are written as integer fields
+    assert type(rows[1][1]) is int and type(rows[0][1]) is float
+    assert type(batch[1].value) is int
+    assert type(batch[1:][0].value) is int
+    assert rows[0][2] is rows[1][2] is intern_tags(tags)
+    assert rows[2][4] is None
+
+    metric = batch[0]
+    assert (metric.name, metric.value, metric.source) == (
+        "docker.cpu.usage_percent",
+        12.5,
+        "docker",
+    )
+
+
+def test_batch_reads_a_reused_tag_dict_on_every_append():
+    """Test a dict changed between appends tags each row with its contents."""
+    batch = MetricBatch()
+    tags = {"host": "web-1"}
+    for interface in ("eth0", "eth1"):
+        tags["interface"] = interface
+        batch.append("system.network.bytes_sent", 1.0, tags, 100.0)
+
+    assert [row[2]["interface"] for row in batch.rows()] == ["eth0", "eth1"]
+    assert len(batch.tag_sets) == 2
+
+
+def test_batch_slice_and_concat():
+    """Test slices and concatenation keep names, tags and order."""
+    batch = MetricBatch.from_metrics(
+        Metric(f"metric.{i % 3}", float(i), {"shard": str(i % 2)}, float(i))
+        for i in range(10)
+    )
+    other = MetricBatch()
+    other.append("metric.extra", 99.0, {"shard": "1"}, 99.0)
+
+    combined = MetricBatch.concat([batch[2:5], other, [Metric("metric.0", 7.0)]])
+
+    assert [row[1] for row in metric_rows(combined)] == [2.0, 3.0, 4.0, 99.0, 7.0]
+    assert combined.names()[:4] == ["metric.2", "metric.0", "metric.1", "metric.extra"]
+    assert [dict(m.tags) for m in combined][:4] == [
+        {"shard": "0"},
+        {"shard": "1"},
+        {"shard": "0"},
+        {"shard": "1"},
+    ]
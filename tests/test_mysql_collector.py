@@ -0,0 +1,51 @@
+"""Test MySQL collection with rates across several instances."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from src.agent.collectors.mysql import MySQLCollector, MySQLInstance  # noqa: E402
+
+
+def test_rates_skip_gauges_and_resets():
+    """Test rates are per second and skip gauges and reset counters."""
+    instance = MySQLInstance({"host": "db1"})
+
+    assert instance.rates("status", {"mysql.queries": 100.0}, 10.0) == {}
+    rates = instance.rates(
+        "status",
+        {"mysql.queries": 160.0, "mysql.threads.connected": 5.0},
+        12.0,
+    )
+    assert rates == {"mysql.queries.per_sec": 30.0}
+    # A server restart resets counters
+    assert instance.rates("status", {"mysql.queries": 10.0}, 14.0) == {}
+
+
+def test_collect_queries_each_instance():
+    """Test every configured instance is collected through its pool."""
+    config = {
+        "collectors": {
+            "mysql": {
+                "instances": [
+                    {"host": "db1", "name": "primary"},
+                    {"host": "db2", "name": "replica"},
+                ]
+            }
+        }
+    }
+    cursor = MagicMock()
+    cursor.fetchall.return_value = [("Queries", "100"), ("Threads_running", "2")]
+    cursor.fetchone.return_value = ("InnoDB", "", "History list length 7\n")
+    with patch("mysql.connector.pooling.MySQLConnectionPool") as pool:
+        pool.return_value.get_connection.return_value.cursor.return_value = cursor
+        collector = MySQLCollector(config)
+        metrics = collector.collect()
+        collector.close()
+
+    assert pool.call_count == 2
+    values = {(m.tags["instance"], m.name): m.value for m in metrics}
+    assert values[("primary", "mysql.queries")] == 100
+    assert values[("replica", "mysql.innodb.history_list_length")] == 7
@@ -0,0 +1,86 @@
+"""Test the weekly pattern engine."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.patterns import (
+    WeeklyProfile,
+    fleet_pattern_reports,
+    pattern_reports,
+)
+
+# A Monday, 00:00 UTC
+START = 1700438400
+
+
+@pytest.fixture
+def hourly_series():
+    """Three weeks of hourly values, low at night and high midweek."""
+    rng = np.random.default_rng(7)
+    timestamps = START + np.arange(21 * 24) * 3600
+    hours = timestamps // 3600 % 24
+    values = np.where(hours < 6, 10.0, 50.0) + rng.normal(0, 5, len(timestamps))
+    values[(timestamps // 86400 + 3) % 7 == 2] += 40.0
+    values[5] = np.nan
+    return timestamps, values
+
+
+def test_matches_dataframe_groupby(hourly_series):
+    """Test results equal the groupby-based analysis of the same values."""
+    timestamps, values = hourly_series
+    report = pattern_reports(WeeklyProfile.from_timestamps(timestamps, values))[0]
+
+    df = pd.DataFrame(
+        {"_value": values}, index=pd.to_datetime(timestamps, unit="s", utc=True)
+    )
+    df["hour"] = df.index.hour
+    df["day_of_week"] = df.index.dayofweek
+    hourly = df.groupby("hour")["_value"].mean()
+    daily = df.groupby("day_of_week")["_value"].mean()
+    cells = df.groupby(["day_of_week", "hour"])["_value"].mean()
+
+    patterns = report["patterns"]
+    assert patterns["hourly_avg"] == pytest.approx(hourly.to_dict())
+    assert patterns["daily_avg"] == pytest.approx(daily.to_dict())
+    assert patterns["variability"] == pytest.approx(df["_value"].std())
+    assert [(p["day_of_week"], p["hour"]) for p in report["idle_periods"]] == [
+        key for key, value in cells.items() if value < 20
+    ]
+    assert [(p["day_of_week"], p["hour"]) for p in report["peak_periods"]] == [
+        key for key, value in cells.items() if value > 80
+    ]
+    assert report["recommendations"] == [
+        "Consider scaling down resources during hours: "
+        "00:00, 01:00, 02:00, 03:00, 04:00, 05:00"
+    ]
+
+
+def test_no_values_gives_empty_report():
+    """Test a resource without values reports nothing."""
+    profile = WeeklyProfile.from_timestamps(np.empty(0), np.empty(0))
+    assert pattern_reports(profile) == [{}]
+
+
+def test_fleet_reports_match_single_resource(hourly_series):
+    """Test a fleet binned together matches analysing each resource alone."""
+    timestamps, values = hourly_series
+    idle_values = np.full(48, 5.0)
+    idle_timestamps = START + np.arange(48) * 3600
+
+    reports = fleet_pattern_reports(
+        ["web", "batch", "new"],
+        [timestamps, idle_timestamps, np.empty(0)],
+        [values, idle_values, np.empty(0)],
+    )
+
+    single = pattern_reports(WeeklyProfile.from_timestamps(timestamps, values))[0]
+    assert reports["web"]["patterns"]["hourly_avg"] == pytest.approx(
+        single["patterns"]["hourly_avg"]
+    )
+    assert reports["web"]["peak_periods"] == single["peak_periods"]
+    assert reports["batch"]["recommendations"][0] == (
+        "Consider scaling down resources on Monday, Tuesday"
+    )
+    assert reports["batch"]["patterns"]["variability"] == 0.0
+    assert reports["new"] == {}
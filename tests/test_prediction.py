@@ -0,0 +1,183 @@
+"""Test DynamoDB-backed metrics predictor."""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import boto3
+import pytest
+from moto import mock_dynamodb
+
+from src.agent.monitors.resource_monitor import ResourceMonitor
+from src.ml.models import MetricsPredictor, WriteBehindBuffer, WriteBufferFull
+
+
+@pytest.fixture
+def dynamodb():
+    """Mocked DynamoDB resource with the metrics table."""
+    with mock_dynamodb():
+        resource = boto3.resource("dynamodb", region_name="us-east-1")
+        resource.create_table(
+            TableName="cloud_pioneer_metrics",
+            KeySchema=[
+                {"AttributeName": "resource_id", "KeyType": "HASH"},
+                {"AttributeName": "timestamp", "KeyType": "RANGE"},
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "resource_id", "AttributeType": "S"},
+                {"AttributeName": "timestamp", "AttributeType": "S"},
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield resource
+
+
+@pytest.fixture
+def end_time():
+    """Reference end of the query window."""
+    return datetime(2025, 1, 31, 0, 0)
+
+
+def test_historical_metrics_split_across_segments(dynamodb, end_time):
+    """Test a multi-day window is read in segments without gaps or overlap."""
+    predictor = MetricsPredictor(dynamodb, query_workers=4, segment_hours=24)
+    for i in range(96):
+        predictor.store_metrics(
+            {
+                "resource_id": "test-instance",
+                "timestamp": (end_time - timedelta(hours=i)).isoformat(),
+                "metrics": {"cpu_utilization": float(i), "memory_utilization": 50.0},
+            }
+        )
+
+    history = predictor.get_historical_metrics(
+        "test-instance", hours=72, end_time=end_time
+    )
+
+    assert len(history) == 73
+    assert history["timestamp"].is_monotonic_increasing
+    assert history["cpu_utilization"].tolist() == [float(i) for i in range(72, -1, -1)]
+    assert history["cpu_utilization"].dtype == "float64"
+
+
+def test_historical_metrics_sparse_and_empty(dynamodb, end_time):
+    """Test sparse metrics become NaN and unknown resources are empty."""
+    predictor = MetricsPredictor(dynamodb)
+    predictor.store_metrics(
+        {
+            "resource_id": "test-instance",
+            "timestamp": (end_time - timedelta(hours=2)).isoformat(),
+            "metrics": {"cpu_utilization": 1.5},
+        }
+    )
+    predictor.store_metrics(
+        {
+            "resource_id": "test-instance",
+            "timestamp": (end_time - timedelta(hours=1)).isoformat(),
+            "metrics": {"network_in": 2.0},
+        }
+    )
+
+    history = predictor.get_historical_metrics("test-instance", end_time=end_time)
+    assert history["cpu_utilization"].tolist()[0] == 1.5
+    assert history["network_in"].isna().tolist() == [True, False]
+
+    assert predictor.get_historical_metrics("missing", end_time=end_time).empty
+
+
+def test_bulk_read_client_follows_injected_session(dynamodb):
+    """Test the bulk-read client comes from the session or is used as given."""
+    session = MagicMock()
+    predictor = MetricsPredictor(dynamodb, session=session)
+    assert predictor.client is session.client.return_value
+    session.client.assert_called_once_with(
+        "dynamodb",
+        region_name="us-east-1",
+        endpoint_url=dynamodb.meta.client.meta.endpoint_url,
+    )
+
+    client = MagicMock()
+    client.get_paginator.return_value.paginate.return_value = [{"Items": []}]
+    predictor = MetricsPredictor(dynamodb, client=client)
+    assert predictor.get_historical_metrics("test-instance").empty
+    client.get_paginator.assert_called_with("query")
+
+
+def _count_items(dynamodb):
+    return dynamodb.Table("cloud_pioneer_metrics").scan(Select="COUNT")["Count"]
+
+
+def test_write_behind_flushes_batches(dynamodb, end_time):
+    """Test buffered writes reach the table on flush and on close."""
+    predictor = MetricsPredictor(dynamodb)
+    buffer = predictor.enable_write_behind(max_batch_size=10, max_age_seconds=60)
+    for i in range(25):
+        predictor.store_metrics(
+            {
+                "resource_id": "test-instance",
+                "timestamp": (end_time - timedelta(minutes=i)).isoformat(),
+                "metrics": {"cpu_utilization": float(i)},
+            }
+        )
+
+    assert predictor.flush(timeout=10)
+    assert _count_items(dynamodb) == 25
+
+    predictor.store_metrics(
+        {
+            "resource_id": "test-instance",
+            "timestamp": end_time.isoformat(),
+            "metrics": {"cpu_utilization": 99.0},
+        }
+    )
+    predictor.close()
+
+    stats = predictor.get_write_stats()
+    assert stats["items_written"] == 26
+    assert stats["queue_depth"] == 0
+    assert stats["flushes"] >= 3
+    assert stats["avg_flush_latency_seconds"] > 0
+    with pytest.raises(RuntimeError):
+        buffer.put({})
+
+
+def test_predict_usage_sees_buffered_sample(dynamodb):
+    """Test a prediction includes the sample just collected with write-behind."""
+    predictor = MetricsPredictor(dynamodb)
+    predictor.enable_write_behind(max_batch_size=100, max_age_seconds=60)
+    collector = MagicMock()
+    collector.collect_metrics.return_value = {"cpu_utilization": 42.0}
+    monitor = ResourceMonitor(collector, predictor, scheduler=MagicMock())
+
+    result = monitor.predict_usage("test-instance")
+    monitor.close()
+
+    assert result == {"predictions": {"cpu_utilization": 42.0}}
+
+
+def test_write_behind_backpressure_and_retries():
+    """Test a full buffer raises and failed requests are retried."""
+    table = MagicMock()
+    writer = table.batch_writer.return_value.__enter__.return_value
+    writer.put_item.side_effect = [Exception("throttled"), None, None]
+
+    buffer = WriteBehindBuffer(
+        table,
+        max_batch_size=2,
+        max_age_seconds=60,
+        max_queue_size=2,
+        backpressure="error",
+        retry_backoff=0,
+        flush_on_exit=False,
+    )
+    with buffer._cond:
+        # Hold the lock so the writer cannot drain the queue yet
+        buffer.put({"n": 1})
+        buffer.put({"n": 2})
+        with pytest.raises(WriteBufferFull):
+            buffer.put({"n": 3})
+
+    assert buffer.flush(timeout=10)
+    stats = buffer.get_stats()
+    assert stats["retries"] == 1
+    assert stats["items_written"] == 2
+    buffer.close()
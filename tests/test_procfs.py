@@ -0,0 +1,110 @@
+"""Test procfs snapshot engine."""
+
+import os
+
+import pytest
+
+from src.agent.collectors.procfs import ProcfsSnapshotEngine
+from src.agent.collectors.resource_metrics import ResourceMetricsCollector
+
+MEMINFO = b"""MemTotal:        1000 kB
+MemFree:          200 kB
+MemAvailable:     600 kB
+Buffers:           50 kB
+Cached:           100 kB
+SwapTotal:        400 kB
+SwapFree:         300 kB
+"""
+NET_DEV = b"""Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo: {rx} 10 0 0 0 0 0 0 {rx} 10 0 0 0 0 0 0
+  eth0: {rx} 20 1 2 0 0 0 0 {tx} 30 3 4 0 0 0 0
+"""
+DISKSTATS = (
+    b"   8       0 sda {reads} 0 {sectors} 40 5 0 16 50 0 0 0 0 0 0 0\n"
+    b"   8       1 sda1 {reads} 0 {sectors} 40 5 0 16 50 0 0 0 0 0 0 0\n"
+)
+
+
+def _write(root, name, data):
+    path = os.path.join(root, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _tick(root, busy, idle, ctxt, rx, tx, reads):
+    _write(
+        root,
+        "stat",
+        f"cpu  {busy} 0 0 {idle} 0 0 0 0 0 0\ncpu0 0 0 0 0\n"
+        f"intr 100 1 2\nctxt {ctxt}\nsoftirq 7 1\n".encode(),
+    )
+    _write(
+        root,
+        "net/dev",
+        NET_DEV.replace(b"{rx}", str(rx).encode()).replace(b"{tx}", str(tx).encode()),
+    )
+    _write(
+        root,
+        "diskstats",
+        DISKSTATS.replace(b"{reads}", str(reads).encode()).replace(
+            b"{sectors}", str(reads * 8).encode()
+        ),
+    )
+
+
+@pytest.fixture
+def proc_root(tmp_path):
+    """Fake /proc and /sys/block trees."""
+    root = str(tmp_path / "proc")
+    _write(root, "meminfo", MEMINFO)
+    _write(root, "loadavg", b"0.50 0.25 0.10 1/100 42\n")
+    _write(root, "filesystems", b"nodev\tproc\n\text4\n")
+    _write(root, "self/mounts", b"proc /proc proc rw 0 0\n")
+    _tick(root, busy=100, idle=900, ctxt=1000, rx=500, tx=700, reads=10)
+    os.makedirs(tmp_path / "block" / "sda")
+    return root
+
+
+def test_snapshot_fields(proc_root, tmp_path):
+    """Test values are parsed with psutil semantics."""
+    engine = ProcfsSnapshotEngine(proc_root, str(tmp_path / "block"))
+    groups = engine.collect()
+
+    assert groups["cpu"]["load_avg_1min"] == 0.5
+    assert groups["cpu"]["usage_percent"] is None
+    assert groups["memory"]["total"] == 1000 * 1024
+    assert groups["memory"]["percent"] == 40.0
+    assert groups["memory"]["swap_used"] == 100 * 1024
+    # Loopback is included and partitions are not double counted
+    assert groups["network"]["bytes_recv"] == 1000
+    assert groups["network"]["dropin"] == 2
+    assert groups["disk"]["io_counters"]["read_count"] == 10
+    assert groups["disk"]["io_counters"]["read_bytes"] == 80 * 512
+    assert groups["disk"]["partitions"] == {}
+    engine.close()
+
+
+def test_deltas_and_rates(proc_root, tmp_path):
+    """Test the second tick diffs against the first."""
+    engine = ProcfsSnapshotEngine(proc_root, str(tmp_path / "block"))
+    engine.collect()
+    _tick(proc_root, busy=175, idle=925, ctxt=1600, rx=1500, tx=900, reads=20)
+    groups = engine.collect()
+
+    assert groups["cpu"]["usage_percent"] == 75.0
+    assert groups["cpu"]["ctx_switches_per_sec"] > 0
+    assert groups["network"]["bytes_recv_per_sec"] > 0
+    assert groups["disk"]["io_counters"]["read_count_per_sec"] > 0
+    engine.close()
+
+
+def test_collector_falls_back_to_psutil():
+    """Test the psutil path reports the same groups."""
+    procfs = ResourceMetricsCollector().collect_snapshot()
+    fallback = ResourceMetricsCollector(use_procfs=False).collect_snapshot()
+
+    for group in ("cpu", "memory", "network"):
+        assert set(fallback[group]) <= set(procfs[group])
+    assert fallback["memory"]["total"] == procfs["memory"]["total"]
@@ -0,0 +1,123 @@
+"""Test ML resource optimizer forecasting."""
+
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from src.ml.resource_optimizer import ResourceOptimizer
+
+
+@pytest.fixture
+def history():
+    """Ten days of hourly utilization with a daily cycle."""
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2025-01-01", periods=240, freq="h")
+    values = 50 + 30 * np.sin(2 * np.pi * index.hour / 24) + rng.normal(0, 3, 240)
+    return pd.DataFrame({"value": values}, index=index)
+
+
+@pytest.fixture
+def optimizer(history):
+    """Optimizer with a small in-memory model."""
+    optimizer = ResourceOptimizer({})
+    features = optimizer.prepare_features(history.copy())
+    valid = ~features.isna().any(axis=1)
+    optimizer.model = RandomForestRegressor(
+        n_estimators=10, max_depth=6, random_state=42
+    )
+    optimizer.model.fit(
+        optimizer.scaler.fit_transform(features[valid]), history["value"][valid]
+    )
+    return optimizer
+
+
+def _values(result):
+    return np.array([p["predicted_value"] for p in result["predictions"]])
+
+
+def test_incremental_matches_recursive(optimizer, history):
+    """Test incremental forecasting reproduces the recursive path."""
+    recursive = optimizer.predict_utilization(history, 30, mode="recursive")
+    incremental = optimizer.predict_utilization(history, 30, mode="incremental")
+
+    np.testing.assert_allclose(_values(incremental), _values(recursive))
+    assert [p["timestamp"] for p in incremental["predictions"]] == [
+        p["timestamp"] for p in recursive["predictions"]
+    ]
+
+
+def test_direct_forecast(optimizer, history):
+    """Test direct forecasting covers the horizon in one call."""
+    recursive = optimizer.predict_utilization(history, 30, mode="recursive")
+    direct = optimizer.predict_utilization(history, 30, mode="direct")
+
+    assert len(direct["predictions"]) == 30
+    assert (
+        direct["predictions"][-1]["timestamp"]
+        == recursive["predictions"][-1]["timestamp"]
+    )
+    # The first step only depends on observed data
+    assert _values(direct)[0] == pytest.approx(_values(recursive)[0])
+
+
+def test_unknown_forecast_mode(optimizer, history):
+    """Test an unknown mode is rejected."""
+    with pytest.raises(ValueError):
+        optimizer.predict_utilization(history, 24, mode="bogus")
+
+
+def test_batch_recommendations_match_single(optimizer):
+    """Test the batch job gives the same results as per-resource calls."""
+    rng = np.random.default_rng(1)
+    histories = {
+        "idle": rng.uniform(1, 10, (40, 4)) * [1, 1, 1000, 1000],
+        "busy": rng.uniform(85, 99, (10, 4)) * [1, 1, 2e6, 2e6],
+    }
+    histories["idle"][-3:, 1] = np.nan  # gaps are forward filled
+
+    def high_level(values):
+        return [
+            {
+                col: value
+                for col, value in zip(optimizer.feature_columns, row)
+                if not np.isnan(value)
+            }
+            for row in values
+        ]
+
+    def low_level(values):
+        return [
+            {
+                col: {"N": str(value)}
+                for col, value in zip(optimizer.feature_columns, row)
+                if not np.isnan(value)
+            }
+            for row in values
+        ]
+
+    def paginate(**kwargs):
+        values = histories.get(kwargs["ExpressionAttributeValues"][":rid"]["S"])
+        return [] if values is None else [{"Items": low_level(values)}]
+
+    optimizer.client = MagicMock()
+    optimizer.table = MagicMock()
+    optimizer.client.get_paginator.return_value.paginate = paginate
+
+    batch = optimizer.get_recommendations_batch(["idle", "busy", "missing"])
+
+    for resource_id, values in histories.items():
+        optimizer.table.query.return_value = {"Items": high_level(values)}
+        expected = optimizer.get_recommendations(resource_id)
+        result = next(r for r in batch if r["resource_id"] == resource_id)
+        assert result["recommendations"] == [
+            {**r, "current_value": pytest.approx(r["current_value"])}
+            for r in expected["recommendations"]
+        ]
+        assert [p["prediction"] for p in result["predictions"]] == pytest.approx(
+            [p["prediction"] for p in expected["predictions"]]
+        )
+
+    assert batch[2]["status"] == "error"
@@ -0,0 +1,117 @@
+"""Test the watermark-invalidated result cache."""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.api.result_cache import ALL_METRICS, ResultCache
+
+
+class Compute:
+    """Counts calls; optionally blocks until released."""
+
+    def __init__(self, result="report"):
+        self.result = result
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        self.release.wait(5)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return f"{self.result}-{self.calls}"
+
+
+@pytest.mark.asyncio
+async def test_results_served_until_points_arrive():
+    """Test a result is reused until its series' watermark advances."""
+    cache = ResultCache()
+    compute = Compute()
+
+    assert await cache.get_or_compute("i-1", "cpu", 30, compute) == "report-1"
+    assert await cache.get_or_compute("i-1", "cpu", 30, compute) == "report-1"
+
+    cache.advance("i-1", "memory")
+    cache.advance("i-2", "cpu")
+    assert await cache.get_or_compute("i-1", "cpu", 30, compute) == "report-1"
+
+    cache.advance("i-1", "cpu")
+    assert await cache.get_or_compute("i-1", "cpu", 30, compute) == "report-2"
+    # Another window is another key
+    assert await cache.get_or_compute("i-1", "cpu", 7, compute) == "report-3"
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 3
+    assert stats["stale"] == 1
+    assert stats["hit_ratio"] == pytest.approx(0.4)
+
+
+@pytest.mark.asyncio
+async def test_resource_wide_results_and_advances():
+    """Test ALL_METRICS results go stale on any metric of the resource."""
+    cache = ResultCache()
+    compute = Compute()
+    await cache.get_or_compute("i-1", ALL_METRICS, "recommendations", compute)
+    await cache.get_or_compute("i-1", "cpu", 30, compute)
+
+    cache.advance("i-1", "memory")
+    await cache.get_or_compute("i-1", ALL_METRICS, "recommendations", compute)
+    assert compute.calls == 3
+
+    cache.advance("i-1")
+    await cache.get_or_compute("i-1", "cpu", 30, compute)
+    assert compute.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced():
+    """Test identical concurrent requests share one computation."""
+    cache = ResultCache()
+    compute = Compute()
+    compute.release.clear()
+
+    requests = [cache.get_or_compute("i-1", "cpu", 30, compute) for _ in range(5)]
+    pending = asyncio.gather(*requests)
+    await asyncio.sleep(0.05)
+    compute.release.set()
+
+    assert await pending == ["report-1"] * 5
+    assert compute.calls == 1
+    assert cache.get_stats()["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_failures_are_shared_and_not_cached():
+    """Test a failed computation raises for all waiters and is retried."""
+    cache = ResultCache()
+    compute = Compute(RuntimeError("query failed"))
+    compute.release.clear()
+
+    pending = asyncio.gather(
+        *[cache.get_or_compute("i-1", "cpu", 30, compute) for _ in range(2)],
+        return_exceptions=True,
+    )
+    await asyncio.sleep(0.05)
+    compute.release.set()
+    assert [str(e) for e in await pending] == ["query failed"] * 2
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_compute("i-1", "cpu", 30, compute)
+    assert compute.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_size_is_bounded():
+    """Test the least recently used result is evicted."""
+    cache = ResultCache(maxsize=2)
+    compute = Compute()
+    for resource_id in ("i-1", "i-2", "i-1", "i-3"):
+        await cache.get_or_compute(resource_id, "cpu", 30, compute)
+
+    assert cache.get_stats()["size"] == 2
+    await cache.get_or_compute("i-2", "cpu", 30, compute)
+    assert compute.calls == 4
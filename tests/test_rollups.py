@@ -0,0 +1,63 @@
+"""Test rollup tiers."""
+
+import numpy as np
+import pytest
+
+from src.analysis.rollups import RollupStore
+
+HOUR = 3600
+DAY = 86400
+# A Monday, 00:00 UTC
+START = 1700438400
+
+
+@pytest.fixture
+def store():
+    """Store with two days of points every 10 minutes for one resource."""
+    store = RollupStore()
+    rows = [
+        ("cpu", float(i % 6), {"resource_id": "i-1"}, START + i * 600, "system")
+        for i in range(2 * 24 * 6)
+    ]
+    rows.append(("cpu", 50.0, {"host": "untagged"}, START, "system"))
+    assert store.add_rows(rows) == 2 * 24 * 6
+    return store
+
+
+def test_hourly_buckets_hold_exact_aggregates(store):
+    """Test each hourly bucket aggregates its six points."""
+    buckets = store.query("i-1", "cpu", START, START + 2 * DAY)
+
+    assert len(buckets["time"]) == 48
+    np.testing.assert_array_equal(buckets["time"], START + np.arange(48) * HOUR)
+    np.testing.assert_array_equal(buckets["count"], 6)
+    np.testing.assert_array_equal(buckets["sum"], 15)
+    np.testing.assert_array_equal(buckets["sum_sq"], 55)
+    np.testing.assert_array_equal(buckets["min"], 0)
+    np.testing.assert_array_equal(buckets["max"], 5)
+
+
+def test_daily_tier_and_merge(store):
+    """Test daily buckets sum the hours and accept merged aggregates."""
+    store.merge("i-1", "cpu", START - 1, 2, 200.0, 20000.0, 90.0, 110.0)
+    daily = store.query("i-1", "cpu", START - DAY, START + 2 * DAY, tier="1d")
+
+    np.testing.assert_array_equal(daily["time"], [START - DAY, START, START + DAY])
+    np.testing.assert_array_equal(daily["count"], [2, 144, 144])
+    np.testing.assert_array_equal(daily["max"], [110, 5, 5])
+
+
+def test_coverage_and_retention():
+    """Test coverage tracks the earliest point and old buckets expire."""
+    store = RollupStore(hourly_retention_days=1)
+    store.add("i-1", "cpu", 1.0, START + 30)
+    assert store.covered_from("i-1", "cpu") == START + 30
+    store.mark_covered("i-1", "cpu", START - DAY)
+    assert store.covered_from("i-1", "cpu") == START - DAY
+    assert store.covered_from("i-2", "cpu") is None
+
+    store.add("i-1", "cpu", 2.0, START + 2 * DAY)
+    hourly = store.query("i-1", "cpu", 0, START + 3 * DAY)
+    daily = store.query("i-1", "cpu", 0, START + 3 * DAY, tier="1d")
+    assert hourly["time"].tolist() == [START + 2 * DAY]
+    assert daily["time"].tolist() == [START, START + 2 * DAY]
@@ -0,0 +1,99 @@
+"""Test per-collector scheduling."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.agent.models import Metric
+from src.agent.scheduler import CollectorScheduler, next_aligned_tick
+
+
+class FakeClock:
+    """Clock that only moves when the test sets it."""
+
+    def __init__(self, now):
+        """Initialize clock."""
+        self.now = now
+
+    def __call__(self):
+        """Return the current fake time."""
+        return self.now
+
+
+class FakeCollector:
+    """Collector that returns at once, or once released."""
+
+    def __init__(self, name, blocking=False):
+        """Initialize fake collector."""
+        self.name = name
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not blocking:
+            self.release.set()
+
+    def collect(self):
+        """Return one metric after ``release`` is set."""
+        self.started.set()
+        self.release.wait(5)
+        return [Metric(self.name, 1.0)]
+
+
+def wait_until(condition, timeout=5.0):
+    """Wait for worker threads to reach a state."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_next_aligned_tick():
+    """Test ticks land on wall-clock multiples of the interval."""
+    assert next_aligned_tick(1000.5, 30) == 1020
+    assert next_aligned_tick(1020.0, 30) == 1050
+    assert next_aligned_tick(1000.5, 0.25) == 1000.75
+
+
+def test_slow_collector_does_not_delay_others():
+    """Test collectors run independently and slow runs are accounted."""
+    received = []
+    lock = threading.Lock()
+
+    def sink(metrics):
+        with lock:
+            received.extend(m.name for m in metrics)
+
+    clock = FakeClock(1000.5)
+    fast, slow = FakeCollector("fast"), FakeCollector("slow", blocking=True)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        scheduler = CollectorScheduler(
+            sink, clock=clock, timer=clock, executor=executor
+        )
+        scheduler.add("fast", fast, interval=1)
+        scheduler.add("slow", slow, interval=1, timeout=2)
+        assert scheduler.run_pending() == 0.5
+
+        for tick in (1001, 1002, 1003):
+            clock.now = tick
+            assert scheduler.run_pending() == 1
+            wait_until(lambda: scheduler.get_stats()["fast"]["runs"] == tick - 1000)
+            slow.started.wait(5)
+
+        # The slow run finishes 2.5s after it started, over its timeout
+        clock.now = 1003.5
+        slow.release.set()
+        wait_until(lambda: scheduler.get_stats()["slow"]["runs"] == 1)
+
+        # The scheduler sleeps through two ticks
+        clock.now = 1006.2
+        scheduler.run_pending()
+        wait_until(lambda: scheduler.get_stats()["fast"]["runs"] == 4)
+        wait_until(lambda: scheduler.get_stats()["slow"]["runs"] == 2)
+
+    stats = scheduler.get_stats()
+    assert stats["fast"]["missed_deadlines"] == 2
+    assert stats["slow"]["missed_deadlines"] == 4
+    assert stats["slow"]["timeouts"] == 1
+    assert stats["slow"]["max_duration_seconds"] == 2.5
+    # Metrics from runs over their timeout are discarded
+    assert received.count("slow") == 1
+    assert received.count("fast") == 4
@@ -0,0 +1,72 @@
+"""Test Kafka message formats for metrics."""
+
+import json
+
+import pytest
+
+from src.agent.models import MetricBatch, metric_rows
+from src.streaming.serialization import (
+    BATCH_FORMAT,
+    SerializationError,
+    decode_message,
+    format_headers,
+    get_serializer,
+)
+
+
+@pytest.fixture
+def batch():
+    """Metrics from two containers."""
+    batch = MetricBatch()
+    for container in ("web", "db"):
+        tags = {"container_name": container, "image": f"{container}:latest"}
+        for i, name in enumerate(("docker.cpu.usage_percent", "docker.memory.usage")):
+            batch.append(name, float(i) + 0.5, tags, 1700000000.25 + i, "docker")
+    batch.append("agent.spool.records", 3.0, None, 1700000002.0)
+    return batch
+
+
+def as_json_dicts(batch):
+    serializer = get_serializer("json")
+    return [json.loads(m) for m in serializer.encode(metric_rows(batch))]
+
+
+def test_batch_format_round_trips_to_json_dicts(batch):
+    """Test binary frames decode to the dicts JSON messages carry."""
+    serializer = get_serializer(BATCH_FORMAT)
+    messages = serializer.encode(metric_rows(batch))
+    headers = format_headers(serializer)
+
+    # One message per tag set
+    assert len(messages) == 3
+    decoded = [m for message in messages for m in decode_message(message, headers)]
+    assert decoded == as_json_dicts(batch)
+    assert sum(map(len, messages)) < sum(
+        len(json.dumps(m)) for m in as_json_dicts(batch)
+    )
+
+
+def test_large_groups_split_across_frames():
+    """Test a tag set with more than max_points metrics spans frames."""
+    serializer = get_serializer(BATCH_FORMAT)
+    rows = [("m", float(i), {"host": "a"}, float(i), "s") for i in range(25000)]
+
+    messages = serializer.encode(rows)
+
+    assert len(messages) == 3
+    values = [m["value"] for msg in messages for m in serializer.decode(msg)]
+    assert values == [float(i) for i in range(25000)]
+
+
+def test_messages_without_header_are_json():
+    """Test legacy messages without a format header decode as JSON."""
+    assert decode_message(b'{"name": "m", "value": 1}') == [{"name": "m", "value": 1}]
+
+
+def test_corrupt_and_unknown_formats_raise():
+    """Test undecodable messages raise SerializationError."""
+    headers = [("content-format", BATCH_FORMAT.encode())]
+    with pytest.raises(SerializationError):
+        decode_message(b"CPMB\x01\xff", headers)
+    with pytest.raises(SerializationError):
+        decode_message(b"{}", [("content-format", b"avro")])
@@ -0,0 +1,93 @@
+"""Test metric shipping pipeline."""
+
+import threading
+
+from src.agent.backends.base import MetricBackend
+from src.agent.models import Metric
+from src.agent.shipping import MetricShipper
+
+
+class RecordingBackend(MetricBackend):
+    """Backend that records batches and can fail or block."""
+
+    def __init__(self, max_batch_size=None, failures=0, gate=None):
+        """Initialize recording backend."""
+        super().__init__({})
+        self.max_batch_size = max_batch_size
+        self.failures = failures
+        self.gate = gate
+        self.batches = []
+
+    def send_metrics(self, metrics):
+        """Record a batch."""
+        if self.gate is not None:
+            self.gate.wait(10)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("backend unavailable")
+        self.batches.append(len(metrics))
+
+    def health_check(self):
+        """Report healthy."""
+        return True
+
+
+def _metrics(count):
+    return [Metric("system.cpu.utilization", float(i)) for i in range(count)]
+
+
+def test_batches_are_sized_per_backend():
+    """Test each backend receives batches of its own size."""
+    cloudwatch = RecordingBackend(max_batch_size=20)
+    influx = RecordingBackend()
+    shipper = MetricShipper({"aws": cloudwatch, "influx": influx})
+
+    shipper.ship(_metrics(45))
+    shipper.close()
+
+    assert cloudwatch.batches == [20, 20, 5]
+    assert influx.batches == [45]
+    assert shipper.get_stats()["aws"]["metrics_sent"] == 45
+
+
+def test_slow_backend_does_not_stall_others():
+    """Test a blocked backend only delays its own batches."""
+    gate = threading.Event()
+    slow = RecordingBackend(gate=gate)
+    flaky = RecordingBackend(failures=2)
+    shipper = MetricShipper({"slow": slow, "flaky": flaky}, base_backoff=0)
+
+    shipper.ship(_metrics(10))
+    shipper._executors["flaky"].submit(lambda: None).result(timeout=10)
+
+    stats = shipper.get_stats()
+    assert flaky.batches == [10]
+    assert stats["flaky"]["retries"] == 2
+    assert stats["slow"]["pending_batches"] == 1
+
+    gate.set()
+    shipper.close()
+    assert slow.batches == [10]
+
+
+def test_ship_futures_report_delivery():
+    """Test each batch's future says whether its backend accepted it."""
+    failing = RecordingBackend(failures=1)
+    shipper = MetricShipper({"failing": failing}, max_retries=0, max_pending=1)
+    gate = threading.Event()
+    shipper.add_backend("blocked", RecordingBackend(gate=gate))
+
+    first = shipper.ship(_metrics(5))
+    assert first[0].result(timeout=10) is False
+    # The blocked backend still has the first batch pending
+    second = shipper.ship(_metrics(5))
+
+    assert second[1].result(timeout=10) is False
+    gate.set()
+    assert [f.result(timeout=10) for f in first + second] == [
+        False,
+        True,
+        True,
+        False,
+    ]
+    shipper.close()
@@ -0,0 +1,182 @@
+"""Test disk-backed metric spool."""
+
+import json
+import os
+
+import pytest
+
+from src.agent.agent import MonitoringAgent
+from src.agent.backends.base import MetricBackend
+from src.agent.models import Metric
+from src.agent.spool import MetricSpool
+
+
+class FlakyBackend(MetricBackend):
+    """Backend that fails its first ``failures`` writes."""
+
+    def __init__(self, failures=0):
+        """Initialize backend."""
+        super().__init__({})
+        self.failures = failures
+        self.values = []
+
+    def send_metrics(self, metrics):
+        """Record metric values, or fail."""
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("backend unavailable")
+        self.values.extend(m.value for m in metrics)
+
+    def health_check(self):
+        """Report healthy."""
+        return True
+
+
+def _metrics(start, count):
+    return [
+        Metric(
+            "system.cpu.utilization",
+            float(i),
+            {"host": "test-host"},
+            timestamp=1700000000.0 + i,
+            source="system",
+        )
+        for i in range(start, start + count)
+    ]
+
+
+@pytest.fixture
+def spool_dir(tmp_path):
+    """Spool directory."""
+    return str(tmp_path / "spool")
+
+
+def test_round_trip_in_order_across_segments(spool_dir):
+    """Test records come back in order with all fields intact."""
+    spool = MetricSpool(spool_dir, segment_bytes=512)
+    spool.append(_metrics(0, 50))
+
+    assert len(spool) == 50
+    assert spool.get_stats()["segments"] > 1
+
+    first = spool.pop(30)
+    rest = spool.pop(100)
+    assert [m.value for m in first + rest] == [float(i) for i in range(50)]
+    assert rest[0].tags == {"host": "test-host"}
+    assert rest[0].source == "system"
+    assert rest[0].timestamp == 1700000030.0
+    assert len(spool) == 0
+    assert spool.get_stats()["bytes"] == 0
+
+
+def test_int_values_stay_ints(spool_dir):
+    """Test integer values come back as ints, as they were collected."""
+    spool = MetricSpool(spool_dir)
+    spool.append(
+        [
+            Metric("system.memory.used", 8 * 2**30, {"host": "test-host"}, 1.0),
+            Metric("system.memory.utilization", 42.0, {"host": "test-host"}, 1.0),
+        ]
+    )
+
+    used, utilization = spool.pop(2)
+    assert type(used.value) is int and used.value == 8 * 2**30
+    assert type(utilization.value) is float
+    assert used.tags == {"host": "test-host"}
+
+
+def test_resume_after_restart(spool_dir):
+    """Test unread records survive reopening the spool."""
+    spool = MetricSpool(spool_dir, segment_bytes=512)
+    spool.append(_metrics(0, 20))
+    spool.pop(5)
+    spool.close()
+
+    reopened = MetricSpool(spool_dir, segment_bytes=512)
+    assert len(reopened) == 15
+    reopened.append(_metrics(20, 5))
+    assert [m.value for m in reopened.pop(100)] == [float(i) for i in range(5, 25)]
+
+
+def test_peeked_records_stay_until_acked(spool_dir):
+    """Test records are only consumed once acknowledged, across restarts."""
+    spool = MetricSpool(spool_dir, segment_bytes=512)
+    spool.append(_metrics(0, 20))
+    read = spool.peek(15)
+    spool.close()
+
+    reopened = MetricSpool(spool_dir, segment_bytes=512)
+    assert len(reopened) == 20
+    read = reopened.peek(15)
+    assert [m.value for m in read.metrics] == [float(i) for i in range(15)]
+    # Appended after the peek, into the segment being read
+    reopened.append(_metrics(20, 3))
+    reopened.ack(read)
+    reopened.ack(read)
+
+    assert len(reopened) == 8
+    assert [m.value for m in reopened.peek(100).metrics] == [
+        float(i) for i in range(15, 23)
+    ]
+
+
+def test_agent_replays_whole_spool_and_keeps_failed_batches(tmp_path):
+    """Test one tick drains the spool, and a failed replay stays spooled."""
+    config = tmp_path / "agent.json"
+    config.write_text(
+        json.dumps(
+            {
+                "agent": {
+                    "shipping_interval": 5,
+                    "shipping": {"max_retries": 0},
+                    "spool": {
+                        "enabled": True,
+                        "path": str(tmp_path / "spool"),
+                        "replay_batch_size": 100,
+                    },
+                }
+            }
+        )
+    )
+    agent = MonitoringAgent(str(config))
+    backend = FlakyBackend(failures=1)
+    agent.register_backend("test", backend)
+    agent.spool.append(_metrics(0, 1000))
+    agent.running = True
+
+    assert agent._replay_spool() is False
+    assert len(agent.spool) == 1000
+
+    assert agent._replay_spool() is False
+    assert len(agent.spool) == 0
+    assert backend.values == [float(i) for i in range(1000)]
+    agent.shipper.close()
+    agent.spool.close()
+
+
+def test_torn_write_is_skipped(spool_dir):
+    """Test a partial record left by a crash does not block replay."""
+    spool = MetricSpool(spool_dir)
+    spool.append(_metrics(0, 3))
+    spool.close()
+    segment = os.path.join(spool_dir, sorted(os.listdir(spool_dir))[0])
+    with open(segment, "ab") as f:
+        f.write(b"\x40\x00")
+
+    reopened = MetricSpool(spool_dir)
+    reopened.append(_metrics(3, 2))
+    assert [m.value for m in reopened.pop(10)] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert reopened.get_stats()["records_corrupt"] == 1
+
+
+def test_oldest_segments_dropped_when_full(spool_dir):
+    """Test the spool stays within its size bound."""
+    spool = MetricSpool(spool_dir, max_bytes=2048, segment_bytes=512)
+    spool.append(_metrics(0, 200))
+
+    stats = spool.get_stats()
+    assert stats["bytes"] <= 2048
+    assert stats["records_dropped"] > 0
+    values = [m.value for m in spool.pop(1000)]
+    assert values == sorted(values)
+    assert values[-1] == 199.0
@@ -0,0 +1,92 @@
+"""Test the verified-token cache."""
+
+import time
+from datetime import timedelta
+
+import pytest
+from jose import JWTError, jwt
+
+from src.auth import utils
+from src.auth.token_cache import VerifiedTokenCache, token_cache
+
+SECRET = "test-secret"
+
+
+class CountingDecoder:
+    """Verifies HS256 tokens and counts the calls."""
+
+    def __init__(self, secret=SECRET):
+        self.secret = secret
+        self.calls = 0
+
+    def __call__(self, token):
+        self.calls += 1
+        return jwt.decode(token, self.secret, algorithms=["HS256"])
+
+
+def make_token(exp_in=3600, secret=SECRET, sub="agent-1"):
+    return jwt.encode({"sub": sub, "exp": int(time.time()) + exp_in}, secret)
+
+
+def test_verified_tokens_are_decoded_once():
+    """Test repeat verifications of a token are served from the cache."""
+    cache = VerifiedTokenCache()
+    decode = CountingDecoder()
+    token = make_token()
+
+    for _ in range(5):
+        assert cache.verify(token, SECRET, decode)["sub"] == "agent-1"
+
+    assert decode.calls == 1
+    assert cache.get_stats() == {"hits": 4, "misses": 1, "size": 1}
+
+
+def test_invalid_tokens_are_not_cached():
+    """Test a failed verification raises every time."""
+    cache = VerifiedTokenCache()
+    decode = CountingDecoder()
+    token = make_token(secret="other-secret")
+
+    for _ in range(2):
+        with pytest.raises(JWTError):
+            cache.verify(token, SECRET, decode)
+    assert decode.calls == 2
+    assert cache.get_stats()["size"] == 0
+
+
+def test_entries_expire_with_the_token(monkeypatch):
+    """Test a cached token is verified again once its exp has passed."""
+    cache = VerifiedTokenCache(max_ttl=3600)
+    decode = CountingDecoder()
+    token = make_token(exp_in=60)
+    cache.verify(token, SECRET, decode)
+
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+    cache.verify(token, SECRET, decode)
+    assert decode.calls == 2
+
+
+def test_entries_are_scoped_by_key_and_bounded():
+    """Test another key misses the cache and old tokens are evicted."""
+    cache = VerifiedTokenCache(maxsize=2)
+    decode = CountingDecoder()
+    tokens = [make_token(sub=f"agent-{i}") for i in range(3)]
+    for token in tokens:
+        cache.verify(token, SECRET, decode)
+
+    assert cache.get_stats()["size"] == 2
+    cache.verify(tokens[0], SECRET, decode)
+    assert decode.calls == 4
+    with pytest.raises(JWTError):
+        cache.verify(tokens[2], "rotated-secret", CountingDecoder("rotated-secret"))
+
+
+def test_verify_access_token_uses_shared_cache():
+    """Test the auth utilities verify through the process-wide cache."""
+    token = utils.create_access_token({"sub": "user@example.com"}, timedelta(minutes=5))
+    hits = token_cache.get_stats()["hits"]
+
+    assert utils.verify_access_token(token) == "user@example.com"
+    assert utils.verify_access_token(token) == "user@example.com"
+    assert token_cache.get_stats()["hits"] == hits + 1